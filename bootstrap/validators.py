@@ -12,15 +12,28 @@ Validators for use with Click_.
 
 import click
 
+from byceps.services.board import board_service
+from byceps.services.board.transfer.models import Board, BoardID
 from byceps.services.brand.models.brand import Brand
 from byceps.services.brand import service as brand_service
 from byceps.services.party.models.party import Party
 from byceps.services.party import service as party_service
+from byceps.services.seating import area_service as seating_area_service
+from byceps.services.seating.models.area import Area
 from byceps.services.user.models.user import User
 from byceps.services.user import service as user_service
 from byceps.typing import BrandID, PartyID, UserID
 
 
+def validate_board(ctx, param, board_id: BoardID) -> Board:
+    board = board_service.find_board(board_id)
+
+    if not board:
+        raise click.BadParameter('Unknown board ID "{}".'.format(board_id))
+
+    return board
+
+
 def validate_brand(ctx, param, brand_id: BrandID) -> Brand:
     brand = brand_service.find_brand(brand_id)
 
@@ -39,6 +52,20 @@ def validate_party(ctx, param, party_id: PartyID) -> Party:
     return party
 
 
+def validate_seating_area(ctx, param, slug: str) -> Area:
+    """Look up the seating area of the party given as `party` parameter
+    (which has to precede this one).
+    """
+    party = ctx.params['party']
+    area = seating_area_service.find_area_for_party_by_slug(party.id, slug)
+
+    if not area:
+        raise click.BadParameter(
+            'Unknown seating area "{}" for party "{}".'.format(slug, party.id))
+
+    return area
+
+
 def validate_user_id(ctx, param, user_id: UserID) -> User:
     user = user_service.find_user(user_id)
 
@@ -6,13 +6,13 @@ byceps.blueprints.authentication.session
 :License: Modified BSD, see LICENSE for details.
 """
 
-from typing import Optional, Union
+from typing import Optional
+from uuid import UUID
 
 from flask import session
 
-from ...services.authentication.exceptions import AuthenticationFailed
+from ...services.authentication.session.models import CurrentUserContext
 from ...services.authentication.session import service as session_service
-from ...services.user.models.user import AnonymousUser, User
 from ...services.user import service as user_service
 from ...typing import UserID
 
@@ -37,9 +37,12 @@ def end() -> None:
     session.permanent = False
 
 
-def get_user() -> Union[AnonymousUser, User]:
-    """Return the current user, falling back to the anonymous user."""
-    return _load_user(_get_user_id(), _get_auth_token())
+def get_user(*, include_permission_ids: bool=True) -> CurrentUserContext:
+    """Return the current user, falling back to the anonymous user,
+    along with the user's avatar URL and (optionally) permission IDs.
+    """
+    return _load_user(_get_user_id(), _get_auth_token(),
+                      include_permission_ids=include_permission_ids)
 
 
 def _get_user_id() -> Optional[str]:
@@ -52,32 +55,40 @@ def _get_auth_token() -> Optional[str]:
     return session.get(KEY_USER_AUTH_TOKEN)
 
 
-def _load_user(user_id: str, auth_token: str) -> Union[AnonymousUser, User]:
+def _load_user(user_id: Optional[str], auth_token: Optional[str], *,
+               include_permission_ids: bool) -> CurrentUserContext:
     """Load the user with that ID.
 
     Fall back to the anonymous user if the ID is unknown, the account is
     not enabled, or the auth token is invalid.
     """
-    if user_id is None:
-        return user_service.get_anonymous_user()
+    user_uuid = _parse_uuid(user_id)
+    auth_token_uuid = _parse_uuid(auth_token)
+
+    if (user_uuid is None) or (auth_token_uuid is None):
+        return _get_anonymous_user_context()
 
-    user = user_service.find_user(user_id)
+    context = session_service.find_user_context(
+        user_uuid, auth_token_uuid,
+        include_permission_ids=include_permission_ids)
 
-    if (user is None) or not user.enabled:
-        return user_service.get_anonymous_user()
+    if context is None:
+        # Unknown or disabled user, or bad auth token; not logging in.
+        return _get_anonymous_user_context()
 
-    # Validate auth token.
-    if not _is_auth_token_valid(user.id, auth_token):
-        # Bad auth token, not logging in.
-        return user_service.get_anonymous_user()
+    return context
 
-    return user
 
+def _parse_uuid(value: Optional[str]) -> Optional[UUID]:
+    if not value:
+        return None
 
-def _is_auth_token_valid(user_id: UserID, auth_token) -> bool:
     try:
-        session_service.authenticate_session(user_id, auth_token)
-    except AuthenticationFailed:
-        return False
-    else:
-        return True
+        return UUID(value)
+    except ValueError:
+        return None
+
+
+def _get_anonymous_user_context() -> CurrentUserContext:
+    user = user_service.get_anonymous_user()
+    return CurrentUserContext(user, None, frozenset())
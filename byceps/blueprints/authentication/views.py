@@ -19,7 +19,6 @@ from ...services.authorization import service as authorization_service
 from ...services.terms import service as terms_service
 from ...services.user import event_service as user_event_service
 from ...services.user import service as user_service
-from ...services.user_avatar import service as user_avatar_service
 from ...services.verification_token import service as verification_token_service
 from ...typing import UserID
 from ...util.framework.blueprint import create_blueprint
@@ -73,27 +72,31 @@ class CurrentUser:
 
 @blueprint.before_app_request
 def before_request():
-    user = _get_current_user()
-
-    avatar_url = None
-    if not user.is_anonymous:
-        avatar_url = user_avatar_service.get_avatar_url_for_user(user.id)
-
-    g.current_user = CurrentUser(user, avatar_url)
+    g.current_user = _get_current_user()
 
 
 def _get_current_user():
-    user = user_session.get_user()
+    # With the permission cache enabled, permissions are not fetched
+    # along with the user but looked up in the cache afterwards.
+    permission_cache_enabled = current_app.config['PERMISSION_CACHE_ENABLED']
+
+    user, avatar_url, permission_ids = user_session.get_user(
+        include_permission_ids=not permission_cache_enabled)
 
     if not user.is_anonymous:
-        user.permissions = _get_permissions_for_user(user.id)
+        if permission_ids is None:
+            permission_ids = authorization_service \
+                .get_permission_ids_for_user_cached(user.id)
+
+        user.permissions = permission_registry.get_enum_members(
+            permission_ids)
 
     if _is_admin_mode() and not user.has_permission(AdminPermission.access):
         # The user lacks the admin access permission which is
         # required to enter the admin area.
-        return user_service.get_anonymous_user()
+        return CurrentUser(user_service.get_anonymous_user(), None)
 
-    return user
+    return CurrentUser(user, avatar_url)
 
 
 # -------------------------------------------------------------------- #
@@ -328,7 +331,13 @@ def _get_current_user_or_404():
 
 
 def _get_permissions_for_user(user_id):
-    permission_ids = authorization_service.get_permission_ids_for_user(user_id)
+    if current_app.config['PERMISSION_CACHE_ENABLED']:
+        permission_ids = authorization_service \
+            .get_permission_ids_for_user_cached(user_id)
+    else:
+        permission_ids = authorization_service \
+            .get_permission_ids_for_user(user_id)
+
     return permission_registry.get_enum_members(permission_ids)
 
 
@@ -79,11 +79,19 @@ def category_index():
 
     user = g.current_user
 
+    if user.is_anonymous:
+        last_viewed_ats = {}
+    else:
+        category_ids = {category.id for category in categories}
+        last_viewed_ats = board_last_view_service \
+            .find_categories_last_viewed_at(category_ids, user.id)
+
     categories_with_flag = []
     for category in categories:
         contains_unseen_postings = not user.is_anonymous \
-            and board_last_view_service.contains_category_unseen_postings(
-                category, user.id)
+            and board_last_view_service \
+                .contains_category_postings_created_after(
+                    category, last_viewed_ats.get(category.id))
 
         category_with_flag = CategoryWithLastUpdateAndUnseenFlag \
             .from_category_with_last_update(category, contains_unseen_postings)
@@ -116,10 +124,17 @@ def category_view(slug, page):
     topics = board_topic_service.paginate_topics(category.id, user._user, page,
                                                  topics_per_page)
 
+    if user.is_anonymous:
+        last_viewed_ats = {}
+    else:
+        topic_ids = {topic.id for topic in topics.items}
+        last_viewed_ats = board_last_view_service.find_topics_last_viewed_at(
+            topic_ids, user.id)
+
     for topic in topics.items:
         topic.contains_unseen_postings = not user.is_anonymous \
-            and board_last_view_service.contains_topic_unseen_postings(
-                topic, user.id)
+            and board_last_view_service.contains_topic_postings_created_after(
+                topic, last_viewed_ats.get(topic.id))
 
     return {
         'category': category,
@@ -0,0 +1,96 @@
+/**
+ * Keep the seats' occupancy up to date, starting from the revision the
+ * page has been rendered at.
+ *
+ * Changes are pushed as server-sent events if available, and polled for
+ * otherwise.
+ */
+
+const SEAT_MAP_POLL_INTERVAL = 5000; // milliseconds
+
+function mark_seat(seat_id, is_occupied) {
+  const seat = document.getElementById('seat-' + seat_id);
+  if (seat !== null) {
+    seat.classList.toggle('occupied', is_occupied);
+  }
+}
+
+function fetch_json(url, onload_callback) {
+  const request = new XMLHttpRequest();
+  request.open('GET', url);
+  request.onload = function() {
+    onload_callback(request.status, request.status === 200 ? JSON.parse(request.responseText) : null);
+  };
+  request.send();
+}
+
+onDomReady(function() {
+  const container = document.querySelector('ol.seats[data-changes-url]');
+  if (container === null) {
+    return;
+  }
+
+  const seat_map_url = container.dataset.seatMapUrl;
+  const changes_url = container.dataset.changesUrl;
+  const events_url = container.dataset.eventsUrl;
+  var revision = parseInt(container.dataset.revision, 10);
+
+  function reload_seat_map(onload_callback) {
+    fetch_json(seat_map_url, function(status, data) {
+      if (status !== 200) {
+        return;
+      }
+
+      forEach(data.seats, function(seat) {
+        mark_seat(seat.id, seat.is_occupied);
+      });
+      revision = data.revision;
+
+      if (onload_callback) {
+        onload_callback();
+      }
+    });
+  }
+
+  function listen_for_changes() {
+    const source = new EventSource(events_url + '?since=' + revision);
+
+    source.addEventListener('change', function(event) {
+      const change = JSON.parse(event.data);
+      mark_seat(change.seat_id, change.is_occupied);
+      revision = change.revision;
+    });
+
+    source.addEventListener('reset', function() {
+      // Changes are no longer available.
+      source.close();
+      reload_seat_map(listen_for_changes);
+    });
+  }
+
+  if (events_url && window.EventSource) {
+    listen_for_changes();
+    return;
+  }
+
+  function poll_changes() {
+    fetch_json(changes_url + '?since=' + revision, function(status, data) {
+      if (status === 410) {
+        // Changes are no longer available.
+        reload_seat_map(null);
+        return;
+      }
+
+      if (status !== 200) {
+        return;
+      }
+
+      forEach(data.changes, function(change) {
+        mark_seat(change.seat_id, change.is_occupied);
+      });
+      revision = data.revision;
+    });
+  }
+
+  setInterval(poll_changes, SEAT_MAP_POLL_INTERVAL);
+});
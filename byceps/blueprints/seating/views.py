@@ -6,14 +6,18 @@ byceps.blueprints.seating.views
 :License: Modified BSD, see LICENSE for details.
 """
 
-from typing import Dict, Sequence
+import json
+from typing import Any, Dict, Optional, Sequence, Set
 
-from flask import abort, g
+from flask import abort, current_app, g, jsonify, request, Response, \
+    stream_with_context
 
 from ...config import get_seat_management_enabled
+from ...database import db
 from ...services.seating import area_service as seating_area_service
+from ...services.seating.models.area import Area
 from ...services.seating.models.seat import Seat
-from ...services.seating import seat_service
+from ...services.seating import seat_map_service, seat_service
 from ...services.seating.transfer.models import SeatID
 from ...services.ticketing.models.ticket import Ticket
 from ...services.ticketing import exceptions as ticket_exceptions, \
@@ -25,7 +29,7 @@ from ...typing import UserID
 from ...util.framework.blueprint import create_blueprint
 from ...util.framework.flash import flash_error, flash_success
 from ...util.framework.templating import templated
-from ...util.views import respond_no_content
+from ...util.views import create_empty_json_response, respond_no_content
 
 from ..authentication.decorators import login_required
 
@@ -33,6 +37,17 @@ from ..authentication.decorators import login_required
 blueprint = create_blueprint('seating', __name__)
 
 
+# How often to send something to keep an idle event stream open
+EVENT_STREAM_KEEPALIVE_INTERVAL = 15  # seconds
+
+# How long to keep an event stream open. Browsers reconnect on their
+# own, so this merely limits how long a worker is occupied at a time.
+EVENT_STREAM_DURATION = 5 * 60  # seconds
+
+# How long browsers wait before reconnecting to an event stream
+EVENT_STREAM_RETRY_INTERVAL = 3000  # milliseconds
+
+
 @blueprint.route('/')
 @templated
 def index():
@@ -54,7 +69,17 @@ def view_area(slug):
 
     seat_management_enabled = get_seat_management_enabled()
 
-    seats = seat_service.get_seats_with_tickets_for_area(area.id)
+    if seat_map_service.is_enabled():
+        # The seats come with their occupants.
+        seat_map = seat_map_service.get_seat_map(area.id)
+        seats = seat_map.seats
+        seat_map_revision = seat_map.revision
+        seat_user_ids = set()
+    else:
+        seats = seat_service.get_seats_with_tickets_for_area(area.id)
+        seat_map_revision = None
+        seat_user_ids = {seat.occupied_by_ticket.used_by_id for seat in seats
+                         if seat.has_user}
 
     if seat_management_enabled:
         tickets = ticket_service.find_tickets_for_seat_manager(
@@ -62,26 +87,25 @@ def view_area(slug):
     else:
         tickets = None
 
-    users_by_id = _get_users(seats, tickets)
+    users_by_id = _get_users(seat_user_ids, tickets)
 
     return {
         'area': area,
         'seat_management_enabled': seat_management_enabled,
         'seats': seats,
+        'seat_map_revision': seat_map_revision,
+        'seat_map_event_stream_enabled': _is_event_stream_enabled(),
         'tickets': tickets,
         'users_by_id': users_by_id,
     }
 
 
-def _get_users(seats: Sequence[Seat], tickets: Sequence[Ticket]
+def _get_users(seat_user_ids: Set[UserID],
+               tickets: Optional[Sequence[Ticket]]
               ) -> Dict[UserID, UserTuple]:
-    user_ids = set()
-
-    for seat in seats:
-        if seat.has_user:
-            user_ids.add(seat.occupied_by_ticket.used_by_id)
+    user_ids = set(seat_user_ids)
 
-    for ticket in tickets:
+    for ticket in (tickets or []):
         user_id = ticket.used_by_id
         if user_id is not None:
             user_ids.add(user_id)
@@ -90,6 +114,132 @@ def _get_users(seats: Sequence[Seat], tickets: Sequence[Ticket]
     return user_service.index_users_by_id(users)
 
 
+@blueprint.route('/areas/<slug>/seat_map.json')
+def view_seat_map_as_json(slug):
+    """Return the area's seats and their occupancy as JSON."""
+    area = _get_area_for_seat_map_or_none(slug)
+    if area is None:
+        return create_empty_json_response(404)
+
+    seat_map = seat_map_service.get_seat_map(area.id)
+
+    return jsonify({
+        'revision': seat_map.revision,
+        'seats': [_seat_to_json(seat) for seat in seat_map.seats],
+    })
+
+
+def _seat_to_json(seat: seat_map_service.SeatMapSeat) -> Dict[str, Any]:
+    return {
+        'id': seat.id,
+        'label': seat.label,
+        'x': seat.coords.x,
+        'y': seat.coords.y,
+        'category_id': seat.category_id,
+        'is_occupied': seat.is_occupied,
+        'user': seat.user._asdict() if (seat.user is not None) else None,
+    }
+
+
+@blueprint.route('/areas/<slug>/seat_map/changes.json')
+def view_seat_map_changes_as_json(slug):
+    """Return the changes to the area's seat occupancy since the given
+    revision as JSON.
+
+    Respond with status 410 (Gone) if the changes are no longer
+    available, in which case the seat map has to be fetched again.
+    """
+    area = _get_area_for_seat_map_or_none(slug)
+    if area is None:
+        return create_empty_json_response(404)
+
+    since_revision = request.args.get('since', type=int)
+    if since_revision is None:
+        return create_empty_json_response(400)
+
+    changes = seat_map_service.get_changes(area.id, since_revision)
+    if changes is None:
+        return create_empty_json_response(410)
+
+    return jsonify({
+        'revision': changes.revision,
+        'changes': changes.changes,
+    })
+
+
+@blueprint.route('/areas/<slug>/seat_map/events')
+def stream_seat_map_changes(slug):
+    """Stream the changes to the area's seat occupancy since the given
+    revision as server-sent events.
+
+    If the changes are no longer available, a `reset` event is sent
+    and the stream ends, in which case the seat map has to be fetched
+    again.
+    """
+    if not _is_event_stream_enabled():
+        abort(404)
+
+    area = _get_area_for_seat_map_or_none(slug)
+    if area is None:
+        abort(404)
+
+    # Browsers send the ID of the last event received when they
+    # reconnect.
+    since_revision = request.headers.get('Last-Event-ID', type=int)
+    if since_revision is None:
+        since_revision = request.args.get('since', type=int)
+    if since_revision is None:
+        abort(400)
+
+    events = _generate_seat_map_events(area.id, since_revision)
+
+    # The stream keeps the application context alive until it ends,
+    # which would keep the database connection checked out of the pool
+    # (and idle in transaction) for as long. The stream does not need
+    # the database, so release the connection right away.
+    db.session.remove()
+
+    headers = {
+        'Cache-Control': 'no-cache',
+        # Keep reverse proxies (namely nginx) from buffering the stream.
+        'X-Accel-Buffering': 'no',
+    }
+
+    return Response(stream_with_context(events),
+                    content_type='text/event-stream', headers=headers)
+
+
+def _generate_seat_map_events(area_id, since_revision):
+    yield 'retry: {}\n\n'.format(EVENT_STREAM_RETRY_INTERVAL)
+
+    changes = seat_map_service.stream_changes(area_id, since_revision,
+        keepalive_interval=EVENT_STREAM_KEEPALIVE_INTERVAL,
+        duration=EVENT_STREAM_DURATION)
+
+    try:
+        for change in changes:
+            if change is None:
+                yield ': keepalive\n\n'
+                continue
+
+            yield 'id: {}\nevent: change\ndata: {}\n\n'.format(
+                change['revision'], json.dumps(change))
+    except seat_map_service.ChangesUnavailable:
+        yield 'event: reset\ndata: {}\n\n'
+
+
+def _is_event_stream_enabled() -> bool:
+    return seat_map_service.is_enabled() \
+        and current_app.config['SEAT_MAP_EVENT_STREAM_ENABLED']
+
+
+def _get_area_for_seat_map_or_none(slug: str) -> Optional[Area]:
+    if not seat_map_service.is_enabled():
+        return None
+
+    return seating_area_service.find_area_for_party_by_slug(g.party_id, slug)
+
+
 @blueprint.route('/ticket/<uuid:ticket_id>/seat/<uuid:seat_id>', methods=['POST'])
 @login_required
 @respond_no_content
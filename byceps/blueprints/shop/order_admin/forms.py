@@ -6,7 +6,7 @@ byceps.blueprints.shop.order_admin.forms
 :License: Modified BSD, see LICENSE for details.
 """
 
-from wtforms import RadioField, TextAreaField
+from wtforms import FileField, RadioField, TextAreaField
 from wtforms.validators import InputRequired, Length
 
 from ....services.shop.order.transfer.models import PaymentMethod
@@ -29,3 +29,21 @@ class MarkAsPaidForm(LocalizedForm):
         choices=PAYMENT_METHOD_CHOICES,
         default=PAYMENT_METHOD_CHOICES[0][0],
         validators=[InputRequired()])
+
+
+ENCODING_CHOICES = [
+    ('utf-8-sig', 'UTF-8'),
+    ('cp1252', 'Windows-1252 (ISO-8859-1)'),
+]
+
+
+class ReconcilePaymentsForm(LocalizedForm):
+    payments = FileField('Zahlungen (CSV-Datei)', [InputRequired()])
+    encoding = RadioField('Zeichenkodierung',
+        choices=ENCODING_CHOICES,
+        default=ENCODING_CHOICES[0][0],
+        validators=[InputRequired()])
+    payment_method = RadioField('Zahlungsart',
+        choices=PAYMENT_METHOD_CHOICES,
+        default=PAYMENT_METHOD_CHOICES[0][0],
+        validators=[InputRequired()])
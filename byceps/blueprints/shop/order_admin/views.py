@@ -6,12 +6,16 @@ byceps.blueprints.shop.order_admin.views
 :License: Modified BSD, see LICENSE for details.
 """
 
-from flask import abort, g, request, Response
+import codecs
+from datetime import datetime, timedelta
+
+from flask import abort, g, request, Response, stream_with_context
 
 from ....services.party import service as party_service
 from ....services.shop.order import service as order_service
 from ....services.shop.order.email import service as order_email_service
 from ....services.shop.order.export import service as order_export_service
+from ....services.shop.order import reconciliation_service
 from ....services.shop.order.transfer.models import PaymentMethod, PaymentState
 from ....services.shop.sequence import service as sequence_service
 from ....services.shop.shop import service as shop_service
@@ -27,7 +31,7 @@ from ...authorization.registry import permission_registry
 from ...shop_order.signals import order_canceled, order_paid
 
 from .authorization import ShopOrderPermission
-from .forms import CancelForm, MarkAsPaidForm
+from .forms import CancelForm, MarkAsPaidForm, ReconcilePaymentsForm
 from .models import OrderStateFilter
 from . import service
 
@@ -38,11 +42,10 @@ blueprint = create_blueprint('shop_order_admin', __name__)
 permission_registry.register_enum(ShopOrderPermission)
 
 
-@blueprint.route('/parties/<party_id>', defaults={'page': 1})
-@blueprint.route('/parties/<party_id>/pages/<int:page>')
+@blueprint.route('/parties/<party_id>')
 @permission_required(ShopOrderPermission.view)
 @templated
-def index_for_party(party_id, page):
+def index_for_party(party_id):
     """List orders for that party."""
     party = _get_party_or_404(party_id)
     shop = shop_service.find_shop_for_party(party.id)
@@ -57,6 +60,8 @@ def index_for_party(party_id, page):
     order_number_prefix = order_number_sequence.prefix
 
     per_page = request.args.get('per_page', type=int, default=15)
+    after = request.args.get('after')
+    before = request.args.get('before')
 
     search_term = request.args.get('search_term', default='').strip()
 
@@ -75,15 +80,17 @@ def index_for_party(party_id, page):
     order_state_filter = OrderStateFilter.find(only_payment_state, only_shipped)
 
     orders = order_service \
-        .get_orders_for_shop_paginated(shop.id, page, per_page,
-                                       search_term=search_term,
-                                       only_payment_state=only_payment_state,
-                                       only_shipped=only_shipped)
-
-    # Replace order objects in pagination object with order tuples.
-    orders.items = [order.to_transfer_object() for order in orders.items]
-
-    orders.items = list(service.extend_order_tuples_with_orderer(orders.items))
+        .get_orders_for_shop_page(shop.id, per_page,
+                                  after=after,
+                                  before=before,
+                                  search_term=search_term,
+                                  only_payment_state=only_payment_state,
+                                  only_shipped=only_shipped)
+
+    # Replace order objects in page with order tuples.
+    order_tuples = [order.to_transfer_object() for order in orders.items]
+    order_tuples = list(service.extend_order_tuples_with_orderer(order_tuples))
+    orders = orders._replace(items=order_tuples)
 
     return {
         'party': party,
@@ -96,6 +103,7 @@ def index_for_party(party_id, page):
         'OrderStateFilter': OrderStateFilter,
         'order_state_filter': order_state_filter,
         'orders': orders,
+        'ShopOrderPermission': ShopOrderPermission,
     }
 
 
@@ -144,6 +152,70 @@ def export(order_id):
                     content_type=xml_export['content_type'])
 
 
+@blueprint.route('/parties/<party_id>/export.csv')
+@permission_required(ShopOrderPermission.view)
+def export_for_party_as_csv(party_id):
+    """Export the party's orders as CSV."""
+    shop = _get_shop_for_party_or_404(party_id)
+
+    lines = order_export_service.export_orders_as_csv(shop.id,
+                                                      **_get_export_filters())
+
+    return _stream_download(lines, 'text/csv; charset=utf-8',
+                            'orders-{}.csv'.format(party_id))
+
+
+@blueprint.route('/parties/<party_id>/export.xml')
+@permission_required(ShopOrderPermission.view)
+def export_for_party_as_xml(party_id):
+    """Export the party's orders as an XML document."""
+    shop = _get_shop_for_party_or_404(party_id)
+
+    chunks = order_export_service.export_orders_as_xml(shop.id,
+                                                       **_get_export_filters())
+
+    return _stream_download(chunks, 'application/xml; charset=utf-8',
+                            'orders-{}.xml'.format(party_id))
+
+
+def _get_export_filters():
+    """Return the payment state and date range to limit the export to,
+    as given in the query string.
+
+    Dates are expected as `YYYY-MM-DD`, both limits are inclusive.
+    """
+    only_payment_state = request.args.get('only_payment_state',
+                                          type=PaymentState.__getitem__)
+
+    def _parse_date(value):
+        return datetime.strptime(value, '%Y-%m-%d')
+
+    created_after = request.args.get('from', type=_parse_date)
+
+    created_before = request.args.get('until', type=_parse_date)
+    if created_before is not None:
+        created_before += timedelta(days=1)
+
+    return {
+        'only_payment_state': only_payment_state,
+        'created_after': created_after,
+        'created_before': created_before,
+    }
+
+
+def _stream_download(chunks, content_type, filename):
+    """Stream the chunks as a file to download.
+
+    As no content length is given, the response is sent chunked.
+    """
+    headers = {
+        'Content-Disposition': 'attachment; filename="{}"'.format(filename),
+    }
+
+    return Response(stream_with_context(chunks), content_type=content_type,
+                    headers=headers)
+
+
 @blueprint.route('/<uuid:order_id>/flags/invoiced', methods=['POST'])
 @permission_required(ShopOrderPermission.update)
 @respond_no_content
@@ -309,6 +381,73 @@ def mark_as_paid(order_id):
     return redirect_to('.view', order_id=order.id)
 
 
+@blueprint.route('/parties/<party_id>/reconcile_payments')
+@permission_required(ShopOrderPermission.mark_as_paid)
+@templated
+def reconcile_payments_form(party_id, erroneous_form=None):
+    """Show form to upload payments to mark the matching orders as paid."""
+    party = _get_party_or_404(party_id)
+
+    form = erroneous_form if erroneous_form else ReconcilePaymentsForm()
+
+    return {
+        'party': party,
+        'form': form,
+    }
+
+
+@blueprint.route('/parties/<party_id>/reconcile_payments', methods=['POST'])
+@permission_required(ShopOrderPermission.mark_as_paid)
+@templated
+def reconcile_payments(party_id):
+    """Mark the orders matching the uploaded payments as paid."""
+    party = _get_party_or_404(party_id)
+    shop = shop_service.find_shop_for_party(party.id)
+    if shop is None:
+        abort(404)
+
+    # Make `InputRequired` work on `FileField`.
+    form_fields = request.form.copy()
+    if request.files:
+        form_fields.update(request.files)
+
+    form = ReconcilePaymentsForm(form_fields)
+    if not form.validate():
+        return reconcile_payments_form(party.id, form)
+
+    payments_file = request.files.get('payments')
+    if not payments_file or not payments_file.filename:
+        abort(400, 'No file to upload has been specified.')
+
+    try:
+        lines = list(codecs.iterdecode(payments_file.stream,
+                                       form.encoding.data))
+    except UnicodeDecodeError:
+        form.encoding.errors.append(
+            'Die Datei ist nicht in dieser Zeichenkodierung gespeichert.')
+        return reconcile_payments_form(party.id, form)
+
+    payments = list(reconciliation_service.parse_payments(lines))
+
+    payment_method = PaymentMethod[form.payment_method.data]
+    updated_by_id = g.current_user.id
+
+    results = reconciliation_service.reconcile(shop.id, payments,
+                                               payment_method, updated_by_id)
+
+    for result in results:
+        if result.status == \
+                reconciliation_service.ReconciliationStatus.marked_as_paid:
+            order_email_service.enqueue_email_for_paid_order_to_orderer(
+                result.order_id)
+
+    return {
+        'party': party,
+        'results': results,
+        'ReconciliationStatus': reconciliation_service.ReconciliationStatus,
+    }
+
+
 @blueprint.route('/<uuid:order_id>/resend_incoming_order_email',
                  methods=['POST'])
 @permission_required(ShopOrderPermission.update)
@@ -331,6 +470,17 @@ def _get_party_or_404(party_id):
     return party
 
 
+def _get_shop_for_party_or_404(party_id):
+    party = _get_party_or_404(party_id)
+
+    shop = shop_service.find_shop_for_party(party.id)
+
+    if shop is None:
+        abort(404)
+
+    return shop
+
+
 def _get_order_or_404(order_id):
     order = order_service.find_order(order_id)
 
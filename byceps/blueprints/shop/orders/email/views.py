@@ -16,7 +16,7 @@ blueprint = create_blueprint('shop_orders_email', __name__)
 
 @order_placed.connect
 def send_email_for_incoming_order_to_orderer(sender, *, order_id=None):
-    order_email_service.send_email_for_incoming_order_to_orderer(order_id)
+    order_email_service.enqueue_email_for_incoming_order_to_orderer(order_id)
 
 
 @order_canceled.connect
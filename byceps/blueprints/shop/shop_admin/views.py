@@ -10,7 +10,7 @@ from flask import abort
 
 from ....services.party import service as party_service
 from ....services.shop.article import service as article_service
-from ....services.shop.order import service as order_service
+from ....services.shop.order import stats_service as order_stats_service
 from ....services.shop.order.transfer.models import PaymentState
 from ....services.shop.sequence import service as sequence_service
 from ....services.shop.shop import service as shop_service
@@ -46,8 +46,8 @@ def view_for_party(party_id):
     most_recent_order_number = _get_most_recent_order_number(shop.id)
 
     article_count = article_service.count_articles_for_shop(shop.id)
-    order_counts_by_payment_state = order_service \
-        .count_orders_per_payment_state(shop.id)
+    order_stats_by_payment_state = order_stats_service \
+        .get_stats_by_payment_state(shop.id)
 
     return {
         'party': party,
@@ -57,7 +57,7 @@ def view_for_party(party_id):
         'most_recent_order_number': most_recent_order_number,
 
         'article_count': article_count,
-        'order_counts_by_payment_state': order_counts_by_payment_state,
+        'order_stats_by_payment_state': order_stats_by_payment_state,
         'PaymentState': PaymentState,
     }
 
@@ -6,12 +6,15 @@ byceps.blueprints.shop_order.views
 :License: Modified BSD, see LICENSE for details.
 """
 
-from flask import abort, g, request
+from functools import wraps
+
+from flask import abort, g, render_template, request
 
 from ...services.country import service as country_service
 from ...services.shop.article import service as article_service
 from ...services.shop.cart.models import Cart
-from ...services.shop.order import service as order_service
+from ...services.shop.order import admission_service, \
+    service as order_service
 from ...services.shop.order.transfer.models import PaymentMethod
 from ...services.shop.shop import service as shop_service
 from ...util.framework.blueprint import create_blueprint
@@ -27,8 +30,33 @@ from .forms import assemble_articles_order_form, OrderForm
 blueprint = create_blueprint('shop_order', __name__)
 
 
+def admission_required(func):
+    """Only let the current user check out if admitted to do so.
+
+    Users not admitted (yet) are shown a waiting room instead.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if admission_service.get_limit() is None:
+            return func(*args, **kwargs)
+
+        shop = shop_service.find_shop_for_party(g.party_id)
+
+        status = admission_service.try_admit(shop.id, g.current_user.id)
+        if not status.admitted:
+            context = {
+                'position': status.position,
+                'retry_interval': admission_service.RETRY_INTERVAL,
+            }
+            return render_template('shop_order/waiting_room.html', **context)
+
+        return func(*args, **kwargs)
+    return wrapper
+
+
 @blueprint.route('/order')
 @login_required
+@admission_required
 @templated
 def order_form(erroneous_form=None):
     """Show a form to order articles."""
@@ -60,6 +88,7 @@ def order_form(erroneous_form=None):
 
 @blueprint.route('/order', methods=['POST'])
 @login_required
+@admission_required
 def order():
     """Order articles."""
     shop = shop_service.find_shop_for_party(g.party_id)
@@ -87,10 +116,15 @@ def order():
 
     try:
         order = _submit_order(shop.id, orderer, cart)
+    except order_service.ArticlesSoldOut as e:
+        _flash_articles_sold_out(cart, e.article_ids)
+        return order_form(form)
     except order_service.OrderFailed:
         flash_error('Die Bestellung ist fehlgeschlagen.')
         return order_form(form)
 
+    admission_service.release(shop.id, g.current_user.id)
+
     _flash_order_success(order)
 
     return redirect_to('snippet.order_placed')
@@ -98,6 +132,7 @@ def order():
 
 @blueprint.route('/order_single/<uuid:article_id>')
 @login_required
+@admission_required
 @templated
 def order_single_form(article_id, erroneous_form=None):
     """Show a form to order a single article."""
@@ -143,6 +178,7 @@ def order_single_form(article_id, erroneous_form=None):
 
 @blueprint.route('/order_single/<uuid:article_id>', methods=['POST'])
 @login_required
+@admission_required
 def order_single(article_id):
     """Order a single article."""
     article = _get_article_or_404(article_id)
@@ -180,10 +216,15 @@ def order_single(article_id):
 
     try:
         order = _submit_order(shop.id, orderer, cart)
+    except order_service.ArticlesSoldOut as e:
+        _flash_articles_sold_out(cart, e.article_ids)
+        return order_form(form)
     except order_service.OrderFailed:
         flash_error('Die Bestellung ist fehlgeschlagen.')
         return order_form(form)
 
+    admission_service.release(shop.id, g.current_user.id)
+
     _flash_order_success(order)
 
     return redirect_to('snippet.order_placed')
@@ -204,6 +245,16 @@ def _submit_order(shop_id, orderer, cart):
     return order_service.create_order(shop_id, orderer, payment_method, cart)
 
 
+def _flash_articles_sold_out(cart, article_ids):
+    descriptions = [item.article.description
+                    for item in cart.get_items()
+                    if item.article.id in article_ids]
+
+    flash_error('Die Bestellung ist fehlgeschlagen, da folgende Artikel nicht '
+                'mehr in der gewünschten Menge verfügbar sind: {}',
+                ', '.join(sorted(descriptions)))
+
+
 def _flash_order_success(order):
     flash_success('Deine Bestellung mit der Bestellnummer <strong>{}</strong> '
                   'wurde entgegen genommen. Vielen Dank!', order.order_number,
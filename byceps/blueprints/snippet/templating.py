@@ -12,6 +12,7 @@ import traceback
 from flask import abort, g, render_template, url_for
 from jinja2 import TemplateNotFound
 
+from ...services.snippet import cache_service as snippet_cache_service
 from ...services.snippet import service as snippet_service
 from ...services.snippet.service import SnippetNotFound
 from ...util.templating import get_variable_value, load_template
@@ -37,12 +38,17 @@ def render_snippet_as_page(version):
 
 def get_snippet_context(version):
     """Return the snippet context to insert into the outer template."""
-    template = _load_template_with_globals(version.body)
+    if version.body_html is not None:
+        current_page = None
+        body = version.body_html
+    else:
+        template = _get_template(version.id, 'body', version.body)
+        current_page = get_variable_value(template, 'current_page')
+        body = template.render()
 
-    current_page = get_variable_value(template, 'current_page')
     title = version.title
-    head = _render_template(version.head) if version.head else None
-    body = template.render()
+    head = _get_template(version.id, 'head', version.head).render() \
+        if version.head else None
 
     return {
         'title': title,
@@ -56,8 +62,7 @@ def render_snippet_as_partial(name, *, ignore_if_unknown=False):
     """Render the latest version of the snippet with the given name and
     return the result.
     """
-    current_version = snippet_service \
-        .find_current_version_of_snippet_with_name(g.party_id, name)
+    current_version = snippet_service.find_current_version(g.party_id, name)
 
     if current_version is None:
         if ignore_if_unknown:
@@ -65,14 +70,30 @@ def render_snippet_as_partial(name, *, ignore_if_unknown=False):
         else:
             raise SnippetNotFound('name')
 
-    return _render_template(current_version.body)
+    if current_version.body_html is not None:
+        return current_version.body_html
 
-
-def _render_template(source):
-    template = _load_template_with_globals(source)
+    template = _get_template(current_version.id, 'body', current_version.body)
     return template.render()
 
 
+def _get_template(version_id, part, source):
+    """Return the compiled template for that part of the snippet version.
+
+    If enabled, compiled templates are cached.
+    """
+    if not snippet_cache_service.is_enabled():
+        return _load_template_with_globals(source)
+
+    template = snippet_cache_service.find_template(version_id, part)
+
+    if template is None:
+        template = _load_template_with_globals(source)
+        snippet_cache_service.store_template(version_id, part, template)
+
+    return template
+
+
 def _load_template_with_globals(source):
     template_globals = {
         'render_snippet': render_snippet_as_partial,
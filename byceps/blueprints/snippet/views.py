@@ -9,6 +9,7 @@ byceps.blueprints.snippet.views
 from flask import abort, g, jsonify
 
 from ...services.snippet import service as snippet_service
+from ...services.snippet.models.snippet import SnippetType
 from ...util.framework.blueprint import create_blueprint
 from ...util.views import create_empty_json_response
 
@@ -45,14 +46,14 @@ def view_as_json(name):
         'body': context['body'],
     }
 
-    if version.snippet.is_document:
+    if version.snippet_type == SnippetType.document:
         content.update({
             'title': context['title'],
             'head': context['head'],
         })
 
     return jsonify({
-        'type': version.snippet.type_.name,
+        'type': version.snippet_type.name,
         'version': version.id,
         'content': content,
     })
@@ -62,5 +63,4 @@ def _find_current_snippet_version(name):
     """Return the current version of the snippet with that name, or
     `None` if it does not exist.
     """
-    return snippet_service.find_current_version_of_snippet_with_name(
-        g.party_id, name)
+    return snippet_service.find_current_version(g.party_id, name)
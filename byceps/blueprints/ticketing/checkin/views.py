@@ -71,28 +71,22 @@ def _get_latest_date_of_birth_for_checkin():
 
 
 def _search_tickets(party_id, search_term, limit):
-    page = 1
-    per_page = limit
+    tickets_page = ticket_service.get_tickets_with_details_for_party_page(
+        party_id, limit, search_term=search_term)
 
-    tickets_pagination = ticket_service.get_tickets_with_details_for_party_paginated(
-        party_id, page, per_page, search_term=search_term)
-
-    return tickets_pagination.items
+    return tickets_page.items
 
 
 def _search_orders(party_id, search_term, limit):
-    page = 1
-    per_page = limit
-
     shop = shop_service.find_shop_for_party(party_id)
     if not shop:
         return []
 
-    orders_pagination = order_service.get_orders_for_shop_paginated(
-        shop.id, page, per_page, search_term=search_term)
+    orders_page = order_service.get_orders_for_shop_page(
+        shop.id, limit, search_term=search_term)
 
     # Replace order objects with order tuples.
-    orders = [order.to_transfer_object() for order in orders_pagination.items]
+    orders = [order.to_transfer_object() for order in orders_page.items]
 
     orders = list(order_blueprint_service.extend_order_tuples_with_orderer(
         orders))
@@ -101,13 +95,10 @@ def _search_orders(party_id, search_term, limit):
 
 
 def _search_users(party_id, search_term, limit):
-    page = 1
-    per_page = limit
-
-    users_pagination = user_blueprint_service.get_users_paginated(
-        page, per_page, search_term=search_term)
+    users_page = user_blueprint_service.get_users_page(
+        limit, search_term=search_term)
 
-    return users_pagination.items
+    return users_page.items
 
 
 def _get_tickets_for_users(party_id, users):
@@ -32,22 +32,24 @@ blueprint = create_blueprint('ticketing_admin', __name__)
 permission_registry.register_enum(TicketingPermission)
 
 
-@blueprint.route('/tickets/for_party/<party_id>', defaults={'page': 1})
-@blueprint.route('/tickets/for_party/<party_id>/pages/<int:page>')
+@blueprint.route('/tickets/for_party/<party_id>')
 @permission_required(TicketingPermission.view)
 @templated
-def index_for_party(party_id, page):
+def index_for_party(party_id):
     """List tickets for that party."""
     party = party_service.find_party(party_id)
     if party is None:
         abort(404)
 
     per_page = request.args.get('per_page', type=int, default=15)
+    after = request.args.get('after')
+    before = request.args.get('before')
 
     search_term = request.args.get('search_term', default='').strip()
 
-    tickets = ticket_service.get_tickets_with_details_for_party_paginated(
-        party.id, page, per_page, search_term=search_term)
+    tickets = ticket_service.get_tickets_with_details_for_party_page(
+        party.id, per_page, after=after, before=before,
+        search_term=search_term)
 
     return {
         'party': party,
@@ -19,24 +19,29 @@ from ...services.user.models.user import User, UserTuple
 from ...services.user import service as user_service
 from ...services.user_avatar import service as avatar_service
 from ...typing import UserID
+from ...util import keyset_pagination
 
 from .models import UserStateFilter
 
 
-def get_users_paginated(page, per_page, *, search_term=None, state_filter=None):
-    """Return the users to show on the specified page, optionally
-    filtered by search term or 'enabled' flag.
+def get_users_page(per_page, *, after=None, before=None, search_term=None,
+                   state_filter=None, total=None):
+    """Return the page of users following (or preceding) the cursor,
+    latest first, optionally filtered by search term or 'enabled' flag.
     """
     query = User.query \
-        .options(db.joinedload('detail')) \
-        .order_by(User.created_at.desc())
+        .options(db.joinedload('detail'))
 
     query = _filter_by_state(query, state_filter)
 
     if search_term:
         query = _filter_by_search_term(query, search_term)
 
-    return query.paginate(page, per_page)
+    sort_columns = [User.created_at, User.id]
+
+    return keyset_pagination.paginate(query, sort_columns, per_page,
+                                      after=after, before=before,
+                                      total=total)
 
 
 def _filter_by_search_term(query, search_term):
@@ -43,29 +43,45 @@ blueprint = create_blueprint('user_admin', __name__)
 permission_registry.register_enum(UserPermission)
 
 
-@blueprint.route('/', defaults={'page': 1})
-@blueprint.route('/pages/<int:page>')
+@blueprint.route('/')
 @permission_required(UserPermission.view)
 @templated
-def index(page):
+def index():
     """List users."""
     per_page = request.args.get('per_page', type=int, default=20)
+    after = request.args.get('after')
+    before = request.args.get('before')
     search_term = request.args.get('search_term', default='').strip()
     only = request.args.get('only')
 
     user_state_filter = UserStateFilter.__members__.get(only,
                                                         UserStateFilter.none)
 
-    users = service.get_users_paginated(page, per_page,
-                                        search_term=search_term,
-                                        state_filter=user_state_filter)
-
     total_enabled = user_service.count_enabled_users()
     total_disabled = user_service.count_disabled_users()
     total_suspended = user_service.count_suspended_users()
     total_deleted = user_service.count_deleted_users()
     total_overall = total_enabled + total_disabled
 
+    if search_term:
+        total = None
+    elif user_state_filter == UserStateFilter.none:
+        total = total_overall
+    else:
+        total = {
+            UserStateFilter.enabled: total_enabled,
+            UserStateFilter.disabled: total_disabled,
+            UserStateFilter.suspended: total_suspended,
+            UserStateFilter.deleted: total_deleted,
+        }[user_state_filter]
+
+    users = service.get_users_page(per_page,
+                                   after=after,
+                                   before=before,
+                                   search_term=search_term,
+                                   state_filter=user_state_filter,
+                                   total=total)
+
     return {
         'users': users,
         'total_enabled': total_enabled,
@@ -28,6 +28,22 @@ JOBS_ASYNC = True
 RQ_DASHBOARD_ENABLED = False
 RQ_POLL_INTERVAL = 2500
 
+# authorization
+PERMISSION_CACHE_ENABLED = False
+
+# text markup
+# Share rendered HTML between processes through Redis (in addition to
+# the in-process cache).
+TEXT_MARKUP_RENDER_CACHE_REDIS_ENABLED = False
+# Render markup of board postings, news items and snippets when they
+# are written and store the HTML alongside the source.
+TEXT_MARKUP_STORE_RENDERED_HTML = False
+
+# snippets
+# Keep the current snippet versions and their compiled templates in
+# memory instead of looking them up and compiling them on every render.
+SNIPPET_CACHE_ENABLED = False
+
 # user accounts
 USER_REGISTRATION_ENABLED = True
 
@@ -49,11 +65,36 @@ NEWS_ITEMS_PER_PAGE = 4
 BOARD_TOPICS_PER_PAGE = 10
 BOARD_POSTINGS_PER_PAGE = 10
 
+# Buffer users' last views of board categories and topics in Redis and
+# write them to the database periodically.
+BOARD_LAST_VIEWS_WRITE_BEHIND = False
+
 # shop
 SHOP_ORDER_EXPORT_TIMEZONE = timezone('Europe/Berlin')
+# Number of order numbers each process reserves at once. Values greater
+# than 1 avoid serializing concurrent checkouts on the sequence, at the
+# cost of gaps in the order numbers.
+SHOP_ORDER_NUMBER_BLOCK_SIZE = 1
+# Maximum number of users to check out concurrently per shop. Others
+# are put in a waiting room. `None` admits everyone right away.
+SHOP_ORDER_ADMISSION_LIMIT = None
+# Cache which articles are offered on the order form (and which
+# articles are attached to them) in Redis.
+SHOP_ARTICLE_COMPILATION_CACHE_ENABLED = False
+# Keep the order actions in memory instead of looking them up whenever
+# an order's payment state changes.
+SHOP_ORDER_ACTION_CACHE_ENABLED = False
 
 # ticketing
 TICKET_MANAGEMENT_ENABLED = True
 
 # seating
 SEAT_MANAGEMENT_ENABLED = True
+# Keep snapshots of the seating areas' seats and their occupancy in
+# Redis and let the area view poll for changes.
+SEAT_MAP_CACHE_ENABLED = False
+# Push seat occupancy changes to the area view as server-sent events
+# instead of having it poll for them. Each open area view occupies a
+# worker (for a few minutes at a time), so this requires a server that
+# can handle many concurrent connections. Requires the seat map cache.
+SEAT_MAP_EVENT_STREAM_ENABLED = False
@@ -6,6 +6,7 @@ byceps.services.authentication.session.models
 :License: Modified BSD, see LICENSE for details.
 """
 
+from collections import namedtuple
 from datetime import datetime
 from uuid import UUID
 
@@ -25,3 +26,7 @@ class SessionToken(db.Model):
         self.token = token
         self.user_id = user_id
         self.created_at = created_at
+
+
+CurrentUserContext = namedtuple('CurrentUserContext',
+                                'user, avatar_url, permission_ids')
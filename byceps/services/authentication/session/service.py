@@ -10,11 +10,16 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
+from ....database import db
 from ....typing import UserID
 
+from ...authorization.models import RolePermission, UserRole
+from ...user.models.user import User
+from ...user_avatar.models import Avatar, AvatarSelection
+
 from ..exceptions import AuthenticationFailed
 
-from .models import SessionToken
+from .models import CurrentUserContext, SessionToken
 
 
 def create_session_token(user_id: UserID, created_at: datetime) -> SessionToken:
@@ -71,3 +76,52 @@ def _is_token_valid_for_user(token: UUID, user_id: UserID) -> bool:
     session_token = SessionToken.query.get(token)
 
     return (session_token is not None) and (session_token.user_id == user_id)
+
+
+def find_user_context(user_id: UserID, auth_token: UUID, *,
+                      include_permission_ids: bool=True
+                     ) -> Optional[CurrentUserContext]:
+    """Return the user with that ID together with the URL of the user's
+    current avatar and, optionally, the IDs of the permissions the user
+    has through the roles assigned to it.
+
+    Return `None` if the user is unknown or not enabled, or if the
+    session token is not valid for the user.
+
+    All of this is fetched with a single query.
+    """
+    query = db.session \
+        .query(User, Avatar) \
+        .join(SessionToken, SessionToken.user_id == User.id) \
+        .outerjoin(AvatarSelection, AvatarSelection.user_id == User.id) \
+        .outerjoin(Avatar, Avatar.id == AvatarSelection.avatar_id) \
+        .filter(User.id == user_id) \
+        .filter(User.enabled == True) \
+        .filter(SessionToken.token == auth_token)
+
+    if include_permission_ids:
+        permission_ids_subquery = db.session \
+            .query(db.func.array_agg(RolePermission.permission_id)) \
+            .select_from(RolePermission) \
+            .join(UserRole, UserRole.role_id == RolePermission.role_id) \
+            .filter(UserRole.user_id == User.id) \
+            .correlate(User) \
+            .as_scalar()
+
+        query = query.add_columns(permission_ids_subquery)
+
+    row = query.one_or_none()
+
+    if row is None:
+        return None
+
+    user, avatar = row[:2]
+
+    avatar_url = avatar.url if (avatar is not None) else None
+
+    if include_permission_ids:
+        permission_ids = frozenset(row[2] or [])
+    else:
+        permission_ids = None
+
+    return CurrentUserContext(user, avatar_url, permission_ids)
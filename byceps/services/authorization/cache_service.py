@@ -0,0 +1,131 @@
+"""
+byceps.services.authorization.cache_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Versioned cache of the permission IDs assigned to users.
+
+Permission sets are kept in a process-local LRU cache which is backed
+by Redis so that all application processes share them.
+
+Changes to the permissions assigned to roles increment a global version
+number stored in Redis, changes to the roles assigned to a user
+increment a version number specific to that user. Cached entries are
+tagged with the combination of both versions they have been computed
+for, and entries of an outdated version are ignored (and eventually
+expire or get evicted).
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import json
+from typing import FrozenSet, Optional
+
+from flask import has_app_context
+
+from ...redis import redis
+from ...typing import UserID
+from ...util.cache import LRUCache
+
+from .models import PermissionID
+
+
+VERSION_KEY = 'authorization:permissions:version'
+USER_VERSION_KEY_PREFIX = 'authorization:permissions:version:'
+
+# Entries of outdated versions are never read again, so let Redis
+# remove them after a while.
+REDIS_ENTRY_TTL = 60 * 60  # seconds
+
+LOCAL_CACHE_MAXSIZE = 2048
+
+
+_local_cache = LRUCache(LOCAL_CACHE_MAXSIZE)
+
+
+def get_version(user_id: UserID) -> str:
+    """Return the current version of the user's role and permission
+    assignments.
+    """
+    keys = [VERSION_KEY, _get_user_version_key(user_id)]
+    global_version, user_version = redis.client.mget(keys)
+
+    return '{:d}.{:d}'.format(_to_int(global_version), _to_int(user_version))
+
+
+def _to_int(value: Optional[bytes]) -> int:
+    return int(value) if (value is not None) else 0
+
+
+def find_permission_ids(user_id: UserID, version: str
+                       ) -> Optional[FrozenSet[PermissionID]]:
+    """Return the cached permission IDs for the user at that version,
+    or `None` if not cached.
+    """
+    entry = _local_cache.get(user_id)
+    if entry is not None:
+        entry_version, permission_ids = entry
+        if entry_version == version:
+            return permission_ids
+
+    value = redis.client.get(_get_redis_key(user_id, version))
+    if value is None:
+        return None
+
+    permission_ids = frozenset(json.loads(value.decode('utf-8')))
+
+    _local_cache.set(user_id, (version, permission_ids))
+
+    return permission_ids
+
+
+def store_permission_ids(user_id: UserID, version: str,
+                         permission_ids: FrozenSet[PermissionID]) -> None:
+    """Cache the permission IDs for the user at that version.
+
+    The version must have been obtained *before* the permission IDs were
+    fetched from the database so that assignment changes committed in
+    between are not masked.
+    """
+    _local_cache.set(user_id, (version, permission_ids))
+
+    value = json.dumps(sorted(permission_ids))
+    redis.client.set(_get_redis_key(user_id, version), value,
+                     ex=REDIS_ENTRY_TTL)
+
+
+def invalidate() -> None:
+    """Invalidate all cached permission sets.
+
+    To be called after permissions have been assigned to or deassigned
+    from a role (and the change has been committed). This also affects
+    other processes, including those of other applications sharing the
+    Redis instance.
+
+    Without an application (and thus without a Redis connection), only
+    the local cache is cleared.
+    """
+    _local_cache.clear()
+
+    if has_app_context():
+        redis.client.incr(VERSION_KEY)
+
+
+def invalidate_for_user(user_id: UserID) -> None:
+    """Invalidate the cached permission set of that user.
+
+    To be called after roles have been assigned to or deassigned from
+    the user (and the change has been committed).
+    """
+    _local_cache.delete(user_id)
+
+    if has_app_context():
+        redis.client.incr(_get_user_version_key(user_id))
+
+
+def _get_user_version_key(user_id: UserID) -> str:
+    return USER_VERSION_KEY_PREFIX + str(user_id)
+
+
+def _get_redis_key(user_id: UserID, version: str) -> str:
+    return 'authorization:permissions:{}:{}'.format(version, user_id)
@@ -11,6 +11,7 @@ from typing import Dict, FrozenSet, List, Optional, Sequence, Set
 from ...database import db
 from ...typing import UserID
 
+from . import cache_service
 from .models import Permission, PermissionID, Role, RoleID, RolePermission, \
     UserRole
 
@@ -68,6 +69,8 @@ def assign_permission_to_role(permission_id: PermissionID, role_id: RoleID
     db.session.add(role_permission)
     db.session.commit()
 
+    cache_service.invalidate()
+
 
 def deassign_permission_from_role(permission_id: PermissionID, role_id: RoleID
                                  ) -> None:
@@ -80,6 +83,8 @@ def deassign_permission_from_role(permission_id: PermissionID, role_id: RoleID
     db.session.delete(role_permission)
     db.session.commit()
 
+    cache_service.invalidate()
+
 
 def assign_role_to_user(user_id: UserID, role_id: RoleID) -> None:
     """Assign the role to the user."""
@@ -88,6 +93,8 @@ def assign_role_to_user(user_id: UserID, role_id: RoleID) -> None:
     db.session.add(user_role)
     db.session.commit()
 
+    cache_service.invalidate_for_user(user_id)
+
 
 def deassign_role_from_user(user_id: UserID, role_id: RoleID) -> None:
     """Deassign the role from the user."""
@@ -99,6 +106,8 @@ def deassign_role_from_user(user_id: UserID, role_id: RoleID) -> None:
     db.session.delete(user_role)
     db.session.commit()
 
+    cache_service.invalidate_for_user(user_id)
+
 
 def get_permission_ids_for_user(user_id: UserID) -> FrozenSet[PermissionID]:
     """Return the IDs of all permissions the user has through the roles
@@ -113,6 +122,25 @@ def get_permission_ids_for_user(user_id: UserID) -> FrozenSet[PermissionID]:
     return frozenset(rp.permission_id for rp in role_permissions)
 
 
+def get_permission_ids_for_user_cached(user_id: UserID
+                                      ) -> FrozenSet[PermissionID]:
+    """Return the IDs of all permissions the user has through the roles
+    assigned to it.
+
+    Look them up in the permission cache first and only query the
+    database on a cache miss.
+    """
+    version = cache_service.get_version(user_id)
+
+    permission_ids = cache_service.find_permission_ids(user_id, version)
+
+    if permission_ids is None:
+        permission_ids = get_permission_ids_for_user(user_id)
+        cache_service.store_permission_ids(user_id, version, permission_ids)
+
+    return permission_ids
+
+
 def get_all_permissions_with_titles() -> Sequence[Permission]:
     """Return all permissions, with titles."""
     return Permission.query \
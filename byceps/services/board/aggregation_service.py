@@ -2,32 +2,48 @@
 byceps.services.board.aggregation_service
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+Maintain the count and latest fields of topics and categories.
+
+Creating, hiding and un-hiding postings and topics updates the affected
+fields incrementally with atomic statements instead of recounting all
+postings. A full recount (to fix any drift) can be run as a background
+job.
+
 :Copyright: 2006-2018 Jochen Kupperschmidt
 :License: Modified BSD, see LICENSE for details.
 """
 
+from datetime import datetime
+from typing import Optional
+
 from ...database import db
+from ...typing import UserID
+from ...util.jobqueue import enqueue
 
 from .models.category import Category as DbCategory
 from .models.posting import Posting as DbPosting
 from .models.topic import Topic as DbTopic
+from .transfer.models import BoardID, CategoryID
+
+
+# -------------------------------------------------------------------- #
+# full recount
 
 
 def aggregate_category(category: DbCategory) -> None:
     """Update the category's count and latest fields."""
-    topic_count = DbTopic.query.for_category(category.id).without_hidden().count()
+    _aggregate_category(category)
 
-    posting_query = DbPosting.query \
-        .without_hidden() \
-        .join(DbTopic) \
-            .filter_by(category=category)
+    db.session.commit()
 
-    posting_count = posting_query.count()
 
-    latest_posting = posting_query \
-        .filter(DbTopic.hidden == False) \
-        .latest_to_earliest() \
-        .first()
+def _aggregate_category(category: DbCategory) -> None:
+    topic_count = DbTopic.query.for_category(category.id).without_hidden().count()
+
+    posting_count = _get_visible_postings_in_category_query(category.id) \
+        .count()
+
+    latest_posting = _find_latest_visible_posting_in_category(category.id)
 
     category.topic_count = topic_count
     category.posting_count = posting_count
@@ -36,11 +52,17 @@ def aggregate_category(category: DbCategory) -> None:
     category.last_posting_updated_by_id = latest_posting.creator_id \
                                         if latest_posting else None
 
-    db.session.commit()
-
 
 def aggregate_topic(topic: DbTopic) -> None:
     """Update the topic's count and latest fields."""
+    _aggregate_topic(topic)
+
+    db.session.commit()
+
+    aggregate_category(topic.category)
+
+
+def _aggregate_topic(topic: DbTopic) -> None:
     posting_query = DbPosting.query.for_topic(topic.id).without_hidden()
 
     posting_count = posting_query.count()
@@ -52,6 +74,234 @@ def aggregate_topic(topic: DbTopic) -> None:
         topic.last_updated_at = latest_posting.created_at
         topic.last_updated_by_id = latest_posting.creator_id
 
+
+def reconcile_board(board_id: BoardID) -> None:
+    """Recount the count and latest fields of all topics and categories
+    of the board.
+    """
+    categories = DbCategory.query.for_board(board_id).all()
+
+    for category in categories:
+        reconcile_category(category.id)
+
+
+def reconcile_category(category_id: CategoryID) -> None:
+    """Recount the count and latest fields of the category and all of
+    its topics.
+    """
+    category = DbCategory.query.get(category_id)
+
+    topics = DbTopic.query.for_category(category_id).all()
+    for topic in topics:
+        _aggregate_topic(topic)
+
+    _aggregate_category(category)
+
     db.session.commit()
 
-    aggregate_category(topic.category)
+
+def enqueue_board_reconciliation(board_id: BoardID) -> None:
+    """Enqueue a full recount of the board's count and latest fields
+    to be run asynchronously.
+    """
+    enqueue(reconcile_board, board_id)
+
+
+# -------------------------------------------------------------------- #
+# incremental updates
+#
+# These functions expect the change that triggers them to have been
+# flushed, but not committed. The caller commits, so the change and the
+# updated aggregates are persisted together.
+
+
+def increment_for_new_topic(topic: DbTopic, initial_posting: DbPosting
+                           ) -> None:
+    """Include the new topic and its initial posting."""
+    _update_topic(topic, 1, initial_posting.created_at,
+                  initial_posting.creator_id)
+
+    _update_category(topic.category_id, 1, 1, initial_posting.created_at,
+                     initial_posting.creator_id)
+
+
+def increment_for_new_posting(posting: DbPosting) -> None:
+    """Include the new posting."""
+    topic = posting.topic
+
+    _update_topic(topic, 1, posting.created_at, posting.creator_id)
+
+    if topic.hidden:
+        # Postings in hidden topics are counted, but never shown as
+        # the category's latest posting.
+        _update_category(topic.category_id, 0, 1)
+    else:
+        _update_category(topic.category_id, 0, 1, posting.created_at,
+                         posting.creator_id)
+
+
+def decrement_for_hidden_posting(posting: DbPosting) -> None:
+    """Exclude the posting that has just been hidden."""
+    topic = posting.topic
+
+    _update_topic(topic, -1)
+    _update_category(topic.category_id, 0, -1)
+
+    if (topic.last_updated_at is None) \
+            or (posting.created_at >= topic.last_updated_at):
+        _update_topic_latest(topic)
+
+    _update_category_latest_if_outdated(topic.category, posting.created_at)
+
+
+def increment_for_unhidden_posting(posting: DbPosting) -> None:
+    """Include the posting that has just been un-hidden."""
+    topic = posting.topic
+
+    _update_topic(topic, 1, posting.created_at, posting.creator_id)
+
+    if topic.hidden:
+        _update_category(topic.category_id, 0, 1)
+    else:
+        _update_category(topic.category_id, 0, 1, posting.created_at,
+                         posting.creator_id)
+
+
+def decrement_for_hidden_topic(topic: DbTopic) -> None:
+    """Exclude the topic that has just been hidden."""
+    _update_category(topic.category_id, -1, 0)
+
+    _update_category_latest_if_outdated(topic.category, topic.last_updated_at)
+
+
+def increment_for_unhidden_topic(topic: DbTopic) -> None:
+    """Include the topic that has just been un-hidden."""
+    if topic.posting_count > 0:
+        _update_category(topic.category_id, 1, 0, topic.last_updated_at,
+                         topic.last_updated_by_id)
+    else:
+        _update_category(topic.category_id, 1, 0)
+
+
+def _update_topic(topic: DbTopic, posting_count_delta: int,
+                  updated_at: Optional[datetime]=None,
+                  updated_by_id: Optional[UserID]=None) -> None:
+    """Atomically adjust the topic's posting count and, if given and
+    later than the current one, its last update.
+    """
+    values = {
+        DbTopic.posting_count: DbTopic.posting_count + posting_count_delta,
+    }
+
+    if updated_at is not None:
+        is_later = db.or_(
+            DbTopic.last_updated_at == None,
+            DbTopic.last_updated_at <= updated_at)
+        values.update({
+            DbTopic.last_updated_at: _if_later(
+                is_later, updated_at, DbTopic.last_updated_at),
+            DbTopic.last_updated_by_id: _if_later(
+                is_later, updated_by_id, DbTopic.last_updated_by_id),
+        })
+
+    DbTopic.query \
+        .filter_by(id=topic.id) \
+        .update(values, synchronize_session=False)
+
+
+def _update_category(category_id: CategoryID, topic_count_delta: int,
+                     posting_count_delta: int,
+                     posting_created_at: Optional[datetime]=None,
+                     posting_creator_id: Optional[UserID]=None) -> None:
+    """Atomically adjust the category's counts and, if given and later
+    than the current one, its latest posting.
+    """
+    values = {
+        DbCategory.topic_count: DbCategory.topic_count + topic_count_delta,
+        DbCategory.posting_count:
+            DbCategory.posting_count + posting_count_delta,
+    }
+
+    if posting_created_at is not None:
+        is_later = db.or_(
+            DbCategory.last_posting_updated_at == None,
+            DbCategory.last_posting_updated_at <= posting_created_at)
+        values.update({
+            DbCategory.last_posting_updated_at: _if_later(
+                is_later, posting_created_at,
+                DbCategory.last_posting_updated_at),
+            DbCategory.last_posting_updated_by_id: _if_later(
+                is_later, posting_creator_id,
+                DbCategory.last_posting_updated_by_id),
+        })
+
+    DbCategory.query \
+        .filter_by(id=category_id) \
+        .update(values, synchronize_session=False)
+
+
+def _if_later(is_later, new_value, current_value):
+    return db.case([(is_later, new_value)], else_=current_value)
+
+
+def _update_topic_latest(topic: DbTopic) -> None:
+    """Look up the topic's latest visible posting again."""
+    latest_posting = DbPosting.query \
+        .for_topic(topic.id) \
+        .without_hidden() \
+        .latest_to_earliest() \
+        .first()
+
+    if latest_posting is None:
+        return
+
+    DbTopic.query \
+        .filter_by(id=topic.id) \
+        .update({
+            DbTopic.last_updated_at: latest_posting.created_at,
+            DbTopic.last_updated_by_id: latest_posting.creator_id,
+        }, synchronize_session=False)
+
+
+def _update_category_latest_if_outdated(category: DbCategory,
+                                        removed_created_at: Optional[datetime]
+                                       ) -> None:
+    """Look up the category's latest visible posting again, but only if
+    the posting (or topic) that has been removed from view might have
+    been it.
+    """
+    last_posting_updated_at = category.last_posting_updated_at
+    if (last_posting_updated_at is not None) \
+            and (removed_created_at is not None) \
+            and (removed_created_at < last_posting_updated_at):
+        return
+
+    latest_posting = _find_latest_visible_posting_in_category(category.id)
+
+    DbCategory.query \
+        .filter_by(id=category.id) \
+        .update({
+            DbCategory.last_posting_updated_at:
+                latest_posting.created_at if latest_posting else None,
+            DbCategory.last_posting_updated_by_id:
+                latest_posting.creator_id if latest_posting else None,
+        }, synchronize_session=False)
+
+
+# -------------------------------------------------------------------- #
+# helpers
+
+
+def _get_visible_postings_in_category_query(category_id: CategoryID):
+    return DbPosting.query \
+        .without_hidden() \
+        .join(DbTopic) \
+            .filter(DbTopic.category_id == category_id)
+
+
+def _find_latest_visible_posting_in_category(category_id: CategoryID
+                                            ) -> Optional[DbPosting]:
+    return _get_visible_postings_in_category_query(category_id) \
+        .filter(DbTopic.hidden == False) \
+        .latest_to_earliest() \
+        .first()
@@ -0,0 +1,289 @@
+"""
+byceps.services.board.last_view_buffer_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Buffer users' last views of board categories and topics in Redis and
+write them to the database in bulk later on (write-behind).
+
+Every user has a hash per kind of view in Redis that maps category or
+topic IDs to the time of the last view. The IDs of users with buffered
+views are collected in a set so that the flush does not have to scan
+for keys.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from flask import current_app, has_app_context
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+
+from ...database import db
+from ...redis import redis
+from ...typing import UserID
+
+from .models.last_category_view import LastCategoryView
+from .models.last_topic_view import LastTopicView
+from .transfer.models import CategoryID, TopicID
+
+
+KEY_DIRTY_USER_IDS = 'board:last_views:user_ids'
+KEY_PREFIX_CATEGORY_VIEWS = 'board:last_category_views:'
+KEY_PREFIX_TOPIC_VIEWS = 'board:last_topic_views:'
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def is_enabled() -> bool:
+    """Return `True` if last views are to be buffered."""
+    return has_app_context() \
+        and current_app.config['BOARD_LAST_VIEWS_WRITE_BEHIND']
+
+
+# -------------------------------------------------------------------- #
+# recording
+
+
+def buffer_category_view(category_id: CategoryID, user_id: UserID,
+                         occurred_at: datetime) -> None:
+    """Buffer the user's view of the category."""
+    _buffer_view(KEY_PREFIX_CATEGORY_VIEWS, category_id, user_id, occurred_at)
+
+
+def buffer_topic_view(topic_id: TopicID, user_id: UserID,
+                      occurred_at: datetime) -> None:
+    """Buffer the user's view of the topic."""
+    _buffer_view(KEY_PREFIX_TOPIC_VIEWS, topic_id, user_id, occurred_at)
+
+
+def _buffer_view(key_prefix: str, id: UUID, user_id: UserID,
+                 occurred_at: datetime) -> None:
+    pipeline = redis.client.pipeline()
+    pipeline.hset(key_prefix + str(user_id), str(id),
+                  occurred_at.strftime(TIMESTAMP_FORMAT))
+    pipeline.sadd(KEY_DIRTY_USER_IDS, str(user_id))
+    pipeline.execute()
+
+
+# -------------------------------------------------------------------- #
+# lookup
+
+
+def get_buffered_category_views(category_ids: Set[CategoryID],
+                                user_id: UserID
+                               ) -> Dict[CategoryID, datetime]:
+    """Return the buffered times the user viewed the categories.
+
+    Categories without buffered views are not included.
+    """
+    return _get_buffered_views(KEY_PREFIX_CATEGORY_VIEWS, category_ids,
+                               user_id)
+
+
+def get_buffered_topic_views(topic_ids: Set[TopicID], user_id: UserID
+                            ) -> Dict[TopicID, datetime]:
+    """Return the buffered times the user viewed the topics.
+
+    Topics without buffered views are not included.
+    """
+    return _get_buffered_views(KEY_PREFIX_TOPIC_VIEWS, topic_ids, user_id)
+
+
+def _get_buffered_views(key_prefix: str, ids: Set[UUID], user_id: UserID
+                       ) -> Dict[UUID, datetime]:
+    if not ids:
+        return {}
+
+    ids = list(ids)
+    fields = [str(id) for id in ids]
+    values = redis.client.hmget(key_prefix + str(user_id), fields)
+
+    return {id: _parse_timestamp(value)
+            for id, value in zip(ids, values)
+            if value is not None}
+
+
+def merge_view_times(*view_times: Dict[UUID, datetime]
+                    ) -> Dict[UUID, datetime]:
+    """Merge the mappings of view times, keeping the latest time per ID."""
+    merged = {}  # type: Dict[UUID, datetime]
+
+    for mapping in view_times:
+        for id, occurred_at in mapping.items():
+            merged[id] = latest(merged.get(id), occurred_at)
+
+    return merged
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """Return the latest of the timestamps, or `None` if none is given."""
+    given = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(given) if given else None
+
+
+# -------------------------------------------------------------------- #
+# flushing
+
+
+def flush() -> int:
+    """Write all buffered views to the database.
+
+    Views are only removed from the buffer once they have been
+    committed. Views that can never be written (e.g. because the
+    category or topic has been deleted meanwhile) are dropped. If
+    writing a user's views fails otherwise, they stay buffered (to be
+    tried again on the next flush) and the other users' views are
+    written nonetheless.
+
+    Return the number of users whose views have been written.
+    """
+    user_count = 0
+
+    for user_id_bytes in redis.client.smembers(KEY_DIRTY_USER_IDS):
+        user_id = UUID(user_id_bytes.decode('utf-8'))
+
+        try:
+            _flush_views_of_user(user_id)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(
+                'Flushing board last views of user %s failed: %s', user_id, e)
+            continue
+
+        user_count += 1
+
+    return user_count
+
+
+def _flush_views_of_user(user_id: UserID) -> None:
+    category_key = KEY_PREFIX_CATEGORY_VIEWS + str(user_id)
+    topic_key = KEY_PREFIX_TOPIC_VIEWS + str(user_id)
+
+    pipeline = redis.client.pipeline(transaction=True)
+    pipeline.hgetall(category_key)
+    pipeline.hgetall(topic_key)
+    category_values, topic_values = pipeline.execute()
+
+    views_by_table = [
+        (LastCategoryView.__table__, 'category_id',
+         _parse_views(category_values)),
+        (LastTopicView.__table__, 'topic_id', _parse_views(topic_values)),
+    ]
+
+    try:
+        for table, id_column_name, views in views_by_table:
+            _upsert_views(table, id_column_name, user_id, views)
+        db.session.commit()
+    except (DataError, IntegrityError):
+        db.session.rollback()
+        _upsert_views_separately(user_id, views_by_table)
+
+    _remove_flushed_views(user_id, category_key, category_values, topic_key,
+                          topic_values)
+
+
+# Keys: category views hash, topic views hash, dirty user IDs set
+# Args: user ID, number of category views, then field and value of each
+#       category view followed by those of each topic view
+#
+# Views that have been buffered again in the meantime (and thus have a
+# different value now) are kept.
+_REMOVE_FLUSHED_VIEWS_SCRIPT = """
+local category_key, topic_key, user_ids_key = unpack(KEYS)
+local user_id = ARGV[1]
+local topic_args_start = 3 + tonumber(ARGV[2]) * 2
+
+for i = 3, #ARGV, 2 do
+    local key = category_key
+    if i >= topic_args_start then
+        key = topic_key
+    end
+
+    if redis.call('HGET', key, ARGV[i]) == ARGV[i + 1] then
+        redis.call('HDEL', key, ARGV[i])
+    end
+end
+
+local remaining = redis.call('EXISTS', category_key)
+                  + redis.call('EXISTS', topic_key)
+if remaining == 0 then
+    redis.call('SREM', user_ids_key, user_id)
+end
+"""
+
+
+def _remove_flushed_views(user_id: UserID, category_key: str,
+                          category_values: Dict[bytes, bytes],
+                          topic_key: str, topic_values: Dict[bytes, bytes]
+                         ) -> None:
+    """Remove the written views from the buffer, unless they have
+    changed in the meantime, and unmark the user if no views are left.
+    """
+    keys = [category_key, topic_key, KEY_DIRTY_USER_IDS]
+
+    args = [str(user_id), len(category_values)]
+    for values in category_values, topic_values:
+        for field, value in values.items():
+            args.extend([field, value])
+
+    redis.client.eval(_REMOVE_FLUSHED_VIEWS_SCRIPT, len(keys), *keys, *args)
+
+
+def _upsert_views_separately(user_id: UserID, views_by_table) -> None:
+    """Write each view on its own, dropping those that cannot be
+    written so they do not hold back the user's other views forever.
+    """
+    for table, id_column_name, views in views_by_table:
+        for id, occurred_at in views.items():
+            try:
+                with db.session.begin_nested():
+                    _upsert_views(table, id_column_name, user_id,
+                                  {id: occurred_at})
+            except (DataError, IntegrityError) as e:
+                current_app.logger.warning(
+                    'Dropping buffered board last view of %s by user %s: %s',
+                    id, user_id, e)
+
+    db.session.commit()
+
+
+def _upsert_views(table, id_column_name: str, user_id: UserID,
+                  views: Dict[UUID, datetime]) -> None:
+    """Insert or update the views with a single statement.
+
+    Existing views are only updated if the buffered view is later.
+    """
+    if not views:
+        return
+
+    rows = [
+        {'user_id': user_id, id_column_name: id, 'occurred_at': occurred_at}
+        for id, occurred_at in views.items()
+    ]
+
+    insert_stmt = insert(table).values(rows)
+    upsert_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=['user_id', id_column_name],
+        set_={
+            'occurred_at': db.func.greatest(table.c.occurred_at,
+                                            insert_stmt.excluded.occurred_at),
+        })
+
+    db.session.execute(upsert_stmt)
+
+
+# -------------------------------------------------------------------- #
+# helpers
+
+
+def _parse_views(values: Dict[bytes, bytes]) -> Dict[UUID, datetime]:
+    return {UUID(id.decode('utf-8')): _parse_timestamp(value)
+            for id, value in values.items()}
+
+
+def _parse_timestamp(value: bytes) -> datetime:
+    return datetime.strptime(value.decode('utf-8'), TIMESTAMP_FORMAT)
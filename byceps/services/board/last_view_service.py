@@ -7,15 +7,18 @@ byceps.services.board.last_view_service
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Set
+
+from sqlalchemy.dialects.postgresql import insert
 
 from ...database import db
 from ...typing import UserID
 
+from . import last_view_buffer_service
+from .last_view_buffer_service import latest
 from .models.last_category_view import LastCategoryView
 from .models.last_topic_view import LastTopicView
 from .models.topic import Topic as DbTopic
-from . import topic_service
 from .transfer.models import CategoryID, CategoryWithLastUpdate, TopicID
 
 
@@ -32,12 +35,22 @@ def contains_category_unseen_postings(category: CategoryWithLastUpdate,
     if category.last_posting_updated_at is None:
         return False
 
-    last_view = find_last_category_view(user_id, category.id)
+    last_viewed_at = find_category_last_viewed_at(category.id, user_id)
+
+    return contains_category_postings_created_after(category, last_viewed_at)
 
-    if last_view is None:
-        return True
 
-    return category.last_posting_updated_at > last_view.occurred_at
+def contains_category_postings_created_after(
+        category: CategoryWithLastUpdate, last_viewed_at: Optional[datetime]
+        ) -> bool:
+    """Return `True` if the category contains postings created after
+    that time (or at all, if no time is given).
+    """
+    if category.last_posting_updated_at is None:
+        return False
+
+    return (last_viewed_at is None) \
+        or (category.last_posting_updated_at > last_viewed_at)
 
 
 def find_last_category_view(user_id: UserID, category_id: CategoryID
@@ -48,6 +61,50 @@ def find_last_category_view(user_id: UserID, category_id: CategoryID
         .first()
 
 
+def find_category_last_viewed_at(category_id: CategoryID, user_id: UserID
+                                ) -> Optional[datetime]:
+    """Return the time the category was last viewed by the user (or
+    nothing, if it hasn't been viewed by the user yet).
+    """
+    last_view = find_last_category_view(user_id, category_id)
+    last_viewed_at = last_view.occurred_at if (last_view is not None) else None
+
+    if last_view_buffer_service.is_enabled():
+        buffered_views = last_view_buffer_service.get_buffered_category_views(
+            {category_id}, user_id)
+        last_viewed_at = latest(last_viewed_at,
+                                buffered_views.get(category_id))
+
+    return last_viewed_at
+
+
+def find_categories_last_viewed_at(category_ids: Set[CategoryID],
+                                   user_id: UserID
+                                  ) -> Dict[CategoryID, datetime]:
+    """Return the times the categories were last viewed by the user.
+
+    Categories that haven't been viewed by the user yet are not included.
+    """
+    if not category_ids:
+        return {}
+
+    rows = db.session \
+        .query(LastCategoryView.category_id, LastCategoryView.occurred_at) \
+        .filter_by(user_id=user_id) \
+        .filter(LastCategoryView.category_id.in_(category_ids)) \
+        .all()
+
+    last_viewed_ats = dict(rows)
+
+    if last_view_buffer_service.is_enabled():
+        buffered_views = last_view_buffer_service.get_buffered_category_views(
+            category_ids, user_id)
+        last_viewed_ats = last_view_buffer_service.merge_view_times(
+            last_viewed_ats, buffered_views)
+
+    return last_viewed_ats
+
+
 def mark_category_as_just_viewed(category_id: CategoryID, user_id: UserID
                                 ) -> None:
     """Mark the category as last viewed by the user (if logged in) at
@@ -55,6 +112,11 @@ def mark_category_as_just_viewed(category_id: CategoryID, user_id: UserID
     """
     now = datetime.now()
 
+    if last_view_buffer_service.is_enabled():
+        last_view_buffer_service.buffer_category_view(category_id, user_id,
+                                                      now)
+        return
+
     last_view = find_last_category_view(user_id, category_id)
 
     if last_view is not None:
@@ -76,6 +138,15 @@ def contains_topic_unseen_postings(topic: DbTopic, user_id: UserID) -> bool:
     """
     last_viewed_at = find_topic_last_viewed_at(topic.id, user_id)
 
+    return contains_topic_postings_created_after(topic, last_viewed_at)
+
+
+def contains_topic_postings_created_after(topic: DbTopic,
+                                          last_viewed_at: Optional[datetime]
+                                         ) -> bool:
+    """Return `True` if the topic contains postings created after that
+    time (or at all, if no time is given).
+    """
     return last_viewed_at is None \
         or topic.last_updated_at > last_viewed_at
 
@@ -94,7 +165,40 @@ def find_topic_last_viewed_at(topic_id: TopicID, user_id: UserID
     nothing, if it hasn't been viewed by the user yet).
     """
     last_view = find_last_topic_view(user_id, topic_id)
-    return last_view.occurred_at if (last_view is not None) else None
+    last_viewed_at = last_view.occurred_at if (last_view is not None) else None
+
+    if last_view_buffer_service.is_enabled():
+        buffered_views = last_view_buffer_service.get_buffered_topic_views(
+            {topic_id}, user_id)
+        last_viewed_at = latest(last_viewed_at, buffered_views.get(topic_id))
+
+    return last_viewed_at
+
+
+def find_topics_last_viewed_at(topic_ids: Set[TopicID], user_id: UserID
+                              ) -> Dict[TopicID, datetime]:
+    """Return the times the topics were last viewed by the user.
+
+    Topics that haven't been viewed by the user yet are not included.
+    """
+    if not topic_ids:
+        return {}
+
+    rows = db.session \
+        .query(LastTopicView.topic_id, LastTopicView.occurred_at) \
+        .filter_by(user_id=user_id) \
+        .filter(LastTopicView.topic_id.in_(topic_ids)) \
+        .all()
+
+    last_viewed_ats = dict(rows)
+
+    if last_view_buffer_service.is_enabled():
+        buffered_views = last_view_buffer_service.get_buffered_topic_views(
+            topic_ids, user_id)
+        last_viewed_ats = last_view_buffer_service.merge_view_times(
+            last_viewed_ats, buffered_views)
+
+    return last_viewed_ats
 
 
 def mark_topic_as_just_viewed(topic_id: TopicID, user_id: UserID) -> None:
@@ -103,6 +207,10 @@ def mark_topic_as_just_viewed(topic_id: TopicID, user_id: UserID) -> None:
     """
     now = datetime.now()
 
+    if last_view_buffer_service.is_enabled():
+        last_view_buffer_service.buffer_topic_view(topic_id, user_id, now)
+        return
+
     last_view = find_last_topic_view(user_id, topic_id)
 
     if last_view is not None:
@@ -119,29 +227,27 @@ def mark_topic_as_just_viewed(topic_id: TopicID, user_id: UserID) -> None:
 
 def mark_all_topics_in_category_as_viewed(category_id: CategoryID,
                                           user_id: UserID) -> None:
-    """Mark all topics in the category as viewed."""
-    topic_ids = topic_service.get_all_topic_ids_in_category(category_id)
-
-    if not topic_ids:
-        return
+    """Mark all topics in the category as viewed.
 
+    Last views are inserted or updated for all of the category's topics
+    with a single statement.
+    """
     now = datetime.now()
 
-    # Fetch existing last views.
-    last_views = LastTopicView.query \
-        .filter_by(user_id=user_id) \
-        .filter(LastTopicView.topic_id.in_(topic_ids)) \
-        .all()
-
-    # Update existing last views.
-    for last_view in last_views:
-        last_view.occurred_at = now
-
-    # Create last views for remaining topics.
-    last_view_topic_ids = {last_view.topic_id for last_view in last_views}
-    remaining_topic_ids = topic_ids - last_view_topic_ids
-    for topic_id in remaining_topic_ids:
-        last_view = LastTopicView(user_id, topic_id, now)
-        db.session.add(last_view)
-
+    topic_rows = db.select([
+            db.cast(user_id, db.Uuid()),
+            DbTopic.id,
+            db.cast(now, db.DateTime),
+        ]) \
+        .where(DbTopic.category_id == category_id)
+
+    insert_stmt = insert(LastTopicView.__table__) \
+        .from_select(['user_id', 'topic_id', 'occurred_at'], topic_rows)
+    upsert_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=['user_id', 'topic_id'],
+        set_={
+            'occurred_at': insert_stmt.excluded.occurred_at,
+        })
+
+    db.session.execute(upsert_stmt)
     db.session.commit()
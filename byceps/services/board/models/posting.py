@@ -49,6 +49,9 @@ class PostingQuery(BaseQuery):
 class Posting(db.Model):
     """A posting."""
     __tablename__ = 'board_postings'
+    __table_args__ = (
+        db.Index('ix_board_postings_topic_id_created_at', 'topic_id', 'created_at'),
+    )
     query_class = PostingQuery
 
     id = db.Column(db.Uuid, default=generate_uuid, primary_key=True)
@@ -58,6 +61,7 @@ class Posting(db.Model):
     creator_id = db.Column(db.Uuid, db.ForeignKey('users.id'), nullable=False)
     creator = db.relationship(User, foreign_keys=[creator_id])
     body = db.Column(db.UnicodeText, nullable=False)
+    body_html = db.Column(db.UnicodeText, nullable=True)
     last_edited_at = db.Column(db.DateTime)
     last_edited_by_id = db.Column(db.Uuid, db.ForeignKey('users.id'))
     last_edited_by = db.relationship(User, foreign_keys=[last_edited_by_id])
@@ -13,11 +13,11 @@ from flask_sqlalchemy import Pagination
 
 from ...database import db
 from ...typing import UserID
-from ...util.iterables import index_of
 
+from ..text_markup.service import prerender_html
 from ..user.models.user import User
 
-from .aggregation_service import aggregate_topic
+from . import aggregation_service
 from .models.category import Category as DbCategory
 from .models.posting import Posting as DbPosting
 from .models.topic import Topic as DbTopic
@@ -57,10 +57,13 @@ def paginate_postings(topic_id: TopicID, user: User, page: int,
 def create_posting(topic: DbTopic, creator_id: UserID, body: str) -> DbPosting:
     """Create a posting in that topic."""
     posting = DbPosting(topic, creator_id, body)
+    posting.body_html = prerender_html(body)
     db.session.add(posting)
-    db.session.commit()
+    db.session.flush()
+
+    aggregation_service.increment_for_new_posting(posting)
 
-    aggregate_topic(topic)
+    db.session.commit()
 
     return posting
 
@@ -69,6 +72,7 @@ def update_posting(posting: DbPosting, editor_id: UserID, body: str, *,
                    commit: bool=True) -> None:
     """Update the posting."""
     posting.body = body.strip()
+    posting.body_html = prerender_html(posting.body)
     posting.last_edited_at = datetime.now()
     posting.last_edited_by_id = editor_id
     posting.edit_count += 1
@@ -82,15 +86,12 @@ def calculate_posting_page_number(posting: DbPosting, user: User,
     """Return the number of the page the posting should appear on when
     viewed by the user.
     """
-    topic_postings = DbPosting.query \
+    # Count the postings before this one instead of loading them all.
+    index = DbPosting.query \
         .for_topic(posting.topic_id) \
         .only_visible_for_user(user) \
-        .earliest_to_latest() \
-        .all()
-
-    index = index_of(lambda p: p == posting, topic_postings)
-    if index is None:
-        return 1  # Shouldn't happen.
+        .filter(DbPosting.created_at < posting.created_at) \
+        .count()
 
     return divmod(index, postings_per_page)[0] + 1
 
@@ -100,9 +101,11 @@ def hide_posting(posting: DbPosting, hidden_by_id: UserID) -> None:
     posting.hidden = True
     posting.hidden_at = datetime.now()
     posting.hidden_by_id = hidden_by_id
-    db.session.commit()
+    db.session.flush()
+
+    aggregation_service.decrement_for_hidden_posting(posting)
 
-    aggregate_topic(posting.topic)
+    db.session.commit()
 
 
 def unhide_posting(posting: DbPosting, unhidden_by_id: UserID) -> None:
@@ -111,6 +114,8 @@ def unhide_posting(posting: DbPosting, unhidden_by_id: UserID) -> None:
     posting.hidden = False
     posting.hidden_at = None
     posting.hidden_by_id = None
-    db.session.commit()
+    db.session.flush()
+
+    aggregation_service.increment_for_unhidden_posting(posting)
 
-    aggregate_topic(posting.topic)
+    db.session.commit()
@@ -7,16 +7,17 @@ byceps.services.board.topic_service
 """
 
 from datetime import datetime
-from typing import Optional, Set
+from typing import Optional
 
 from flask_sqlalchemy import Pagination
 
 from ...database import db
 from ...typing import UserID
 
+from ..text_markup.service import prerender_html
 from ..user.models.user import User
 
-from .aggregation_service import aggregate_category, aggregate_topic
+from . import aggregation_service
 from .models.category import Category as DbCategory
 from .models.posting import InitialTopicPostingAssociation, Posting as DbPosting
 from .models.topic import Topic as DbTopic
@@ -50,16 +51,6 @@ def find_topic_visible_for_user(topic_id: TopicID, user: User
         .first()
 
 
-def get_all_topic_ids_in_category(category_id: CategoryID) -> Set[TopicID]:
-    """Return the IDs of all topics in the category."""
-    rows = db.session \
-        .query(DbTopic.id) \
-        .filter(DbTopic.category_id == category_id) \
-        .all()
-
-    return {row[0] for row in rows}
-
-
 def paginate_topics(category_id: CategoryID, user: User, page: int,
                     topics_per_page: int) -> Pagination:
     """Paginate topics in that category, as visible for the user.
@@ -86,15 +77,18 @@ def create_topic(category_id: CategoryID, creator_id: UserID, title: str,
     """Create a topic with an initial posting in that category."""
     topic = DbTopic(category_id, creator_id, title)
     posting = DbPosting(topic, creator_id, body)
+    posting.body_html = prerender_html(body)
     initial_topic_posting_association = InitialTopicPostingAssociation(topic,
                                                                        posting)
 
     db.session.add(topic)
     db.session.add(posting)
     db.session.add(initial_topic_posting_association)
-    db.session.commit()
+    db.session.flush()
+
+    aggregation_service.increment_for_new_topic(topic, posting)
 
-    aggregate_topic(topic)
+    db.session.commit()
 
     return topic
 
@@ -146,9 +140,11 @@ def hide_topic(topic: DbTopic, hidden_by_id: UserID) -> None:
     topic.hidden = True
     topic.hidden_at = datetime.now()
     topic.hidden_by_id = hidden_by_id
-    db.session.commit()
+    db.session.flush()
+
+    aggregation_service.decrement_for_hidden_topic(topic)
 
-    aggregate_topic(topic)
+    db.session.commit()
 
 
 def unhide_topic(topic: DbTopic, unhidden_by_id: UserID) -> None:
@@ -157,9 +153,11 @@ def unhide_topic(topic: DbTopic, unhidden_by_id: UserID) -> None:
     topic.hidden = False
     topic.hidden_at = None
     topic.hidden_by_id = None
-    db.session.commit()
+    db.session.flush()
+
+    aggregation_service.increment_for_unhidden_topic(topic)
 
-    aggregate_topic(topic)
+    db.session.commit()
 
 
 def lock_topic(topic: DbTopic, locked_by_id: UserID) -> None:
@@ -205,4 +203,4 @@ def move_topic(topic: DbTopic, new_category_id: CategoryID) -> None:
     db.session.commit()
 
     for category in old_category, new_category:
-        aggregate_category(category)
+        aggregation_service.aggregate_category(category)
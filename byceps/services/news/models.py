@@ -116,6 +116,7 @@ class ItemVersion(db.Model):
     creator = db.relationship(User)
     title = db.Column(db.Unicode(80))
     body = db.Column(db.UnicodeText, nullable=False)
+    body_html = db.Column(db.UnicodeText, nullable=True)
     image_url_path = db.Column(db.Unicode(80), nullable=True)
 
     def __init__(self, item: Item, creator_id: UserID, title: str, body: str
@@ -133,6 +134,15 @@ class ItemVersion(db.Model):
         return self.id == self.item.current_version.id
 
     def render_body(self) -> str:
+        """Return the stored rendered body, or render it if none has
+        been stored.
+        """
+        if self.body_html is not None:
+            return self.body_html
+
+        return self.render_body_from_source()
+
+    def render_body_from_source(self) -> str:
         template = load_template(self.body)
         return template.render(url_for=url_for)
 
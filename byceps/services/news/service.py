@@ -9,11 +9,14 @@ byceps.services.news.service
 from typing import Dict, Optional
 
 from flask_sqlalchemy import Pagination
+from jinja2 import TemplateError
+from werkzeug.routing import BuildError
 
 from ...database import db
 from ...typing import BrandID, UserID
 
 from ..brand.models.brand import Brand
+from ..text_markup.service import is_storing_rendered_html_enabled
 
 from .models import CurrentVersionAssociation, Item, ItemID, ItemVersion, \
     ItemVersionID
@@ -60,9 +63,27 @@ def _create_version(item: Item, creator_id: UserID, title: str, body: str, *,
     if image_url_path:
         version.image_url_path = image_url_path
 
+    version.body_html = prerender_body(version)
+
     return version
 
 
+def prerender_body(version: ItemVersion) -> Optional[str]:
+    """Render the version's body to be stored alongside it.
+
+    Return `None` if rendered HTML is not to be stored or if the body
+    fails to render (it is then rendered, and the error shows up, on
+    display).
+    """
+    if not is_storing_rendered_html_enabled():
+        return None
+
+    try:
+        return version.render_body_from_source()
+    except (BuildError, TemplateError):
+        return None
+
+
 def find_item(item_id: ItemID) -> Optional[Item]:
     """Return the item with that id, or `None` if not found."""
     return Item.query.get(item_id)
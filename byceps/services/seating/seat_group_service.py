@@ -15,6 +15,7 @@ from ..ticketing.models.ticket import Ticket
 from ..ticketing.models.ticket_bundle import TicketBundle
 from ..ticketing.transfer.models import TicketCategoryID
 
+from . import seat_map_service
 from .models.seat import Seat
 from .models.seat_group import Occupancy as SeatGroupOccupancy, SeatGroup, \
     SeatGroupAssignment
@@ -60,8 +61,12 @@ def occupy_seat_group(seat_group: SeatGroup, ticket_bundle: TicketBundle
 
     _occupy_seats(seats, tickets)
 
+    changed_seat_ids = {seat.id for seat in seats}
+
     db.session.commit()
 
+    seat_map_service.update_occupancy(changed_seat_ids)
+
     return occupancy
 
 
@@ -77,12 +82,19 @@ def switch_seat_group(occupancy: SeatGroupOccupancy, to_group: SeatGroup
     _ensure_quantities_match(to_group, ticket_bundle)
     _ensure_actual_quantities_match(seats, tickets)
 
+    previous_seat_ids = {ticket.occupied_seat_id for ticket in tickets
+                         if ticket.occupied_seat_id is not None}
+
     occupancy.seat_group_id = to_group.id
 
     _occupy_seats(seats, tickets)
 
+    changed_seat_ids = previous_seat_ids | {seat.id for seat in seats}
+
     db.session.commit()
 
+    seat_map_service.update_occupancy(changed_seat_ids)
+
 
 def _ensure_group_is_available(seat_group: SeatGroup) -> None:
     """Raise an error if the seat group is occupied."""
@@ -140,13 +152,20 @@ def release_seat_group(seat_group: SeatGroup) -> None:
     if not seat_group.is_occupied():
         raise ValueError('Seat group is not occupied.')
 
-    for ticket in seat_group.occupancy.ticket_bundle.tickets:
+    tickets = seat_group.occupancy.ticket_bundle.tickets
+
+    changed_seat_ids = {ticket.occupied_seat_id for ticket in tickets
+                        if ticket.occupied_seat_id is not None}
+
+    for ticket in tickets:
         ticket.occupied_seat = None
 
     db.session.delete(seat_group.occupancy)
 
     db.session.commit()
 
+    seat_map_service.update_occupancy(changed_seat_ids)
+
 
 def count_seat_groups_for_party(party_id: PartyID) -> int:
     """Return the number of seat groups for that party."""
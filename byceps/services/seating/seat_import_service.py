@@ -0,0 +1,294 @@
+"""
+byceps.services.seating.seat_import_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Import the layout of a seating area's seats in bulk.
+
+Seats are read from CSV or JSON, or generated as a grid of rows and
+columns. They are validated as a whole (against each other and against
+the seats already in the area) before any of them is inserted, and
+then inserted with multi-row statements in a single transaction.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from collections import namedtuple
+import csv
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, \
+    Tuple
+from uuid import UUID
+
+from ...database import db, generate_uuid
+from ...typing import PartyID
+from ...util.iterables import chunked
+
+from ..ticketing.models.category import Category
+from ..ticketing.transfer.models import TicketCategoryID
+
+from . import seat_map_service
+from .models.area import Area
+from .models.seat import Seat
+from .transfer.models import AreaID
+
+
+# Number of seats to insert per statement
+INSERT_BATCH_SIZE = 1000
+
+LABEL_MAX_LENGTH = 40
+
+
+SeatToImport = namedtuple('SeatToImport',
+                          'coord_x, coord_y, label, category_id')
+
+
+class InvalidSeatLayout(Exception):
+
+    def __init__(self, errors: Sequence[str]) -> None:
+        super().__init__('\n'.join(errors))
+        self.errors = errors
+
+
+# -------------------------------------------------------------------- #
+# parsing
+
+
+def parse_seats_from_csv(lines: Iterable[str],
+                         default_category_id: Optional[TicketCategoryID]=None
+                        ) -> List[SeatToImport]:
+    """Parse seats from CSV data with a header line naming the columns
+    `x`, `y`, `label` (optional) and `category_id` (optional if a
+    default category is given).
+
+    Raise `InvalidSeatLayout` if any row cannot be parsed.
+    """
+    rows = csv.DictReader(lines)
+
+    # Line 1 is the header.
+    numbered_rows = enumerate(rows, 2)
+
+    return _parse_seats(numbered_rows, 'Line', default_category_id)
+
+
+def parse_seats_from_json(data: str,
+                          default_category_id: Optional[TicketCategoryID]=None
+                         ) -> List[SeatToImport]:
+    """Parse seats from a JSON array of objects with the keys `x`, `y`,
+    `label` (optional) and `category_id` (optional if a default category
+    is given).
+
+    Raise `InvalidSeatLayout` if the data or any object cannot be parsed.
+    """
+    try:
+        objects = json.loads(data)
+    except ValueError as e:
+        raise InvalidSeatLayout(['Invalid JSON: {}'.format(e)])
+
+    if not isinstance(objects, list) \
+            or not all(isinstance(obj, dict) for obj in objects):
+        raise InvalidSeatLayout(['Expected an array of objects.'])
+
+    numbered_objects = enumerate(objects)
+
+    return _parse_seats(numbered_objects, 'Index', default_category_id)
+
+
+def _parse_seats(numbered_values: Iterable[Tuple[int, Dict[str, Any]]],
+                 position_name: str,
+                 default_category_id: Optional[TicketCategoryID]
+                ) -> List[SeatToImport]:
+    seats = []
+    errors = []
+
+    for number, values in numbered_values:
+        try:
+            seat = _parse_seat(values, default_category_id)
+        except ValueError as e:
+            errors.append('{} {}: {}'.format(position_name, number, e))
+            continue
+
+        seats.append(seat)
+
+    if errors:
+        raise InvalidSeatLayout(errors)
+
+    return seats
+
+
+def _parse_seat(values: Dict[str, Any],
+                default_category_id: Optional[TicketCategoryID]
+               ) -> SeatToImport:
+    coord_x = _parse_coordinate(values.get('x'), 'x')
+    coord_y = _parse_coordinate(values.get('y'), 'y')
+
+    label = values.get('label') or None
+    if (label is not None) and not isinstance(label, str):
+        raise ValueError('Invalid label "{}".'.format(label))
+
+    category_id = values.get('category_id') or default_category_id
+    if not category_id:
+        raise ValueError('No category given.')
+
+    try:
+        category_id = UUID(str(category_id))
+    except ValueError:
+        raise ValueError('Invalid category ID "{}".'.format(category_id))
+
+    return SeatToImport(coord_x, coord_y, label, category_id)
+
+
+def _parse_coordinate(value: Any, name: str) -> int:
+    if isinstance(value, str):
+        value = value.strip()
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid {} coordinate "{}".'.format(name, value))
+
+
+# -------------------------------------------------------------------- #
+# generation
+
+
+def generate_grid(rows: int, columns: int, category_id: TicketCategoryID,
+                  *, origin_x: int=0, origin_y: int=0, spacing_x: int=1,
+                  spacing_y: int=1, label_format: str='{row_letter}{column}'
+                 ) -> List[SeatToImport]:
+    """Generate seats in rows and columns.
+
+    The label format may refer to the (1-based) `row` and `column`
+    numbers as well as to the `row_letter` (A to Z, then AA and so on).
+    """
+    if rows < 1 or columns < 1:
+        raise ValueError('At least one row and one column are required.')
+
+    seats = []
+
+    for row in range(1, rows + 1):
+        row_letter = _to_letters(row)
+
+        for column in range(1, columns + 1):
+            coord_x = origin_x + (column - 1) * spacing_x
+            coord_y = origin_y + (row - 1) * spacing_y
+            label = label_format.format(row=row, row_letter=row_letter,
+                                        column=column)
+
+            seats.append(SeatToImport(coord_x, coord_y, label, category_id))
+
+    return seats
+
+
+def _to_letters(number: int) -> str:
+    """Return the (1-based) number in bijective base-26 notation, i.e.
+    as A, B, …, Z, AA, AB, and so on.
+    """
+    letters = ''
+
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+
+    return letters
+
+
+# -------------------------------------------------------------------- #
+# validation
+
+
+def find_layout_errors(seats: Sequence[SeatToImport],
+                       occupied_coords: Set[Tuple[int, int]],
+                       category_ids: Set[TicketCategoryID]) -> List[str]:
+    """Return the problems with the seats to import, given the
+    coordinates already taken in the area and the categories available.
+    """
+    errors = []
+    seen_coords = set()  # type: Set[Tuple[int, int]]
+
+    for index, seat in enumerate(seats):
+        position = 'Seat {} ({}, {})'.format(index + 1, seat.coord_x,
+                                             seat.coord_y)
+        coords = (seat.coord_x, seat.coord_y)
+
+        if coords in seen_coords:
+            errors.append('{}: Coordinates are given more than once.'
+                          .format(position))
+        elif coords in occupied_coords:
+            errors.append('{}: Coordinates are already taken by a seat in '
+                          'the area.'.format(position))
+        seen_coords.add(coords)
+
+        if seat.category_id not in category_ids:
+            errors.append('{}: Unknown category "{}".'
+                          .format(position, seat.category_id))
+
+        if (seat.label is not None) and (len(seat.label) > LABEL_MAX_LENGTH):
+            errors.append('{}: Label is longer than {} characters.'
+                          .format(position, LABEL_MAX_LENGTH))
+
+    return errors
+
+
+# -------------------------------------------------------------------- #
+# import
+
+
+def import_seats(area: Area, seats: Sequence[SeatToImport]) -> int:
+    """Insert the seats into the area, all or none.
+
+    Return the number of seats inserted.
+
+    Raise `InvalidSeatLayout` if the seats collide with each other or
+    with seats already in the area, or refer to categories that do not
+    belong to the area's party.
+    """
+    area_id = area.id
+
+    occupied_coords = _get_occupied_coords(area_id)
+    category_ids = _get_category_ids(area.party_id)
+
+    errors = find_layout_errors(seats, occupied_coords, category_ids)
+    if errors:
+        raise InvalidSeatLayout(errors)
+
+    rows = [_to_row(area_id, seat) for seat in seats]
+
+    table = Seat.__table__
+    for batch in chunked(rows, INSERT_BATCH_SIZE):
+        db.session.execute(table.insert().values(batch))
+
+    db.session.commit()
+
+    seat_map_service.invalidate(area_id)
+
+    return len(rows)
+
+
+def _get_occupied_coords(area_id: AreaID) -> Set[Tuple[int, int]]:
+    rows = db.session \
+        .query(Seat.coord_x, Seat.coord_y) \
+        .filter_by(area_id=area_id) \
+        .all()
+
+    return set(rows)
+
+
+def _get_category_ids(party_id: PartyID) -> Set[TicketCategoryID]:
+    rows = db.session \
+        .query(Category.id) \
+        .filter_by(party_id=party_id) \
+        .all()
+
+    return {row[0] for row in rows}
+
+
+def _to_row(area_id: AreaID, seat: SeatToImport) -> Dict[str, Any]:
+    return {
+        'id': generate_uuid(),
+        'area_id': area_id,
+        'coord_x': seat.coord_x,
+        'coord_y': seat.coord_y,
+        'category_id': seat.category_id,
+        'label': seat.label,
+    }
@@ -0,0 +1,448 @@
+"""
+byceps.services.seating.seat_map_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Snapshots of seating areas' seats and their occupancy, kept in Redis.
+
+A snapshot consists of the area's seats (which hardly ever change) and
+the occupancy of each seat. It is built from the database on first
+use. Afterwards, occupying and releasing seats patches the occupancy of
+the affected seats instead of discarding the snapshot.
+
+Each patch increments the area's revision, is appended to a log of
+recent changes and is published on the area's channel. Clients that
+know the seat map at some revision can ask for the changes since then
+instead of fetching everything again, or have them streamed as they
+happen.
+
+All values are absolute (a seat's occupant, not a delta), so applying
+a change more than once is harmless, and building a snapshot does not
+overwrite occupancy patched in the meantime.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from collections import namedtuple
+import json
+from time import monotonic
+from typing import Any, Dict, Iterator, Optional, Set
+
+from flask import current_app, has_app_context
+from redis import StrictRedis
+
+from ...database import db
+from ...redis import redis
+
+from ..ticketing.models.ticket import Ticket
+from ..user.models.user import UserTuple
+from ..user import service as user_service
+
+from .models.seat import Point, Seat
+from .transfer.models import AreaID, SeatID
+
+
+# How long a snapshot is kept without being rebuilt, so occupancy that
+# failed to be patched does not stay wrong forever.
+SNAPSHOT_TTL = 24 * 60 * 60  # seconds
+
+# Number of most recent changes to keep per area
+MAX_CHANGES = 500
+
+# Published instead of a change if the area's seats have changed
+RESET_MESSAGE = 'reset'
+
+
+SeatMap = namedtuple('SeatMap', 'revision, seats')
+
+SeatMapSeat = namedtuple('SeatMapSeat',
+                         'id, label, coords, category_id, is_occupied, user')
+
+SeatMapUser = namedtuple('SeatMapUser', 'id, screen_name, avatar_url')
+
+SeatMapChanges = namedtuple('SeatMapChanges', 'revision, changes')
+
+# The occupant of a seat, or `None` if the seat is free. Occupied seats
+# map to a dictionary that holds the user (or `None` if the occupying
+# ticket is not assigned to a user).
+Occupant = Optional[Dict[str, Any]]
+
+
+# Keys: occupancy, changes, revision
+# Args: maximum number of changes to keep, channel to publish changes
+#       on, time to live of occupancy and changes, then pairs of seat ID
+#       and occupant (as JSON)
+#
+# Occupancy is patched even if there is no snapshot (yet), as one might
+# be being built. Patched occupancy without a snapshot and changes no
+# one asks for expire eventually.
+#
+# Returns the new revision.
+_PATCH_SCRIPT = """
+local occupancy_key, changes_key, revision_key = unpack(KEYS)
+local max_changes = tonumber(ARGV[1])
+local channel = ARGV[2]
+local ttl = tonumber(ARGV[3])
+
+local revision
+for i = 4, #ARGV, 2 do
+    local seat_id, occupant = ARGV[i], ARGV[i + 1]
+    revision = redis.call('INCR', revision_key)
+    redis.call('HSET', occupancy_key, seat_id, occupant)
+
+    local change = revision .. ' ' .. seat_id .. ' ' .. occupant
+    redis.call('LPUSH', changes_key, change)
+    redis.call('PUBLISH', channel, change)
+end
+
+redis.call('LTRIM', changes_key, 0, max_changes - 1)
+redis.call('EXPIRE', changes_key, ttl)
+
+if redis.call('TTL', occupancy_key) < 0 then
+    redis.call('EXPIRE', occupancy_key, ttl)
+end
+
+return revision
+"""
+
+
+def is_enabled() -> bool:
+    """Return `True` if seat maps are to be kept in Redis."""
+    return has_app_context() \
+        and current_app.config['SEAT_MAP_CACHE_ENABLED']
+
+
+# -------------------------------------------------------------------- #
+# snapshot
+
+
+def get_seat_map(area_id: AreaID) -> SeatMap:
+    """Return the area's seats and their occupancy.
+
+    The snapshot is built from the database if it does not exist yet.
+    """
+    seats_json, occupancy, revision = _fetch_snapshot(area_id)
+
+    if seats_json is None:
+        _build_snapshot(area_id)
+        seats_json, occupancy, revision = _fetch_snapshot(area_id)
+
+    seats = [_to_seat(seat, occupancy.get(seat['id'].encode('utf-8')))
+             for seat in json.loads(seats_json.decode('utf-8'))]
+
+    return SeatMap(revision, seats)
+
+
+def get_revision(area_id: AreaID) -> int:
+    """Return the area's current seat map revision."""
+    value = redis.client.get(_get_key(area_id, 'revision'))
+    return int(value) if (value is not None) else 0
+
+
+def _fetch_snapshot(area_id: AreaID):
+    pipeline = redis.client.pipeline(transaction=True)
+    pipeline.get(_get_key(area_id, 'seats'))
+    pipeline.hgetall(_get_key(area_id, 'occupancy'))
+    pipeline.get(_get_key(area_id, 'revision'))
+    seats_json, occupancy, revision = pipeline.execute()
+
+    revision = int(revision) if (revision is not None) else 0
+
+    return seats_json, occupancy, revision
+
+
+def _build_snapshot(area_id: AreaID) -> None:
+    seats = Seat.query \
+        .filter_by(area_id=area_id) \
+        .order_by(Seat.coord_x, Seat.coord_y) \
+        .all()
+
+    seat_ids = {seat.id for seat in seats}
+    occupants_by_seat_id = _get_occupants(seat_ids)
+
+    seats_json = json.dumps([_serialize_seat(seat) for seat in seats],
+                            separators=(',', ':'))
+
+    seats_key = _get_key(area_id, 'seats')
+    occupancy_key = _get_key(area_id, 'occupancy')
+
+    pipeline = redis.client.pipeline(transaction=True)
+
+    # Do not overwrite occupancy that has been patched since the
+    # database has been queried.
+    for seat_id, occupant in occupants_by_seat_id.items():
+        pipeline.hsetnx(occupancy_key, str(seat_id),
+                        _serialize_occupant(occupant))
+
+    pipeline.set(seats_key, seats_json, ex=SNAPSHOT_TTL)
+    pipeline.expire(occupancy_key, SNAPSHOT_TTL)
+
+    pipeline.execute()
+
+
+def _serialize_seat(seat: Seat) -> Dict[str, Any]:
+    return {
+        'id': str(seat.id),
+        'label': seat.label,
+        'x': seat.coord_x,
+        'y': seat.coord_y,
+        'category_id': str(seat.category_id),
+    }
+
+
+def _to_seat(seat: Dict[str, Any], occupant_json: Optional[bytes]
+            ) -> SeatMapSeat:
+    occupant = json.loads(occupant_json.decode('utf-8')) \
+        if (occupant_json is not None) else None
+
+    is_occupied = occupant is not None
+    user = SeatMapUser(**occupant['user']) \
+        if (is_occupied and occupant['user'] is not None) else None
+
+    return SeatMapSeat(
+        seat['id'],
+        seat['label'],
+        Point(x=seat['x'], y=seat['y']),
+        seat['category_id'],
+        is_occupied,
+        user,
+    )
+
+
+# -------------------------------------------------------------------- #
+# changes
+
+
+def update_occupancy(seat_ids: Set[SeatID]) -> None:
+    """Patch the snapshots to reflect the current occupancy of those
+    seats.
+
+    To be called after the occupancy (or an occupying ticket's user)
+    has changed (and the change has been committed).
+
+    This is done even if snapshots are disabled in this application, as
+    another one (i.e. the party application) might use them.
+    """
+    if not has_app_context() or not seat_ids:
+        return
+
+    area_ids_by_seat_id = dict(db.session
+        .query(Seat.id, Seat.area_id)
+        .filter(Seat.id.in_(frozenset(seat_ids)))
+        .all())
+
+    occupants_by_seat_id = _get_occupants(seat_ids)
+
+    occupants_by_area_id = {}  # type: Dict[AreaID, Dict[SeatID, Occupant]]
+    for seat_id, area_id in area_ids_by_seat_id.items():
+        occupants_by_area_id.setdefault(area_id, {})[seat_id] \
+            = occupants_by_seat_id[seat_id]
+
+    for area_id, occupants in occupants_by_area_id.items():
+        _patch(area_id, occupants)
+
+
+def _patch(area_id: AreaID, occupants_by_seat_id: Dict[SeatID, Occupant]
+          ) -> None:
+    keys = [
+        _get_key(area_id, 'occupancy'),
+        _get_key(area_id, 'changes'),
+        _get_key(area_id, 'revision'),
+    ]
+
+    args = [MAX_CHANGES, _get_channel(area_id), SNAPSHOT_TTL]
+    for seat_id, occupant in occupants_by_seat_id.items():
+        args.extend([str(seat_id), _serialize_occupant(occupant)])
+
+    redis.client.eval(_PATCH_SCRIPT, len(keys), *keys, *args)
+
+
+def get_changes(area_id: AreaID, since_revision: int
+               ) -> Optional[SeatMapChanges]:
+    """Return the changes to the area's occupancy since that revision,
+    oldest first.
+
+    Return `None` if (some of) those changes are no longer available,
+    in which case the whole seat map has to be fetched again.
+    """
+    return _get_changes(redis.client, area_id, since_revision)
+
+
+def _get_changes(client: StrictRedis, area_id: AreaID, since_revision: int
+                ) -> Optional[SeatMapChanges]:
+    pipeline = client.pipeline(transaction=True)
+    pipeline.get(_get_key(area_id, 'revision'))
+    pipeline.lrange(_get_key(area_id, 'changes'), 0, -1)
+    revision, entries = pipeline.execute()
+
+    revision = int(revision) if (revision is not None) else 0
+
+    if since_revision == revision:
+        return SeatMapChanges(revision, [])
+
+    if since_revision > revision:
+        return None
+
+    changes = [_parse_change(entry) for entry in reversed(entries)]
+
+    if not changes or (changes[0]['revision'] > since_revision + 1):
+        # The log does not reach back far enough.
+        return None
+
+    changes = [change for change in changes
+               if change['revision'] > since_revision]
+
+    return SeatMapChanges(revision, changes)
+
+
+def stream_changes(area_id: AreaID, since_revision: int, *,
+                   keepalive_interval: float, duration: float
+                  ) -> Iterator[Optional[Dict[str, Any]]]:
+    """Yield the changes to the area's occupancy since that revision,
+    first those that have already happened, then the others as they
+    happen.
+
+    Yield `None` if no change has happened for `keepalive_interval`
+    seconds. Stop after `duration` seconds.
+
+    Raise `ChangesUnavailable` if (some of) the changes are no longer
+    available, in which case the whole seat map has to be fetched
+    again.
+
+    The Redis client is obtained from the application context once, so
+    the stream does not depend on the context (or anything else in it,
+    like a database session) afterwards.
+    """
+    client = redis.client
+
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+
+    # Subscribe before catching up so that no change is missed in
+    # between.
+    pubsub.subscribe(_get_channel(area_id))
+
+    try:
+        changes = _get_changes(client, area_id, since_revision)
+        if changes is None:
+            raise ChangesUnavailable()
+
+        yield from changes.changes
+        last_revision = changes.revision
+
+        deadline = monotonic() + duration
+        while monotonic() < deadline:
+            message = pubsub.get_message(timeout=keepalive_interval)
+
+            if message is None:
+                yield None
+                continue
+
+            if message['data'].decode('utf-8') == RESET_MESSAGE:
+                raise ChangesUnavailable()
+
+            change = _parse_change(message['data'])
+
+            if change['revision'] <= last_revision:
+                # Already included in the changes caught up with.
+                continue
+
+            yield change
+            last_revision = change['revision']
+    finally:
+        pubsub.close()
+
+
+class ChangesUnavailable(Exception):
+    """The changes since the requested revision are no longer
+    available.
+    """
+
+
+def _parse_change(entry: bytes) -> Dict[str, Any]:
+    revision, seat_id, occupant_json = entry.decode('utf-8').split(' ', 2)
+    occupant = json.loads(occupant_json)
+
+    return {
+        'revision': int(revision),
+        'seat_id': seat_id,
+        'is_occupied': occupant is not None,
+        'user': occupant['user'] if (occupant is not None) else None,
+    }
+
+
+def invalidate(area_id: AreaID) -> None:
+    """Discard the area's snapshot.
+
+    To be called after seats have been added to or removed from the
+    area (and the change has been committed).
+
+    Seats are usually added in the admin application or by scripts,
+    which do not use snapshots themselves, so this is done regardless
+    of whether they are enabled.
+    """
+    if not has_app_context():
+        return
+
+    pipeline = redis.client.pipeline(transaction=True)
+    pipeline.delete(
+        _get_key(area_id, 'seats'),
+        _get_key(area_id, 'occupancy'),
+        _get_key(area_id, 'changes'))
+    # Keep the revision increasing so clients notice they are outdated.
+    pipeline.incr(_get_key(area_id, 'revision'))
+    pipeline.publish(_get_channel(area_id), RESET_MESSAGE)
+    pipeline.execute()
+
+
+# -------------------------------------------------------------------- #
+# helpers
+
+
+def _get_occupants(seat_ids: Set[SeatID]) -> Dict[SeatID, Occupant]:
+    """Return the occupant of each of those seats."""
+    if not seat_ids:
+        return {}
+
+    user_ids_by_seat_id = dict(db.session
+        .query(Ticket.occupied_seat_id, Ticket.used_by_id)
+        .filter(Ticket.occupied_seat_id.in_(frozenset(seat_ids)))
+        .all())
+
+    user_ids = {user_id for user_id in user_ids_by_seat_id.values()
+                if user_id is not None}
+    users = user_service.find_users(user_ids)
+    users_by_id = user_service.index_users_by_id(users)
+
+    # Seats not occupied by any ticket are free.
+    occupants_by_seat_id = {
+        seat_id: None for seat_id in seat_ids
+    }  # type: Dict[SeatID, Occupant]
+
+    for seat_id, user_id in user_ids_by_seat_id.items():
+        user = users_by_id.get(user_id)
+        occupants_by_seat_id[seat_id] = {'user': _serialize_user(user)}
+
+    return occupants_by_seat_id
+
+
+def _serialize_user(user: Optional[UserTuple]) -> Optional[Dict[str, Any]]:
+    if (user is None) or user.deleted:
+        return None
+
+    return {
+        'id': str(user.id),
+        'screen_name': user.screen_name,
+        'avatar_url': user.avatar_url,
+    }
+
+
+def _serialize_occupant(occupant: Occupant) -> str:
+    return json.dumps(occupant, separators=(',', ':'))
+
+
+def _get_key(area_id: AreaID, name: str) -> str:
+    return 'seating:area:{}:seat_map:{}'.format(area_id, name)
+
+
+def _get_channel(area_id: AreaID) -> str:
+    return _get_key(area_id, 'changes:channel')
@@ -13,6 +13,7 @@ from ...typing import PartyID
 
 from ..ticketing.transfer.models import TicketCategoryID
 
+from . import seat_map_service
 from .models.area import Area
 from .models.seat import Seat
 from .transfer.models import AreaID, SeatID
@@ -24,9 +25,13 @@ def create_seat(area: Area, coord_x: int, coord_y: int,
     """Create a seat."""
     seat = Seat(area, category_id, coord_x=coord_x, coord_y=coord_y)
 
+    area_id = area.id
+
     db.session.add(seat)
     db.session.commit()
 
+    seat_map_service.invalidate(area_id)
+
     return seat
 
 
@@ -0,0 +1,93 @@
+"""
+byceps.services.shop.article.cache_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Cache of the structure of a shop's article compilation for orderable
+articles, shared by all application processes through Redis.
+
+The structure only consists of the IDs of the orderable articles (in
+order of appearance) and, for each of them, the IDs and quantities of
+the articles attached to it. Anything that might change without the
+articles being updated (like quantities and availability) is not
+cached.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import json
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from flask import current_app, has_app_context
+
+from ....redis import redis
+
+from ..shop.transfer.models import ShopID
+
+from .models.article import ArticleID
+
+
+# Orderable articles, each with the articles (and their quantities)
+# attached to it
+ArticleStructure = List[Tuple[ArticleID, List[Tuple[ArticleID, int]]]]
+
+
+KEY_PREFIX = 'shop:orderable_article_structure:'
+
+REDIS_ENTRY_TTL = 24 * 60 * 60  # seconds
+
+
+def is_enabled() -> bool:
+    """Return `True` if the structure is to be cached."""
+    return has_app_context() \
+        and current_app.config['SHOP_ARTICLE_COMPILATION_CACHE_ENABLED']
+
+
+def find_orderable_article_structure(shop_id: ShopID
+                                    ) -> Optional[ArticleStructure]:
+    """Return the cached structure for the shop, or `None` if not
+    cached.
+    """
+    value = redis.client.get(_get_key(shop_id))
+    if value is None:
+        return None
+
+    return [
+        (UUID(article_id), [(UUID(attached_article_id), quantity)
+                            for attached_article_id, quantity in attached])
+        for article_id, attached in json.loads(value.decode('utf-8'))
+    ]
+
+
+def store_orderable_article_structure(shop_id: ShopID,
+                                      structure: ArticleStructure) -> None:
+    """Cache the structure for the shop."""
+    value = json.dumps([
+        (str(article_id), [(str(attached_article_id), quantity)
+                           for attached_article_id, quantity in attached])
+        for article_id, attached in structure
+    ])
+
+    redis.client.set(_get_key(shop_id), value, ex=REDIS_ENTRY_TTL)
+
+
+def invalidate(shop_id: ShopID) -> None:
+    """Remove the cached structure for the shop.
+
+    To be called after the shop's articles (or their attachments) have
+    been changed (and the change has been committed).
+
+    This is done even if caching is disabled in this application, as
+    the change usually happens in the admin application while the party
+    application does the caching.
+    """
+    if not has_app_context():
+        # No application, no Redis connection (and nothing cached).
+        return
+
+    redis.client.delete(_get_key(shop_id))
+
+
+def _get_key(shop_id: ShopID) -> str:
+    return KEY_PREFIX + shop_id
@@ -17,6 +17,8 @@ from ....database import BaseQuery, db
 from ..shop.models import Shop
 from ..shop.transfer.models import ShopID
 
+from . import cache_service
+from .cache_service import ArticleStructure
 from .models.article import Article, ArticleID
 from .models.attached_article import AttachedArticle, AttachedArticleID
 from .models.compilation import ArticleCompilation, ArticleCompilationItem
@@ -33,6 +35,8 @@ def create_article(shop_id: ShopID, item_number: ArticleNumber,
     db.session.add(article)
     db.session.commit()
 
+    cache_service.invalidate(shop_id)
+
     return article
 
 
@@ -56,6 +60,68 @@ def update_article(article: Article, description: str, price: Decimal,
 
     db.session.commit()
 
+    cache_service.invalidate(article.shop_id)
+
+
+def reserve_quantities(quantities: Dict[ArticleID, int]) -> Set[ArticleID]:
+    """Reduce the available quantities of the articles by the requested
+    amounts, but only if enough of every article is available.
+
+    All articles are updated with a single conditional statement, so
+    concurrent reservations cannot oversell an article.
+
+    Return the IDs of the articles of which not enough is available
+    (which usually means they are sold out). If there are any, the
+    transaction is rolled back and no quantity is reduced. Otherwise,
+    the reservation is committed.
+    """
+    if not quantities:
+        return set()
+
+    table = Article.__table__
+
+    requested_quantity = db.case(
+        [(table.c.id == article_id, quantity)
+         for article_id, quantity in quantities.items()])
+
+    update = table.update() \
+        .where(table.c.id.in_(quantities.keys())) \
+        .where(table.c.quantity >= requested_quantity) \
+        .values(quantity=table.c.quantity - requested_quantity) \
+        .returning(table.c.id)
+
+    reserved_article_ids = {row.id for row in db.session.execute(update)}
+
+    unavailable_article_ids = set(quantities.keys()) - reserved_article_ids
+
+    if unavailable_article_ids:
+        db.session.rollback()
+    else:
+        db.session.commit()
+
+    return unavailable_article_ids
+
+
+def release_quantities(quantities: Dict[ArticleID, int]) -> None:
+    """Make the previously reserved quantities of the articles available
+    again.
+    """
+    if not quantities:
+        return
+
+    table = Article.__table__
+
+    released_quantity = db.case(
+        [(table.c.id == article_id, quantity)
+         for article_id, quantity in quantities.items()])
+
+    update = table.update() \
+        .where(table.c.id.in_(quantities.keys())) \
+        .values(quantity=table.c.quantity + released_quantity)
+
+    db.session.execute(update)
+    db.session.commit()
+
 
 def attach_article(article_to_attach: Article, quantity: int,
                    article_to_attach_to: Article) -> None:
@@ -66,6 +132,8 @@ def attach_article(article_to_attach: Article, quantity: int,
     db.session.add(attached_article)
     db.session.commit()
 
+    cache_service.invalidate(article_to_attach_to.shop_id)
+
 
 def count_articles_for_shop(shop_id: ShopID) -> int:
     """Return the number of articles that are assigned to that shop."""
@@ -76,9 +144,13 @@ def count_articles_for_shop(shop_id: ShopID) -> int:
 
 def unattach_article(attached_article: Article) -> None:
     """Unattach an article from another."""
+    shop_id = attached_article.attached_to_article.shop_id
+
     db.session.delete(attached_article)
     db.session.commit()
 
+    cache_service.invalidate(shop_id)
+
 
 def find_article(article_id: ArticleID) -> Optional[Article]:
     """Return the article with that ID, or `None` if not found."""
@@ -150,21 +222,79 @@ def get_article_compilation_for_orderable_articles(shop_id: ShopID
     """Return a compilation of the articles which can be ordered from
     that shop, less the ones that are only orderable in a dedicated
     order.
+
+    If enabled, the compilation's structure is taken from the cache, so
+    only the articles themselves (with their current quantities) have
+    to be loaded.
+    """
+    if not cache_service.is_enabled():
+        structure = _get_orderable_article_structure(shop_id)
+        return _assemble_article_compilation(structure)
+
+    structure = cache_service.find_orderable_article_structure(shop_id)
+
+    if structure is None:
+        structure = _get_orderable_article_structure(shop_id)
+        cache_service.store_orderable_article_structure(shop_id, structure)
+
+    return _assemble_article_compilation(structure)
+
+
+def _get_orderable_article_structure(shop_id: ShopID) -> ArticleStructure:
+    """Return the IDs of the articles which can be ordered from that
+    shop (regardless of their availability period), each with the IDs
+    and quantities of the articles attached to it.
     """
     orderable_articles = Article.query \
         .for_shop(shop_id) \
+        .options(
+            db.joinedload('attached_articles').joinedload('article'),
+        ) \
         .filter_by(not_directly_orderable=False) \
         .filter_by(requires_separate_order=False) \
-        .currently_available() \
         .order_by(Article.description) \
         .all()
 
+    return [
+        (article.id, [(attached_article.article.id, attached_article.quantity)
+                      for attached_article in article.attached_articles])
+        for article in orderable_articles
+    ]
+
+
+def _assemble_article_compilation(structure: ArticleStructure
+                                 ) -> ArticleCompilation:
+    """Load the articles of the structure with a single query and
+    compile those currently available.
+    """
+    article_ids = set()
+    for article_id, attached in structure:
+        article_ids.add(article_id)
+        article_ids.update(attached_id for attached_id, _ in attached)
+
+    if not article_ids:
+        return ArticleCompilation()
+
+    articles = Article.query \
+        .filter(Article.id.in_(article_ids)) \
+        .all()
+    articles_by_id = {article.id: article for article in articles}
+
     compilation = ArticleCompilation()
 
-    for article in orderable_articles:
+    for article_id, attached in structure:
+        article = articles_by_id.get(article_id)
+        if (article is None) or not article.is_available:
+            continue
+
         compilation.append(ArticleCompilationItem(article))
 
-        _add_attached_articles(compilation, article.attached_articles)
+        for attached_article_id, quantity in attached:
+            attached_article = articles_by_id.get(attached_article_id)
+            if attached_article is not None:
+                compilation.append(
+                    ArticleCompilationItem(attached_article,
+                                           fixed_quantity=quantity))
 
     return compilation
 
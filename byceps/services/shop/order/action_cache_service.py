@@ -0,0 +1,93 @@
+"""
+byceps.services.shop.order.action_cache_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Process-local cache of all order actions, indexed by article number and
+payment state.
+
+Order actions are registered once per party and hardly ever change, so
+every process keeps all of them in memory. Creating an action
+increments a version number stored in Redis. Each process compares the
+version its actions have been loaded at with the current one and
+reloads them once it is outdated.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from ....redis import redis
+
+from ..article.transfer.models import ArticleNumber
+
+from .transfer.models import OrderAction, PaymentState
+
+
+ActionsByKey = Dict[Tuple[ArticleNumber, PaymentState], List[OrderAction]]
+
+
+VERSION_KEY = 'shop:order_actions:version'
+
+
+_lock = Lock()
+_cached = None  # type: Optional[Tuple[int, ActionsByKey]]
+
+
+def is_enabled() -> bool:
+    """Return `True` if the order actions are to be cached."""
+    return has_app_context() \
+        and current_app.config['SHOP_ORDER_ACTION_CACHE_ENABLED']
+
+
+def get_version() -> int:
+    """Return the current version of the order actions."""
+    value = redis.client.get(VERSION_KEY)
+    return int(value) if (value is not None) else 0
+
+
+def find_actions(version: int) -> Optional[ActionsByKey]:
+    """Return the cached actions at that version, or `None` if not
+    cached.
+    """
+    with _lock:
+        if (_cached is None) or (_cached[0] != version):
+            return None
+
+        return _cached[1]
+
+
+def store_actions(version: int, actions_by_key: ActionsByKey) -> None:
+    """Cache the actions at that version.
+
+    The version must have been obtained *before* the actions were
+    fetched from the database so that actions created in between are
+    not masked.
+    """
+    global _cached
+
+    with _lock:
+        _cached = (version, actions_by_key)
+
+
+def invalidate() -> None:
+    """Invalidate the cached actions of all processes.
+
+    To be called after an action has been created (and the change has
+    been committed).
+
+    The version is incremented even if caching is disabled in this
+    application, as actions are usually created in the admin
+    application or by scripts, but cached by party applications and
+    workers.
+    """
+    global _cached
+
+    with _lock:
+        _cached = None
+
+    if has_app_context():
+        redis.client.incr(VERSION_KEY)
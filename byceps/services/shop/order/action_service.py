@@ -6,6 +6,7 @@ byceps.services.shop.order.action_service
 :License: Modified BSD, see LICENSE for details.
 """
 
+from collections import defaultdict
 from typing import Callable, Dict, Sequence, Set
 
 from ....database import db
@@ -17,8 +18,10 @@ from .actions.create_ticket_bundles import create_ticket_bundles
 from .actions.create_tickets import create_tickets
 from .actions.revoke_ticket_bundles import revoke_ticket_bundles
 from .actions.revoke_tickets import revoke_tickets
-from .models.order_action import OrderAction, Parameters
-from .transfer.models import Order, PaymentState
+from . import action_cache_service
+from .action_cache_service import ActionsByKey
+from .models.order_action import OrderAction as DbOrderAction, Parameters
+from .transfer.models import Order, OrderAction, PaymentState
 
 
 OrderActionType = Callable[[Order, ArticleNumber, int, Parameters], None]
@@ -40,11 +43,14 @@ PROCEDURES_BY_NAME = {
 def create_action(article_number: ArticleNumber, payment_state: PaymentState,
                   procedure: str, parameters: Parameters) -> None:
     """Create an order action."""
-    action = OrderAction(article_number, payment_state, procedure, parameters)
+    action = DbOrderAction(article_number, payment_state, procedure,
+                           parameters)
 
     db.session.add(action)
     db.session.commit()
 
+    action_cache_service.invalidate()
+
 
 # -------------------------------------------------------------------- #
 # execution
@@ -71,11 +77,54 @@ def execute_actions(order: Order, payment_state: PaymentState) -> None:
 def _get_actions(article_numbers: Set[ArticleNumber],
                  payment_state: PaymentState) -> Sequence[OrderAction]:
     """Return the order actions for those article numbers."""
-    return OrderAction.query \
-        .filter(OrderAction.article_number.in_(article_numbers)) \
+    if action_cache_service.is_enabled():
+        actions_by_key = _get_all_actions_cached()
+
+        return [action
+                for article_number in article_numbers
+                for action in actions_by_key.get(
+                    (article_number, payment_state), [])]
+
+    actions = DbOrderAction.query \
+        .filter(DbOrderAction.article_number.in_(article_numbers)) \
         .filter_by(_payment_state=payment_state.name) \
         .all()
 
+    return [_db_entity_to_action(action) for action in actions]
+
+
+def _get_all_actions_cached() -> ActionsByKey:
+    """Return all order actions, indexed by article number and payment
+    state.
+
+    Look them up in the cache first and only query the database if the
+    cached actions are outdated.
+    """
+    version = action_cache_service.get_version()
+
+    actions_by_key = action_cache_service.find_actions(version)
+
+    if actions_by_key is None:
+        actions_by_key = defaultdict(list)  # type: ActionsByKey
+        for db_action in DbOrderAction.query.all():
+            action = _db_entity_to_action(db_action)
+            key = (action.article_number, action.payment_state)
+            actions_by_key[key].append(action)
+
+        actions_by_key = dict(actions_by_key)
+        action_cache_service.store_actions(version, actions_by_key)
+
+    return actions_by_key
+
+
+def _db_entity_to_action(action: DbOrderAction) -> OrderAction:
+    return OrderAction(
+        action.article_number,
+        action.payment_state,
+        action.procedure,
+        action.parameters,
+    )
+
 
 def _execute_procedure(order: Order, action: OrderAction, article_quantity: int
                       ) -> None:
@@ -0,0 +1,139 @@
+"""
+byceps.services.shop.order.admission_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Limit the number of users concurrently checking out in a shop.
+
+Users beyond the limit are put in a queue (first come, first served)
+and admitted as soon as admitted users leave, either by placing their
+order or by letting their lease expire.
+
+Waiting users are expected to ask again periodically (the waiting room
+page reloads itself). Those who do not for a while are considered to
+have left and are removed from the queue.
+
+All state is kept in Redis and updated atomically by a Lua script, so
+it is shared by all application processes.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from collections import namedtuple
+from time import time
+from typing import Optional
+
+from flask import current_app
+
+from ....redis import redis
+from ....typing import UserID
+
+from ..shop.transfer.models import ShopID
+
+
+# How long an admitted user may take to place the order.
+ADMISSION_LEASE = 10 * 60  # seconds
+
+# How long a waiting user keeps the place in the queue without asking
+# again.
+WAITING_TIMEOUT = 60  # seconds
+
+# How often the waiting room page reloads itself.
+RETRY_INTERVAL = 15  # seconds
+
+
+AdmissionStatus = namedtuple('AdmissionStatus', 'admitted, position')
+
+
+# Keys: admitted users (scored by lease expiry), waiting users (scored
+#       by ticket number), waiting users' last requests (scored by
+#       time), ticket number counter
+# Args: user ID, current time, lease, waiting timeout, limit
+#
+# Returns 0 if the user is admitted, otherwise the user's (1-based)
+# position in the queue.
+_TRY_ADMIT_SCRIPT = """
+local admitted_key, waiting_key, seen_key, counter_key = unpack(KEYS)
+local user_id = ARGV[1]
+local now = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local waiting_timeout = tonumber(ARGV[4])
+local limit = tonumber(ARGV[5])
+
+redis.call('ZREMRANGEBYSCORE', admitted_key, '-inf', now)
+
+if redis.call('ZSCORE', admitted_key, user_id) then
+    redis.call('ZADD', admitted_key, now + lease, user_id)
+    return 0
+end
+
+local gone = redis.call('ZRANGEBYSCORE', seen_key, '-inf',
+                        now - waiting_timeout)
+for _, gone_user_id in ipairs(gone) do
+    redis.call('ZREM', waiting_key, gone_user_id)
+    redis.call('ZREM', seen_key, gone_user_id)
+end
+
+if not redis.call('ZSCORE', waiting_key, user_id) then
+    local ticket = redis.call('INCR', counter_key)
+    redis.call('ZADD', waiting_key, ticket, user_id)
+end
+redis.call('ZADD', seen_key, now, user_id)
+
+local rank = redis.call('ZRANK', waiting_key, user_id)
+local free_slots = limit - redis.call('ZCARD', admitted_key)
+
+if rank < free_slots then
+    redis.call('ZREM', waiting_key, user_id)
+    redis.call('ZREM', seen_key, user_id)
+    redis.call('ZADD', admitted_key, now + lease, user_id)
+    return 0
+end
+
+return rank - math.max(free_slots, 0) + 1
+"""
+
+
+def get_limit() -> Optional[int]:
+    """Return the number of users allowed to check out concurrently in
+    a shop, or `None` if not limited.
+    """
+    return current_app.config['SHOP_ORDER_ADMISSION_LIMIT']
+
+
+def try_admit(shop_id: ShopID, user_id: UserID) -> AdmissionStatus:
+    """Admit the user to check out in the shop if the limit allows it,
+    or queue the user otherwise.
+
+    Users who have been admitted already get their lease renewed.
+    """
+    limit = get_limit()
+    if limit is None:
+        return AdmissionStatus(True, None)
+
+    keys = [
+        _get_key(shop_id, 'admitted'),
+        _get_key(shop_id, 'waiting'),
+        _get_key(shop_id, 'waiting_seen'),
+        _get_key(shop_id, 'tickets'),
+    ]
+    args = [str(user_id), time(), ADMISSION_LEASE, WAITING_TIMEOUT, limit]
+
+    position = redis.client.eval(_TRY_ADMIT_SCRIPT, len(keys), *keys, *args)
+
+    if position == 0:
+        return AdmissionStatus(True, None)
+
+    return AdmissionStatus(False, position)
+
+
+def release(shop_id: ShopID, user_id: UserID) -> None:
+    """Free the user's slot so the next waiting user can be admitted."""
+    if get_limit() is None:
+        return
+
+    redis.client.zrem(_get_key(shop_id, 'admitted'), str(user_id))
+
+
+def _get_key(shop_id: ShopID, name: str) -> str:
+    return 'shop:{}:admission:{}'.format(shop_id, name)
@@ -13,7 +13,6 @@ from typing import Any, Dict, Optional
 
 from attr import attrib, attrs
 from flask import current_app
-from jinja2 import FileSystemLoader
 
 from .....services.brand import service as brand_service
 from .....services.brand.transfer.models import Brand
@@ -26,8 +25,9 @@ from .....services.shop.order.transfer.models import Order, OrderID
 from .....services.shop.shop import service as shop_service
 from .....services.user.models.user import User
 from .....typing import BrandID
+from .....util.jobqueue import enqueue_once
 from .....util.money import format_euro_amount
-from .....util.templating import create_sandboxed_environment
+from .....util.templating import get_sandboxed_environment
 
 
 @attrs(frozen=True, slots=True)
@@ -38,6 +38,17 @@ class OrderEmailData:
     placed_by = attrib(type=User)
 
 
+def enqueue_email_for_incoming_order_to_orderer(order_id: OrderID) -> None:
+    """Enqueue assembling and sending the e-mail to the orderer as a job.
+
+    The job is identified by the order ID, so it is not enqueued again
+    for the same order as long as the job exists. Failed jobs are kept
+    and can be requeued.
+    """
+    job_id = 'shop-order-placed-email-{}'.format(order_id)
+    enqueue_once(job_id, send_email_for_incoming_order_to_orderer, order_id)
+
+
 def send_email_for_incoming_order_to_orderer(order_id: OrderID) -> None:
     message = _assemble_email_for_incoming_order_to_orderer(order_id)
 
@@ -50,6 +61,16 @@ def send_email_for_canceled_order_to_orderer(order_id: OrderID) -> None:
     _send_email(message)
 
 
+def enqueue_email_for_paid_order_to_orderer(order_id: OrderID) -> None:
+    """Enqueue assembling and sending the e-mail to the orderer as a job.
+
+    As with the e-mail for the incoming order, the job is not enqueued
+    again for the same order as long as it exists.
+    """
+    job_id = 'shop-order-paid-email-{}'.format(order_id)
+    enqueue_once(job_id, send_email_for_paid_order_to_orderer, order_id)
+
+
 def send_email_for_paid_order_to_orderer(order_id: OrderID) -> None:
     message = _assemble_email_for_paid_order_to_orderer(order_id)
 
@@ -153,10 +174,9 @@ def _render_template(name: str, **context: Dict[str, Any]) -> str:
         current_app.root_path,
         'services/shop/order/email/templates')
 
-    loader = FileSystemLoader(templates_path)
-
-    env = create_sandboxed_environment(loader=loader)
-    env.filters['format_euro_amount'] = format_euro_amount
+    env = get_sandboxed_environment(templates_path, filters={
+        'format_euro_amount': format_euro_amount,
+    })
 
     template = env.get_template(name)
 
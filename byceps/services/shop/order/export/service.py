@@ -8,16 +8,41 @@ byceps.services.shop.order.export.service
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict
+import os.path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, \
+    Tuple
 
 from flask import current_app
+from jinja2 import Template
 
 from .....services.user import service as user_service
+from .....util.export import serialize_to_csv
 from .....util.money import to_two_places
-from .....util.templating import load_template
+from .....util.templating import get_sandboxed_environment
+
+from ...shop.transfer.models import ShopID
 
 from .. import service as order_service
-from ..transfer.models import Order, OrderID
+from ..transfer.models import Order, OrderID, PaymentState
+
+
+BATCH_SIZE = 500
+
+
+CSV_FIELD_NAMES = [
+    'Bestellnummer',
+    'Bestellt am',
+    'Vorname',
+    'Nachname',
+    'Straße',
+    'PLZ',
+    'Ort',
+    'Land',
+    'E-Mail-Adresse',
+    'Zahlungsart',
+    'Zahlungsstatus',
+    'Gesamtbetrag',
+]
 
 
 def export_order_as_xml(order_id: OrderID) -> Dict[str, str]:
@@ -27,8 +52,7 @@ def export_order_as_xml(order_id: OrderID) -> Dict[str, str]:
     if order is None:
         return None
 
-    context = _assemble_context(order)
-    xml = _render_template(context)
+    xml = ''.join(_generate_xml([[order]]))
 
     return {
         'content': xml,
@@ -36,13 +60,78 @@ def export_order_as_xml(order_id: OrderID) -> Dict[str, str]:
     }
 
 
-def _assemble_context(order: Order) -> Dict[str, Any]:
-    """Assemble template context."""
-    placed_by = user_service.find_user(order.placed_by_id)
-    email_address = placed_by.email_address
+def export_orders_as_xml(shop_id: ShopID, *,
+                         only_payment_state: Optional[PaymentState]=None,
+                         created_after: Optional[datetime]=None,
+                         created_before: Optional[datetime]=None
+                        ) -> Iterator[str]:
+    """Export the shop's orders as a single XML document.
+
+    The document is generated piece by piece while the orders are
+    fetched in batches.
+    """
+    batches = order_service.get_orders_for_shop_in_batches(shop_id,
+        only_payment_state=only_payment_state,
+        created_after=created_after,
+        created_before=created_before,
+        batch_size=BATCH_SIZE)
+
+    return _generate_xml(batches)
+
+
+def export_orders_as_csv(shop_id: ShopID, *,
+                         only_payment_state: Optional[PaymentState]=None,
+                         created_after: Optional[datetime]=None,
+                         created_before: Optional[datetime]=None
+                        ) -> Iterator[str]:
+    """Export the shop's orders as CSV, one order per line.
+
+    The lines are generated while the orders are fetched in batches.
+    """
+    batches = order_service.get_orders_for_shop_in_batches(shop_id,
+        only_payment_state=only_payment_state,
+        created_after=created_after,
+        created_before=created_before,
+        batch_size=BATCH_SIZE)
+
+    rows = (_order_to_csv_row(order, email_address)
+            for order, email_address in _with_email_addresses(batches))
+
+    return serialize_to_csv(CSV_FIELD_NAMES, rows)
 
+
+def _with_email_addresses(batches: Iterable[Sequence[Order]]
+                         ) -> Iterator[Tuple[Order, str]]:
+    """Pair each order with the e-mail address of its orderer.
+
+    The addresses are looked up with a single query per batch.
+    """
+    for orders in batches:
+        user_ids = {order.placed_by_id for order in orders}
+        email_addresses = user_service.get_email_addresses(user_ids)
+
+        for order in orders:
+            yield order, email_addresses.get(order.placed_by_id)
+
+
+def _generate_xml(batches: Iterable[Sequence[Order]]) -> Iterator[str]:
+    template = _get_order_template()
     now = datetime.now()
 
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<ORDER_LIST>\n'
+
+    for order, email_address in _with_email_addresses(batches):
+        context = _assemble_context(order, email_address, now)
+        yield template.render(**context)
+        yield '\n'
+
+    yield '</ORDER_LIST>'
+
+
+def _assemble_context(order: Order, email_address: str, now: datetime
+                     ) -> Dict[str, Any]:
+    """Assemble template context."""
     return {
         'order': order,
         'email_address': email_address,
@@ -53,6 +142,23 @@ def _assemble_context(order: Order) -> Dict[str, Any]:
     }
 
 
+def _order_to_csv_row(order: Order, email_address: str) -> Dict[str, str]:
+    return {
+        'Bestellnummer': order.order_number,
+        'Bestellt am': order.created_at.strftime('%d.%m.%Y %H:%M:%S'),
+        'Vorname': order.first_names,
+        'Nachname': order.last_name,
+        'Straße': order.street,
+        'PLZ': order.zip_code,
+        'Ort': order.city,
+        'Land': order.country,
+        'E-Mail-Adresse': email_address,
+        'Zahlungsart': order.payment_method.name,
+        'Zahlungsstatus': order.payment_state.name,
+        'Gesamtbetrag': _format_export_amount(order.total_price),
+    }
+
+
 def _format_export_amount(amount: Decimal) -> str:
     """Format the monetary amount as required by the export format
     specification.
@@ -76,11 +182,10 @@ def _format_export_datetime(dt: datetime) -> str:
     return date_time + utc_offset
 
 
-def _render_template(context: Dict[str, Any]) -> str:
-    """Load and render export template."""
-    path = 'services/shop/order/export/templates/export.xml'
-    with current_app.open_resource(path, 'r') as f:
-        source = f.read()
+def _get_order_template() -> Template:
+    """Return the compiled order template."""
+    templates_path = os.path.join(current_app.root_path,
+                                  'services/shop/order/export/templates')
 
-    template = load_template(source)
-    return template.render(**context)
+    env = get_sandboxed_environment(templates_path)
+    return env.get_template('order.xml')
@@ -37,6 +37,15 @@ class OrderQuery(BaseQuery):
 class Order(db.Model):
     """An order for articles, placed by a user."""
     __tablename__ = 'shop_orders'
+    __table_args__ = (
+        db.Index('ix_shop_orders_shop_id_created_at_id', 'shop_id', 'created_at', 'id'),
+        # Trigram indexes (require the `pg_trgm` extension) to support
+        # substring searches (`ILIKE '%term%'`).
+        db.Index('ix_shop_orders_order_number_trgm', 'order_number', postgresql_using='gin', postgresql_ops={'order_number': 'gin_trgm_ops'}),
+        db.Index('ix_shop_orders_first_names_trgm', 'first_names', postgresql_using='gin', postgresql_ops={'first_names': 'gin_trgm_ops'}),
+        db.Index('ix_shop_orders_last_name_trgm', 'last_name', postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'}),
+        db.Index('ix_shop_orders_city_trgm', 'city', postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'}),
+    )
     query_class = OrderQuery
 
     id = db.Column(db.Uuid, default=generate_uuid, primary_key=True)
@@ -0,0 +1,47 @@
+"""
+byceps.services.shop.order.models.order_stats
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from decimal import Decimal
+
+from .....database import db
+from .....util.instances import ReprBuilder
+
+from ...shop.transfer.models import ShopID
+
+from ..transfer.models import PaymentState
+
+
+class OrderStats(db.Model):
+    """The number and total amount of a shop's orders in a payment
+    state.
+    """
+    __tablename__ = 'shop_order_stats'
+
+    shop_id = db.Column(db.Unicode(40), db.ForeignKey('shops.id'), primary_key=True)
+    _payment_state = db.Column('payment_state', db.Unicode(20), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False)
+
+    def __init__(self, shop_id: ShopID, payment_state: PaymentState,
+                 order_count: int, total_amount: Decimal) -> None:
+        self.shop_id = shop_id
+        self._payment_state = payment_state.name
+        self.order_count = order_count
+        self.total_amount = total_amount
+
+    @property
+    def payment_state(self) -> PaymentState:
+        return PaymentState[self._payment_state]
+
+    def __repr__(self) -> str:
+        return ReprBuilder(self) \
+            .add_with_lookup('shop_id') \
+            .add('payment_state', self._payment_state) \
+            .add_with_lookup('order_count') \
+            .add_with_lookup('total_amount') \
+            .build()
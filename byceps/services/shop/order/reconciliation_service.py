@@ -0,0 +1,245 @@
+"""
+byceps.services.shop.order.reconciliation_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Reconcile incoming payments (e.g. from a bank statement) with orders.
+
+Orders are looked up in a single query, orders whose total matches the
+paid amount are marked as paid in batched transactions, and the actions
+of paid orders (e.g. creating tickets or awarding badges) are run as
+background jobs.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from collections import namedtuple, OrderedDict
+import csv
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+from ....typing import UserID
+from ....util.iterables import chunked
+from ....util.jobqueue import enqueue_once
+
+from ..shop.transfer.models import ShopID
+
+from . import action_service
+from .models.order import Order as DbOrder
+from . import service as order_service
+from .transfer.models import OrderID, OrderNumber, PaymentMethod, \
+    PaymentState
+
+
+BATCH_SIZE = 200
+
+
+Payment = namedtuple('Payment', 'line_number, order_number, amount')
+
+
+ReconciliationStatus = Enum('ReconciliationStatus', [
+    'marked_as_paid',
+    'invalid_row',
+    'duplicate',
+    'unknown_order_number',
+    'already_paid',
+    'canceled',
+    'amount_mismatch',
+])
+
+
+ReconciliationResult = namedtuple('ReconciliationResult', [
+    'line_number',
+    'order_number',
+    'amount',
+    'status',
+    'order_id',
+])
+
+
+def parse_payments(lines: Sequence[str]) -> Iterator[Payment]:
+    """Parse lines of CSV data with the order number in the first and
+    the paid amount in the second column.
+
+    Columns are separated by semicolons or, if there are none, commas.
+    Amounts may use a decimal comma. Empty lines are skipped, as is a
+    header line.
+
+    Rows that cannot be parsed are yielded with an amount of `None`.
+    """
+    delimiter = ';' if any(';' in line for line in lines) else ','
+    rows = csv.reader(lines, delimiter=delimiter)
+
+    is_first_row = True
+
+    for line_number, row in enumerate(rows, 1):
+        if not any(value.strip() for value in row):
+            continue
+
+        order_number = row[0].strip()
+        amount = _parse_amount(row[1]) if len(row) > 1 else None
+
+        if is_first_row:
+            is_first_row = False
+            if amount is None:
+                # Skip header.
+                continue
+
+        yield Payment(line_number, OrderNumber(order_number), amount)
+
+
+def _parse_amount(value: str) -> Optional[Decimal]:
+    value = value.strip().replace(' ', '').replace('€', '')
+
+    if ',' in value:
+        # Treat a comma as decimal separator and dots as thousands
+        # separators.
+        value = value.replace('.', '').replace(',', '.')
+
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def reconcile(shop_id: ShopID, payments: Sequence[Payment],
+              payment_method: PaymentMethod, updated_by_id: UserID
+             ) -> List[ReconciliationResult]:
+    """Mark the orders of the shop as paid for which the paid amount
+    matches the order total.
+
+    Return a result for each payment, in the order given.
+    """
+    order_numbers = {payment.order_number for payment in payments}
+    orders = order_service.find_orders_by_order_numbers(order_numbers)
+    orders_by_number = {order.order_number: order for order in orders
+                        if order.shop_id == shop_id}
+
+    results = []
+    order_totals = OrderedDict()  # type: Dict[OrderID, Decimal]
+    seen_order_numbers = set()  # type: Set[OrderNumber]
+
+    for payment in payments:
+        order = orders_by_number.get(payment.order_number)
+
+        status = _determine_status(payment, order, seen_order_numbers)
+
+        if status == ReconciliationStatus.marked_as_paid:
+            # The paid amount is the order's total. Keep it so that the
+            # orders, which are expired once a batch is committed, do
+            # not have to be loaded again.
+            order_totals[order.id] = payment.amount
+
+        # Only a payment that settles the order makes further payments
+        # for it duplicates. A later row might correct an earlier one.
+        if status in {ReconciliationStatus.marked_as_paid,
+                      ReconciliationStatus.already_paid}:
+            seen_order_numbers.add(payment.order_number)
+
+        order_id = order.id if (order is not None) else None
+        results.append(ReconciliationResult(payment.line_number,
+                                            payment.order_number,
+                                            payment.amount, status, order_id))
+
+    marked_order_ids = _mark_orders_as_paid(shop_id, order_totals,
+                                            payment_method, updated_by_id)
+
+    return _update_skipped_results(results, marked_order_ids)
+
+
+def _mark_orders_as_paid(shop_id: ShopID, order_totals: Dict[OrderID, Decimal],
+                         payment_method: PaymentMethod, updated_by_id: UserID
+                        ) -> Set[OrderID]:
+    """Mark the orders as paid in batches and enqueue their actions.
+
+    Return the IDs of the orders that have been marked as paid.
+    """
+    marked_order_ids = set()  # type: Set[OrderID]
+
+    for batch in chunked(order_totals.items(), BATCH_SIZE):
+        marked_batch_order_ids = order_service.mark_open_orders_as_paid(
+            shop_id, dict(batch), payment_method, updated_by_id)
+
+        for order_id, _ in batch:
+            if order_id in marked_batch_order_ids:
+                enqueue_paid_order_actions(order_id)
+
+        marked_order_ids.update(marked_batch_order_ids)
+
+    return marked_order_ids
+
+
+def _update_skipped_results(results: List[ReconciliationResult],
+                            marked_order_ids: Set[OrderID]
+                           ) -> List[ReconciliationResult]:
+    """Determine the status again for orders that were to be marked as
+    paid but have been paid (or canceled) by someone else meanwhile.
+    """
+    skipped_order_numbers = {
+        result.order_number for result in results
+        if result.status == ReconciliationStatus.marked_as_paid
+            and result.order_id not in marked_order_ids
+    }
+
+    if not skipped_order_numbers:
+        return results
+
+    orders = order_service.find_orders_by_order_numbers(skipped_order_numbers)
+    orders_by_number = {order.order_number: order for order in orders}
+
+    updated_results = []
+
+    for result in results:
+        if result.status == ReconciliationStatus.marked_as_paid \
+                and result.order_id not in marked_order_ids:
+            payment = Payment(result.line_number, result.order_number,
+                              result.amount)
+            order = orders_by_number[result.order_number]
+            status = _determine_status(payment, order, set())
+            result = result._replace(status=status)
+
+        updated_results.append(result)
+
+    return updated_results
+
+
+def _determine_status(payment: Payment, order: Optional[DbOrder],
+                      seen_order_numbers: Set[OrderNumber]
+                     ) -> ReconciliationStatus:
+    if payment.amount is None:
+        return ReconciliationStatus.invalid_row
+
+    if payment.order_number in seen_order_numbers:
+        return ReconciliationStatus.duplicate
+
+    if order is None:
+        return ReconciliationStatus.unknown_order_number
+
+    if order.is_paid:
+        return ReconciliationStatus.already_paid
+
+    if order.is_canceled:
+        return ReconciliationStatus.canceled
+
+    if payment.amount != order.calculate_total_price():
+        return ReconciliationStatus.amount_mismatch
+
+    return ReconciliationStatus.marked_as_paid
+
+
+def enqueue_paid_order_actions(order_id: OrderID) -> None:
+    """Enqueue executing the actions for the paid order as a job.
+
+    The job is identified by the order ID, so it is not enqueued again
+    for the same order as long as the job exists.
+    """
+    job_id = 'shop-order-paid-actions-{}'.format(order_id)
+    enqueue_once(job_id, execute_paid_order_actions, order_id)
+
+
+def execute_paid_order_actions(order_id: OrderID) -> None:
+    """Execute the actions for the paid order."""
+    order = order_service.find_order_with_details(order_id)
+
+    action_service.execute_actions(order, PaymentState.paid)
@@ -7,20 +7,25 @@ byceps.services.shop.order.service
 """
 
 from datetime import datetime
-from typing import Dict, Iterator, Optional, Sequence, Set
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Set
 
 from flask import current_app
-from flask_sqlalchemy import Pagination
+from flask_sqlalchemy import BaseQuery
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ....blueprints.shop_order.signals import order_placed
 from ....database import db
 from ....typing import UserID
+from ....util.iterables import chunked
+from ....util import keyset_pagination
+from ....util.keyset_pagination import Page
 
-from ..article.models.article import Article
+from ..article.models.article import Article, ArticleID
+from ..article import service as article_service
 from ..cart.models import Cart
 from ..sequence import service as sequence_service
-from ..shop.models import Shop
 from ..shop import service as shop_service
 from ..shop.transfer.models import ShopID
 
@@ -29,6 +34,7 @@ from .models.order_event import OrderEvent
 from .models.order_item import OrderItem as DbOrderItem
 from .models.orderer import Orderer
 from . import action_service
+from . import stats_service
 from .transfer.models import Order, OrderID, OrderNumber, PaymentMethod, PaymentState
 
 
@@ -36,12 +42,34 @@ class OrderFailed(Exception):
     pass
 
 
+class ArticlesSoldOut(OrderFailed):
+    """Indicate that not enough of some articles is available."""
+
+    def __init__(self, article_ids: Set[ArticleID]) -> None:
+        self.article_ids = article_ids
+
+
 def create_order(shop_id: ShopID, orderer: Orderer,
                  payment_method: PaymentMethod, cart: Cart) -> Order:
-    """Create an order of one or more articles."""
+    """Create an order of one or more articles.
+
+    The articles' quantities are reserved before an order number is
+    generated, so an order that cannot be fulfilled fails early (with
+    `ArticlesSoldOut`) and does not use up an order number.
+    """
     shop = shop_service.get_shop(shop_id)
 
-    order_number = sequence_service.generate_order_number(shop.id)
+    quantities = _get_quantities_by_article_id(cart)
+
+    unavailable_article_ids = article_service.reserve_quantities(quantities)
+    if unavailable_article_ids:
+        raise ArticlesSoldOut(unavailable_article_ids)
+
+    try:
+        order_number = sequence_service.generate_order_number(shop.id)
+    except sequence_service.NumberGenerationFailed:
+        article_service.release_quantities(quantities)
+        raise
 
     order = _build_order(shop.id, order_number, orderer, payment_method)
 
@@ -52,11 +80,15 @@ def create_order(shop_id: ShopID, orderer: Orderer,
     db.session.add(order)
     db.session.add_all(order_items)
 
+    stats_service.add_orders(shop.id, order.payment_state, 1,
+                             order.calculate_total_price())
+
     try:
         db.session.commit()
     except IntegrityError as e:
         current_app.logger.error('Order %s failed: %s', order_number, e)
         db.session.rollback()
+        article_service.release_quantities(quantities)
         raise OrderFailed()
 
     order_placed.send(None, order_id=order.id)
@@ -64,6 +96,17 @@ def create_order(shop_id: ShopID, orderer: Orderer,
     return order.to_transfer_object()
 
 
+def _get_quantities_by_article_id(cart: Cart) -> Dict[ArticleID, int]:
+    """Sum up the requested quantity per article."""
+    quantities = {}  # type: Dict[ArticleID, int]
+
+    for item in cart.get_items():
+        article_id = item.article.id
+        quantities[article_id] = quantities.get(article_id, 0) + item.quantity
+
+    return quantities
+
+
 def _build_order(shop_id: ShopID, order_number: OrderNumber, orderer: Orderer,
                  payment_method: PaymentMethod) -> DbOrder:
     """Create an order of one or more articles."""
@@ -85,7 +128,7 @@ def _add_items_from_cart_to_order(cart: Cart, order: DbOrder
                                  ) -> Iterator[DbOrderItem]:
     """Add the items from the cart to the order.
 
-    Reduce the article's quantity accordingly.
+    The articles' quantities must have been reserved already.
 
     Yield the created order items.
     """
@@ -93,8 +136,6 @@ def _add_items_from_cart_to_order(cart: Cart, order: DbOrder
         article = article_item.article
         quantity = article_item.quantity
 
-        article.quantity = Article.quantity - quantity
-
         yield _add_article_to_order(order, article, quantity)
 
 
@@ -222,6 +263,10 @@ def cancel_order(order: DbOrder, updated_by_id: UserID, reason: str) -> None:
     for item in order.items:
         item.article.quantity = Article.quantity + item.quantity
 
+    stats_service.move_orders(order.shop_id, payment_state_from,
+                              payment_state_to, 1,
+                              order.calculate_total_price())
+
     db.session.commit()
 
     action_service.execute_actions(order, payment_state_to)
@@ -238,6 +283,79 @@ def mark_order_as_paid(order_id: OrderID, payment_method: PaymentMethod,
     if order.is_paid:
         raise OrderAlreadyMarkedAsPaid()
 
+    stats_service.move_orders(order.shop_id, order.payment_state,
+                              PaymentState.paid, 1,
+                              order.calculate_total_price())
+
+    _mark_order_as_paid(order, payment_method, updated_by_id)
+
+    db.session.commit()
+
+    action_service.execute_actions(order.to_transfer_object(), PaymentState.paid)
+
+
+def mark_open_orders_as_paid(shop_id: ShopID,
+                             order_totals: Dict[OrderID, Decimal],
+                             payment_method: PaymentMethod,
+                             updated_by_id: UserID) -> Set[OrderID]:
+    """Mark those of the shop's orders as paid, in a single transaction,
+    that are still open.
+
+    Orders that are not open anymore (e.g. because they have been paid
+    in the meantime) are skipped. The orders' totals have to be given
+    so the orders do not have to be loaded again.
+
+    Unlike `mark_order_as_paid`, this does not execute the orders'
+    actions; the caller is responsible for that.
+
+    Return the IDs of the orders that have been marked as paid.
+    """
+    if not order_totals:
+        return set()
+
+    updated_at = datetime.now()
+    table = DbOrder.__table__
+
+    update = table.update() \
+        .where(table.c.id.in_(order_totals.keys())) \
+        .where(table.c.shop_id == shop_id) \
+        .where(table.c.payment_state == PaymentState.open.name) \
+        .values(
+            payment_method=payment_method.name,
+            payment_state=PaymentState.paid.name,
+            payment_state_updated_at=updated_at,
+            payment_state_updated_by_id=updated_by_id,
+        ) \
+        .returning(table.c.id)
+
+    marked_order_ids = {row.id for row in db.session.execute(update)}
+
+    if not marked_order_ids:
+        db.session.rollback()
+        return set()
+
+    # Adjust the statistics once instead of once per order.
+    total_amount = sum(order_totals[order_id] for order_id in marked_order_ids)
+    stats_service.move_orders(shop_id, PaymentState.open, PaymentState.paid,
+                              len(marked_order_ids), total_amount)
+
+    now = datetime.utcnow()
+    data = {
+        'initiator_id': str(updated_by_id),
+        'former_payment_state': PaymentState.open.name,
+        'payment_method': payment_method.name,
+    }
+    events = [OrderEvent(now, 'order-paid', order_id, data)
+              for order_id in marked_order_ids]
+    db.session.add_all(events)
+
+    db.session.commit()
+
+    return marked_order_ids
+
+
+def _mark_order_as_paid(order: DbOrder, payment_method: PaymentMethod,
+                        updated_by_id: UserID) -> None:
     updated_at = datetime.now()
     payment_state_from = order.payment_state
     payment_state_to = PaymentState.paid
@@ -256,10 +374,6 @@ def mark_order_as_paid(order_id: OrderID, payment_method: PaymentMethod,
     event = OrderEvent(now, event_type, order.id, data)
     db.session.add(event)
 
-    db.session.commit()
-
-    action_service.execute_actions(order.to_transfer_object(), payment_state_to)
-
 
 def _update_payment_state(order: DbOrder, state: PaymentState,
                           updated_at: datetime, updated_by_id: UserID) -> None:
@@ -270,30 +384,15 @@ def _update_payment_state(order: DbOrder, state: PaymentState,
 
 def count_open_orders(shop_id: ShopID) -> int:
     """Return the number of open orders for the shop."""
-    return DbOrder.query \
-        .for_shop(shop_id) \
-        .filter_by(_payment_state=PaymentState.open.name) \
-        .count()
+    return count_orders_per_payment_state(shop_id)[PaymentState.open]
 
 
 def count_orders_per_payment_state(shop_id: ShopID) -> Dict[PaymentState, int]:
     """Count orders for the shop, grouped by payment state."""
-    counts_by_payment_state = dict.fromkeys(PaymentState, 0)
+    stats_by_payment_state = stats_service.get_stats_by_payment_state(shop_id)
 
-    rows = db.session \
-        .query(
-            DbOrder._payment_state,
-            db.func.count(DbOrder.id)
-        ) \
-        .filter(DbOrder.shop_id == shop_id) \
-        .group_by(DbOrder._payment_state) \
-        .all()
-
-    for payment_state_str, count in rows:
-        payment_state = PaymentState[payment_state_str]
-        counts_by_payment_state[payment_state] = count
-
-    return counts_by_payment_state
+    return {payment_state: stats.order_count
+            for payment_state, stats in stats_by_payment_state.items()}
 
 
 def find_order(order_id: OrderID) -> Optional[DbOrder]:
@@ -329,42 +428,41 @@ def find_orders_by_order_numbers(order_numbers: Set[OrderNumber]
         return []
 
     return DbOrder.query \
+        .options(
+            db.joinedload('items'),
+        ) \
         .filter(DbOrder.order_number.in_(order_numbers)) \
         .all()
 
 
 def get_order_count_by_shop_id() -> Dict[ShopID, int]:
     """Return order count (including 0) per shop, indexed by shop ID."""
-    shop_ids_and_order_counts = db.session \
-        .query(
-            Shop.id,
-            db.func.count(DbOrder.shop_id)
-        ) \
-        .outerjoin(DbOrder) \
-        .group_by(Shop.id) \
-        .all()
-
-    return dict(shop_ids_and_order_counts)
-
-
-def get_orders_for_shop_paginated(shop_id: ShopID, page: int, per_page: int, *,
-                                  search_term=None,
-                                  only_payment_state: Optional[PaymentState]=None,
-                                  only_shipped: Optional[bool]=None
-                                 ) -> Pagination:
-    """Return all orders for that shop, ordered by creation date.
-
-    If a payment state is specified, only orders in that state are
-    returned.
+    return stats_service.get_order_count_by_shop_id()
+
+
+def get_orders_for_shop_page(shop_id: ShopID, per_page: int, *,
+                             after: Optional[str]=None,
+                             before: Optional[str]=None,
+                             search_term: Optional[str]=None,
+                             only_payment_state: Optional[PaymentState]=None,
+                             only_shipped: Optional[bool]=None
+                            ) -> Page:
+    """Return the page of orders for that shop following (or preceding)
+    the cursor, ordered by creation date (latest first).
+
+    If a search term is specified, only orders whose order number or
+    orderer's name or city contains it are returned. If a payment state
+    is specified, only orders in that state are returned.
+
+    The total number of matching orders is only available (from the
+    order statistics) if neither searching nor filtering by shipping
+    state.
     """
     query = DbOrder.query \
-        .for_shop(shop_id) \
-        .order_by(DbOrder.created_at.desc())
+        .for_shop(shop_id)
 
     if search_term:
-        ilike_pattern = '%{}%'.format(search_term)
-        query = query \
-            .filter(DbOrder.order_number.ilike(ilike_pattern))
+        query = _filter_by_search_term(query, search_term)
 
     if only_payment_state is not None:
         query = query.filter_by(_payment_state=only_payment_state.name)
@@ -377,7 +475,92 @@ def get_orders_for_shop_paginated(shop_id: ShopID, page: int, per_page: int, *,
         else:
             query = query.filter(DbOrder.shipped_at == None)
 
-    return query.paginate(page, per_page)
+    if search_term or (only_shipped is not None):
+        total = None
+    else:
+        counts = count_orders_per_payment_state(shop_id)
+        if only_payment_state is not None:
+            total = counts[only_payment_state]
+        else:
+            total = sum(counts.values())
+
+    sort_columns = [DbOrder.created_at, DbOrder.id]
+
+    return keyset_pagination.paginate(query, sort_columns, per_page,
+                                      after=after, before=before,
+                                      total=total)
+
+
+def _filter_by_search_term(query: BaseQuery, search_term: str) -> BaseQuery:
+    """Only include orders whose order number or orderer's name or city
+    contains the search term (ignoring case).
+
+    These columns have trigram indexes, so this does not require
+    scanning all orders.
+    """
+    escaped_term = search_term \
+        .replace('\\', '\\\\') \
+        .replace('%', '\\%') \
+        .replace('_', '\\_')
+    ilike_pattern = '%{}%'.format(escaped_term)
+
+    return query.filter(db.or_(
+        DbOrder.order_number.ilike(ilike_pattern),
+        DbOrder.first_names.ilike(ilike_pattern),
+        DbOrder.last_name.ilike(ilike_pattern),
+        DbOrder.city.ilike(ilike_pattern),
+    ))
+
+
+def get_orders_for_shop_in_batches(shop_id: ShopID, *,
+                                   only_payment_state: Optional[PaymentState]=None,
+                                   created_after: Optional[datetime]=None,
+                                   created_before: Optional[datetime]=None,
+                                   batch_size: int=500
+                                  ) -> Iterator[List[Order]]:
+    """Return all orders (including their items) for that shop, ordered
+    by creation date, in batches.
+
+    Orders are fetched through a server-side cursor and their items are
+    loaded with a single query per batch, so memory usage is bound by
+    the batch size rather than the number of orders.
+    """
+    query = DbOrder.query \
+        .for_shop(shop_id) \
+        .order_by(DbOrder.created_at, DbOrder.order_number)
+
+    if only_payment_state is not None:
+        query = query.filter_by(_payment_state=only_payment_state.name)
+
+    if created_after is not None:
+        query = query.filter(DbOrder.created_at >= created_after)
+
+    if created_before is not None:
+        query = query.filter(DbOrder.created_at < created_before)
+
+    for orders in chunked(query.yield_per(batch_size), batch_size):
+        order_numbers = {order.order_number for order in orders}
+        items_by_order_number = _get_items_by_order_number(order_numbers)
+
+        for order in orders:
+            # Populate the relationship without lazy-loading it.
+            items = items_by_order_number.get(order.order_number, [])
+            set_committed_value(order, 'items', items)
+
+        yield [order.to_transfer_object() for order in orders]
+
+
+def _get_items_by_order_number(order_numbers: Set[OrderNumber]
+                              ) -> Dict[OrderNumber, List[DbOrderItem]]:
+    items = DbOrderItem.query \
+        .filter(DbOrderItem.order_number.in_(order_numbers)) \
+        .all()
+
+    items_by_order_number = {}  # type: Dict[OrderNumber, List[DbOrderItem]]
+    for item in items:
+        items_by_order_number.setdefault(item.order_number, []).append(item)
+
+    return items_by_order_number
 
 
 def get_orders_placed_by_user(user_id: UserID) -> Sequence[DbOrder]:
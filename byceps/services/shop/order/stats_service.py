@@ -0,0 +1,156 @@
+"""
+byceps.services.shop.order.stats_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Maintain the number and total amount of each shop's orders per payment
+state.
+
+Placing an order and changing its payment state adjust the affected
+counters with atomic statements in the same transaction, so reading
+them does not require counting all orders. A full recount (to fill or
+fix the counters) can be run for a shop.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+from typing import Dict
+
+from sqlalchemy.dialects.postgresql import insert
+
+from ....database import db
+
+from ..shop.models import Shop
+from ..shop.transfer.models import ShopID
+
+from .models.order import Order as DbOrder
+from .models.order_item import OrderItem as DbOrderItem
+from .models.order_stats import OrderStats
+from .transfer.models import PaymentState
+
+
+PaymentStateStats = namedtuple('PaymentStateStats',
+                               'order_count, total_amount')
+
+
+# -------------------------------------------------------------------- #
+# incremental updates
+#
+# These functions do not commit. The caller commits, so the change that
+# triggers them and the updated counters are persisted together.
+
+
+def add_orders(shop_id: ShopID, payment_state: PaymentState, count: int,
+               total_amount: Decimal) -> None:
+    """Include orders that have been placed."""
+    _adjust(shop_id, payment_state, count, total_amount)
+
+
+def move_orders(shop_id: ShopID, payment_state_from: PaymentState,
+                payment_state_to: PaymentState, count: int,
+                total_amount: Decimal) -> None:
+    """Account for orders that have changed their payment state."""
+    _adjust(shop_id, payment_state_from, -count, -total_amount)
+    _adjust(shop_id, payment_state_to, count, total_amount)
+
+
+def _adjust(shop_id: ShopID, payment_state: PaymentState, count_delta: int,
+            amount_delta: Decimal) -> None:
+    table = OrderStats.__table__
+
+    insert_stmt = insert(table).values(
+        shop_id=shop_id,
+        payment_state=payment_state.name,
+        order_count=count_delta,
+        total_amount=amount_delta,
+    )
+
+    upsert_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=['shop_id', 'payment_state'],
+        set_={
+            'order_count': table.c.order_count + count_delta,
+            'total_amount': table.c.total_amount + amount_delta,
+        })
+
+    db.session.execute(upsert_stmt)
+
+
+# -------------------------------------------------------------------- #
+# full recount
+
+
+def rebuild(shop_id: ShopID) -> None:
+    """Recount the number and total amount of the shop's orders per
+    payment state.
+    """
+    counts_by_payment_state = dict(db.session
+        .query(
+            DbOrder._payment_state,
+            db.func.count(DbOrder.id)
+        )
+        .filter(DbOrder.shop_id == shop_id)
+        .group_by(DbOrder._payment_state)
+        .all())
+
+    amounts_by_payment_state = dict(db.session
+        .query(
+            DbOrder._payment_state,
+            db.func.sum(DbOrderItem.price * DbOrderItem.quantity)
+        )
+        .join(DbOrderItem)
+        .filter(DbOrder.shop_id == shop_id)
+        .group_by(DbOrder._payment_state)
+        .all())
+
+    OrderStats.query \
+        .filter_by(shop_id=shop_id) \
+        .delete()
+
+    for payment_state in PaymentState:
+        order_count = counts_by_payment_state.get(payment_state.name, 0)
+        total_amount = amounts_by_payment_state.get(payment_state.name,
+                                                    Decimal('0.00'))
+
+        stats = OrderStats(shop_id, payment_state, order_count, total_amount)
+        db.session.add(stats)
+
+    db.session.commit()
+
+
+# -------------------------------------------------------------------- #
+# retrieval
+
+
+def get_stats_by_payment_state(shop_id: ShopID
+                              ) -> Dict[PaymentState, PaymentStateStats]:
+    """Return the number and total amount of the shop's orders per
+    payment state.
+    """
+    stats_by_payment_state = dict.fromkeys(PaymentState,
+        PaymentStateStats(0, Decimal('0.00')))
+
+    rows = OrderStats.query \
+        .filter_by(shop_id=shop_id) \
+        .all()
+
+    for row in rows:
+        stats_by_payment_state[row.payment_state] = PaymentStateStats(
+            row.order_count, row.total_amount)
+
+    return stats_by_payment_state
+
+
+def get_order_count_by_shop_id() -> Dict[ShopID, int]:
+    """Return order count (including 0) per shop, indexed by shop ID."""
+    shop_ids_and_order_counts = db.session \
+        .query(
+            Shop.id,
+            db.func.coalesce(db.func.sum(OrderStats.order_count), 0)
+        ) \
+        .outerjoin(OrderStats) \
+        .group_by(Shop.id) \
+        .all()
+
+    return dict(shop_ids_and_order_counts)
@@ -9,7 +9,7 @@ byceps.services.shop.order.transfer.models
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import NewType
+from typing import Any, Dict, NewType
 from uuid import UUID
 
 from attr import attrib, attrs
@@ -76,3 +76,11 @@ class OrderItem:
     tax_rate = attrib(type=Decimal)
     quantity = attrib(type=int)
     line_price = attrib(type=Decimal)
+
+
+@attrs(frozen=True, slots=True)
+class OrderAction:
+    article_number = attrib(type=ArticleNumber)
+    payment_state = attrib(type=PaymentState)
+    procedure = attrib(type=str)
+    parameters = attrib(type=Dict[str, Any])
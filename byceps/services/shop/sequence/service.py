@@ -6,7 +6,11 @@ byceps.services.shop.sequence.service
 :License: Modified BSD, see LICENSE for details.
 """
 
-from typing import Optional
+import os
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
 
 from ....database import db
 
@@ -42,32 +46,117 @@ def generate_article_number(shop_id: ShopID) -> ArticleNumber:
 
 
 def generate_order_number(shop_id: ShopID) -> OrderNumber:
-    """Generate and reserve an unused, unique order number for this shop."""
-    sequence = _get_next_sequence_step(shop_id, Purpose.order)
+    """Generate and reserve an unused, unique order number for this shop.
+
+    If a block size greater than 1 is configured, this process reserves
+    that many order numbers at once and hands them out without further
+    database roundtrips. Order numbers are then still unique, but may
+    have gaps (numbers reserved by a process that terminates before
+    handing all of them out are never used) and, across processes, are
+    not necessarily assigned in chronological order.
+    """
+    block_size = _get_order_number_block_size()
+    sequence = _get_next_sequence_step(shop_id, Purpose.order,
+                                       block_size=block_size)
 
     return format_order_number(sequence)
 
 
-def _get_next_sequence_step(shop_id: ShopID, purpose: Purpose
-                           ) -> NumberSequence:
+def _get_order_number_block_size() -> int:
+    if not has_app_context():
+        return 1
+
+    return current_app.config['SHOP_ORDER_NUMBER_BLOCK_SIZE']
+
+
+class _ReservedBlock:
+    """A range of sequence values reserved by this process."""
+
+    def __init__(self, prefix: str, first_value: int, last_value: int
+                ) -> None:
+        self.pid = os.getpid()
+        self.prefix = prefix
+        self.next_value = first_value
+        self.last_value = last_value
+
+    def is_usable(self) -> bool:
+        # A block reserved before forking must not be used by both the
+        # parent and the child process.
+        return (self.pid == os.getpid()) \
+            and (self.next_value <= self.last_value)
+
+    def take_value(self) -> int:
+        value = self.next_value
+        self.next_value += 1
+        return value
+
+
+_reserved_blocks = {}  # type: Dict[Tuple[ShopID, Purpose], _ReservedBlock]
+_reserved_blocks_lock = Lock()
+
+
+def _get_next_sequence_step(shop_id: ShopID, purpose: Purpose, *,
+                            block_size: int=1) -> NumberSequence:
     """Calculate and reserve the next sequence step for the shop and
     purpose.
+
+    Steps are reserved in blocks of the given size. Remaining steps of
+    the current block are handed out before reserving the next block.
     """
-    sequence = DbNumberSequence.query \
-        .filter_by(shop_id=shop_id) \
-        .filter_by(_purpose=purpose.name) \
-        .with_for_update() \
-        .one_or_none()
+    if block_size < 1:
+        raise ValueError('Block size must be at least 1.')
 
-    if sequence is None:
+    key = (shop_id, purpose)
+
+    with _reserved_blocks_lock:
+        block = _reserved_blocks.get(key)
+
+        if (block is None) or not block.is_usable():
+            block = _reserve_block(shop_id, purpose, block_size)
+            _reserved_blocks[key] = block
+
+        value = block.take_value()
+
+    return NumberSequence(shop_id, purpose, block.prefix, value)
+
+
+def _reserve_block(shop_id: ShopID, purpose: Purpose, size: int
+                  ) -> _ReservedBlock:
+    """Advance the sequence by the given number of steps in a single,
+    atomic statement, and return the reserved steps.
+    """
+    table = DbNumberSequence.__table__
+
+    update = table.update() \
+        .where(table.c.shop_id == shop_id) \
+        .where(table.c.purpose == purpose.name) \
+        .values(value=table.c.value + size) \
+        .returning(table.c.prefix, table.c.value)
+
+    row = db.session.execute(update).fetchone()
+
+    if row is None:
+        db.session.rollback()
         raise NumberGenerationFailed(
             'No sequence configured for shop "{}" and purpose "{}".'
             .format(shop_id, purpose.name))
 
-    sequence.value = DbNumberSequence.value + 1
     db.session.commit()
 
-    return sequence
+    prefix, last_value = row
+    first_value = last_value - size + 1
+
+    return _ReservedBlock(prefix, first_value, last_value)
+
+
+def discard_reserved_blocks() -> None:
+    """Forget the sequence steps reserved by this process, but not
+    handed out yet.
+
+    The next step is then taken from a newly reserved block.
+    """
+    with _reserved_blocks_lock:
+        _reserved_blocks.clear()
 
 
 def format_article_number(sequence: NumberSequence) -> ArticleNumber:
@@ -0,0 +1,139 @@
+"""
+byceps.services.snippet.cache_service
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Process-local caches of the current snippet versions per party (indexed
+by snippet name) and of compiled snippet templates (indexed by version).
+
+Layouts render several snippets per page, so every process keeps the
+current versions of a party's snippets in memory. Setting a new current
+version increments a version number per party stored in Redis. Each
+process compares the version its index has been loaded at with the
+current one and reloads the index once it is outdated.
+
+Snippet versions never change, so their compiled templates never become
+outdated. Templates of versions that have been replaced are dropped
+when the index is reloaded; others are evicted once the cache is full.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+from jinja2 import Template
+
+from ...redis import redis
+from ...typing import PartyID
+from ...util.cache import LRUCache
+
+from .models.snippet import SnippetVersionID
+from .transfer.models import CurrentVersion
+
+
+CurrentVersionsByName = Dict[str, CurrentVersion]
+CachedIndex = Tuple[int, CurrentVersionsByName]
+
+
+VERSION_KEY_FORMAT = 'snippet:current_versions:{}:version'
+
+TEMPLATE_CACHE_MAXSIZE = 1024
+TEMPLATE_PARTS = frozenset(['body', 'head'])
+
+
+_lock = Lock()
+_cached_by_party_id = {}  # type: Dict[PartyID, CachedIndex]
+
+_TEMPLATE_CACHE = LRUCache(TEMPLATE_CACHE_MAXSIZE)
+
+
+def is_enabled() -> bool:
+    """Return `True` if snippets are to be cached."""
+    return has_app_context() and current_app.config['SNIPPET_CACHE_ENABLED']
+
+
+# -------------------------------------------------------------------- #
+# current versions
+
+
+def get_version(party_id: PartyID) -> int:
+    """Return the current version of the party's snippet index."""
+    value = redis.client.get(_get_version_key(party_id))
+    return int(value) if (value is not None) else 0
+
+
+def find_current_versions(party_id: PartyID, version: int
+                         ) -> Optional[CurrentVersionsByName]:
+    """Return the party's cached current snippet versions at that
+    version, or `None` if not cached.
+    """
+    with _lock:
+        cached = _cached_by_party_id.get(party_id)
+
+        if (cached is None) or (cached[0] != version):
+            return None
+
+        return cached[1]
+
+
+def store_current_versions(party_id: PartyID, version: int,
+                           versions_by_name: CurrentVersionsByName) -> None:
+    """Cache the party's current snippet versions at that version.
+
+    The version must have been obtained *before* the snippet versions
+    were fetched from the database so that changes in between are not
+    masked.
+    """
+    with _lock:
+        previous = _cached_by_party_id.get(party_id)
+        _cached_by_party_id[party_id] = (version, versions_by_name)
+
+    if previous is not None:
+        current_ids = {v.id for v in versions_by_name.values()}
+        for replaced_version in previous[1].values():
+            if replaced_version.id not in current_ids:
+                _delete_templates(replaced_version.id)
+
+
+def invalidate(party_id: PartyID) -> None:
+    """Invalidate the party's cached snippet index in all processes.
+
+    To be called after a snippet's current version has been set (and
+    the change has been committed).
+
+    Snippets are edited in the admin application, which does not cache
+    them itself, so this must not depend on caching being enabled.
+    """
+    if not has_app_context():
+        return
+
+    redis.client.incr(_get_version_key(party_id))
+
+
+def _get_version_key(party_id: PartyID) -> str:
+    return VERSION_KEY_FORMAT.format(party_id)
+
+
+# -------------------------------------------------------------------- #
+# compiled templates
+
+
+def find_template(version_id: SnippetVersionID, part: str
+                 ) -> Optional[Template]:
+    """Return the compiled template for that part (body or head) of the
+    snippet version, or `None` if not cached.
+    """
+    return _TEMPLATE_CACHE.get((version_id, part))
+
+
+def store_template(version_id: SnippetVersionID, part: str,
+                   template: Template) -> None:
+    """Cache the compiled template for that part of the snippet version."""
+    _TEMPLATE_CACHE.set((version_id, part), template)
+
+
+def _delete_templates(version_id: SnippetVersionID) -> None:
+    for part in TEMPLATE_PARTS:
+        _TEMPLATE_CACHE.delete((version_id, part))
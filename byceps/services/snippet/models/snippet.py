@@ -118,6 +118,7 @@ class SnippetVersion(db.Model):
     title = db.Column(db.Unicode(80), nullable=True)
     head = db.Column(db.UnicodeText, nullable=True)
     body = db.Column(db.UnicodeText, nullable=False)
+    body_html = db.Column(db.UnicodeText, nullable=True)
     image_url_path = db.Column(db.Unicode(80), nullable=True)
 
     def __init__(self, snippet: Snippet, creator_id: UserID,
@@ -9,12 +9,23 @@ byceps.services.snippet.service
 from difflib import HtmlDiff
 from typing import Optional, Sequence
 
+from flask import url_for
+from jinja2 import TemplateError
+from werkzeug.routing import BuildError
+
 from ...database import db
 from ...typing import PartyID, UserID
+from ...util.templating import find_undeclared_variables, \
+    get_variable_value, load_template
+
+from ..text_markup.service import is_storing_rendered_html_enabled
 
+from . import cache_service
+from .cache_service import CurrentVersionsByName
 from .models.mountpoint import Mountpoint, MountpointID
 from .models.snippet import CurrentVersionAssociation, Snippet, SnippetID, \
     SnippetType, SnippetVersion, SnippetVersionID
+from .transfer.models import CurrentVersion
 
 
 # -------------------------------------------------------------------- #
@@ -74,6 +85,7 @@ def _create_snippet(party_id: PartyID, name: str, type_: SnippetType,
 
     version = SnippetVersion(snippet, creator_id, title, head, body,
                              image_url_path)
+    version.body_html = prerender_body(body)
     db.session.add(version)
 
     current_version_association = CurrentVersionAssociation(snippet, version)
@@ -81,6 +93,8 @@ def _create_snippet(party_id: PartyID, name: str, type_: SnippetType,
 
     db.session.commit()
 
+    cache_service.invalidate(party_id)
+
     return version
 
 
@@ -90,15 +104,45 @@ def _update_snippet(snippet: Snippet, creator_id: UserID, title: Optional[str],
     """Update snippet with a new version, and return that version."""
     version = SnippetVersion(snippet, creator_id, title, head, body,
                              image_url_path)
+    version.body_html = prerender_body(body)
     db.session.add(version)
 
     snippet.current_version = version
 
     db.session.commit()
 
+    cache_service.invalidate(snippet.party_id)
+
     return version
 
 
+def prerender_body(body: str) -> Optional[str]:
+    """Render the body to be stored alongside it.
+
+    Only bodies whose output depends on nothing but their source are
+    rendered, so bodies that embed other snippets (which might change
+    independently) or set the current page are not.
+
+    Return `None` if rendered HTML is not to be stored or if the body
+    cannot be rendered in advance.
+    """
+    if not is_storing_rendered_html_enabled():
+        return None
+
+    if 'render_snippet' in find_undeclared_variables(body):
+        return None
+
+    try:
+        template = load_template(body, template_globals={'url_for': url_for})
+
+        if get_variable_value(template, 'current_page') is not None:
+            return None
+
+        return template.render()
+    except (BuildError, TemplateError):
+        return None
+
+
 def find_snippet(snippet_id: SnippetID) -> Optional[Snippet]:
     """Return the snippet with that id, or `None` if not found."""
     return Snippet.query.get(snippet_id)
@@ -134,6 +178,66 @@ def find_current_version_of_snippet_with_name(party_id: PartyID, name: str
         .one_or_none()
 
 
+def find_current_version(party_id: PartyID, name: str
+                        ) -> Optional[CurrentVersion]:
+    """Return the current version of the snippet with that name for that
+    party, or `None` if not found.
+
+    If enabled, the party's current versions are looked up in the cache
+    instead of the database.
+    """
+    if cache_service.is_enabled():
+        return _get_current_versions_cached(party_id).get(name)
+
+    version = find_current_version_of_snippet_with_name(party_id, name)
+
+    if version is None:
+        return None
+
+    return _db_entity_to_current_version(version)
+
+
+def _get_current_versions_cached(party_id: PartyID) -> CurrentVersionsByName:
+    """Return the current versions of the party's snippets, indexed by
+    snippet name.
+
+    Look them up in the cache first and only query the database if the
+    cached versions are outdated.
+    """
+    version = cache_service.get_version(party_id)
+
+    versions_by_name = cache_service.find_current_versions(party_id, version)
+
+    if versions_by_name is None:
+        db_versions = SnippetVersion.query \
+            .join(CurrentVersionAssociation) \
+            .join(Snippet) \
+                .filter(Snippet.party_id == party_id) \
+            .options(db.contains_eager('snippet')) \
+            .all()
+
+        versions_by_name = {
+            db_version.snippet.name: _db_entity_to_current_version(db_version)
+            for db_version in db_versions
+        }
+
+        cache_service.store_current_versions(party_id, version,
+                                             versions_by_name)
+
+    return versions_by_name
+
+
+def _db_entity_to_current_version(version: SnippetVersion) -> CurrentVersion:
+    return CurrentVersion(
+        version.id,
+        version.snippet.type_,
+        version.title,
+        version.head,
+        version.body,
+        version.body_html,
+    )
+
+
 class SnippetNotFound(Exception):
 
     def __init__(self, name: str) -> None:
@@ -0,0 +1,24 @@
+"""
+byceps.services.snippet.transfer.models
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from typing import Optional
+
+from attr import attrib, attrs
+
+from ..models.snippet import SnippetType, SnippetVersionID
+
+
+@attrs(frozen=True, slots=True)
+class CurrentVersion:
+    """The current version of a snippet, as needed to render it."""
+    id = attrib(type=SnippetVersionID)
+    snippet_type = attrib(type=SnippetType)
+    title = attrib(type=Optional[str])
+    head = attrib(type=Optional[str])
+    body = attrib(type=str)
+    body_html = attrib(type=Optional[str])
@@ -6,9 +6,16 @@ byceps.services.text_markup.service
 :License: Modified BSD, see LICENSE for details.
 """
 
+from collections import namedtuple
+from hashlib import sha256
 from html import escape
+from typing import Optional
 
 from bbcode import Parser
+from flask import current_app, has_app_context
+
+from ...redis import redis
+from ...util.cache import LRUCache
 
 try:
     from .smileys import get_smileys
@@ -58,7 +65,119 @@ _PARSER = _create_parser()
 
 
 def render_html(value: str) -> str:
-    """Render text as HTML, interpreting BBcode."""
+    """Render text as HTML, interpreting BBcode.
+
+    The rendered HTML is cached. As the cache key is derived from the
+    text itself, changed text never hits an outdated entry.
+    """
+    key = _get_cache_key(value)
+
+    html = _LOCAL_CACHE.get(key)
+    if html is not None:
+        return html
+
+    use_redis = _is_redis_cache_enabled()
+
+    if use_redis:
+        html = _find_in_redis_cache(key)
+
+    if html is None:
+        html = _render_html(value)
+
+        if use_redis:
+            _store_in_redis_cache(key, html)
+
+    _LOCAL_CACHE.set(key, html)
+
+    return html
+
+
+def prerender_html(value: str) -> Optional[str]:
+    """Render text as HTML to be stored alongside it, or return `None`
+    if rendered HTML is not to be stored.
+    """
+    if not is_storing_rendered_html_enabled():
+        return None
+
+    return render_html(value)
+
+
+def is_storing_rendered_html_enabled() -> bool:
+    """Return `True` if rendered HTML is to be stored at write time."""
+    return has_app_context() \
+        and current_app.config['TEXT_MARKUP_STORE_RENDERED_HTML']
+
+
+def _render_html(value: str) -> str:
     html = _PARSER.format(value)
     html = _replace_smileys(html)
     return html
+
+
+# -------------------------------------------------------------------- #
+# render cache
+
+
+LOCAL_CACHE_MAXSIZE = 4096
+
+REDIS_KEY_PREFIX = 'text_markup:html:'
+REDIS_ENTRY_TTL = 7 * 24 * 60 * 60  # seconds
+
+
+_LOCAL_CACHE = LRUCache(LOCAL_CACHE_MAXSIZE)
+
+
+class _RedisCacheStatistics:
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+_REDIS_CACHE_STATISTICS = _RedisCacheStatistics()
+
+
+RenderCacheStatistics = namedtuple('RenderCacheStatistics', [
+    'local_size',
+    'local_hits',
+    'local_misses',
+    'redis_hits',
+    'redis_misses',
+])
+
+
+def get_render_cache_statistics() -> RenderCacheStatistics:
+    """Return the numbers of hits and misses of this process' render
+    cache tiers.
+    """
+    return RenderCacheStatistics(
+        len(_LOCAL_CACHE),
+        _LOCAL_CACHE.hits,
+        _LOCAL_CACHE.misses,
+        _REDIS_CACHE_STATISTICS.hits,
+        _REDIS_CACHE_STATISTICS.misses,
+    )
+
+
+def _get_cache_key(value: str) -> str:
+    return sha256(value.encode('utf-8')).hexdigest()
+
+
+def _is_redis_cache_enabled() -> bool:
+    return has_app_context() \
+        and current_app.config['TEXT_MARKUP_RENDER_CACHE_REDIS_ENABLED']
+
+
+def _find_in_redis_cache(key: str) -> Optional[str]:
+    value = redis.client.get(REDIS_KEY_PREFIX + key)
+
+    if value is None:
+        _REDIS_CACHE_STATISTICS.misses += 1
+        return None
+
+    _REDIS_CACHE_STATISTICS.hits += 1
+    return value.decode('utf-8')
+
+
+def _store_in_redis_cache(key: str, html: str) -> None:
+    redis.client.set(REDIS_KEY_PREFIX + key, html, ex=REDIS_ENTRY_TTL)
@@ -39,6 +39,9 @@ class Ticket(db.Model):
     attempts to reserve a seat.
     """
     __tablename__ = 'tickets'
+    __table_args__ = (
+        db.Index('ix_tickets_category_id_created_at_id', 'category_id', 'created_at', 'id'),
+    )
     query_class = TicketQuery
 
     id = db.Column(db.Uuid, default=generate_uuid, primary_key=True)
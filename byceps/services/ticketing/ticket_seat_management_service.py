@@ -10,7 +10,7 @@ from ...database import db
 from ...typing import UserID
 
 from ..seating.models.seat import Seat
-from ..seating import seat_service
+from ..seating import seat_map_service, seat_service
 from ..seating.transfer.models import SeatID
 
 from . import event_service
@@ -93,6 +93,11 @@ def occupy_seat(ticket_id: TicketID, seat_id: SeatID, initiator_id: UserID
 
     db.session.commit()
 
+    changed_seat_ids = {seat_id}
+    if previous_seat_id is not None:
+        changed_seat_ids.add(previous_seat_id)
+    seat_map_service.update_occupancy(changed_seat_ids)
+
 
 def release_seat(ticket_id: TicketID, initiator_id: UserID) -> None:
     """Release the seat occupied by this ticket."""
@@ -109,6 +114,8 @@ def release_seat(ticket_id: TicketID, initiator_id: UserID) -> None:
 
     _deny_seat_management_if_seat_belongs_to_group(seat)
 
+    seat_id = seat.id
+
     ticket.occupied_seat_id = None
 
     event = event_service._build_event('seat-released', ticket.id, {
@@ -118,6 +125,8 @@ def release_seat(ticket_id: TicketID, initiator_id: UserID) -> None:
 
     db.session.commit()
 
+    seat_map_service.update_occupancy({seat_id})
+
 
 def _deny_seat_management_if_ticket_belongs_to_bundle(ticket: Ticket) -> None:
     """Raise an exception if this ticket belongs to a bundle.
@@ -12,6 +12,8 @@ from flask_sqlalchemy import Pagination
 
 from ...database import db
 from ...typing import PartyID, UserID
+from ...util import keyset_pagination
+from ...util.keyset_pagination import Page
 
 from ..party.models.party import Party
 from ..seating.models.seat import Seat
@@ -163,11 +165,14 @@ def get_ticket_with_details(ticket_id: TicketID) -> Optional[Ticket]:
         .get(ticket_id)
 
 
-def get_tickets_with_details_for_party_paginated(party_id: PartyID, page: int,
-                                                 per_page: int,
-                                                 *, search_term=None
-                                                ) -> Pagination:
-    """Return the party's tickets to show on the specified page."""
+def get_tickets_with_details_for_party_page(party_id: PartyID, per_page: int,
+                                            *, after: Optional[str]=None,
+                                            before: Optional[str]=None,
+                                            search_term: Optional[str]=None
+                                           ) -> Page:
+    """Return the page of the party's tickets following (or preceding)
+    the cursor, in order of creation.
+    """
     query = Ticket.query \
         .for_party(party_id) \
         .options(
@@ -181,9 +186,11 @@ def get_tickets_with_details_for_party_paginated(party_id: PartyID, page: int,
         query = query \
             .filter(Ticket.code.ilike(ilike_pattern))
 
-    return query \
-        .order_by(Ticket.created_at) \
-        .paginate(page, per_page)
+    sort_columns = [Ticket.created_at, Ticket.id]
+
+    return keyset_pagination.paginate(query, sort_columns, per_page,
+                                      after=after, before=before,
+                                      descending=False)
 
 
 def get_tickets_in_use_for_party_paginated(party_id: PartyID, page: int,
@@ -9,11 +9,13 @@ byceps.services.ticketing.ticket_user_management_service
 from ...database import db
 from ...typing import UserID
 
+from ..seating import seat_map_service
 from ..user import service as user_service
 
 from . import event_service
 from .exceptions import TicketIsRevoked, UserAccountSuspended, \
     UserAlreadyCheckedIn, UserIdUnknown
+from .models.ticket import Ticket
 from . import ticket_service
 from .transfer.models import TicketID
 
@@ -83,6 +85,8 @@ def appoint_user(ticket_id: TicketID, user_id: UserID, initiator_id: UserID
 
     db.session.commit()
 
+    _update_seat_occupant(ticket)
+
 
 def withdraw_user(ticket_id: TicketID, initiator_id: UserID) -> None:
     """Withdraw the ticket's user."""
@@ -102,3 +106,13 @@ def withdraw_user(ticket_id: TicketID, initiator_id: UserID) -> None:
     db.session.add(event)
 
     db.session.commit()
+
+    _update_seat_occupant(ticket)
+
+
+def _update_seat_occupant(ticket: Ticket) -> None:
+    """Show the ticket's current user on the seat map, if the ticket
+    occupies a seat.
+    """
+    if ticket.occupied_seat_id is not None:
+        seat_map_service.update_occupancy({ticket.occupied_seat_id})
@@ -126,6 +126,21 @@ def find_users(user_ids: Set[UserID]) -> Set[UserTuple]:
     return set(to_tuples())
 
 
+def get_email_addresses(user_ids: Set[UserID]) -> Dict[UserID, str]:
+    """Return the e-mail addresses of the users with those IDs, indexed
+    by user ID.
+    """
+    if not user_ids:
+        return {}
+
+    rows = db.session \
+        .query(User.id, User.email_address) \
+        .filter(User.id.in_(frozenset(user_ids))) \
+        .all()
+
+    return dict(rows)
+
+
 def find_user_by_screen_name(screen_name: str) -> Optional[User]:
     """Return the user with that screen name, or `None` if not found."""
     return User.query \
@@ -13,7 +13,7 @@ from typing import Any, Dict, Optional
 
 from attr import attrib, attrs
 from flask import current_app
-from jinja2 import Environment, FileSystemLoader, Template
+from jinja2 import Environment, Template
 
 from ...typing import BrandID, UserID
 from ...util import templating
@@ -112,15 +112,13 @@ def _render_message_template(sender: User, recipient: User, text: str,
 
 
 def _get_template(name: str) -> Template:
-    env = _create_template_env()
+    env = _get_template_env()
     return env.get_template(name)
 
 
-def _create_template_env() -> Environment:
+def _get_template_env() -> Environment:
     templates_path = os.path.join(current_app.root_path,
                                   'services/user_message/templates')
 
-    loader = FileSystemLoader(templates_path)
-
-    return templating.create_sandboxed_environment(loader=loader,
-                                                   autoescape=False)
+    return templating.get_sandboxed_environment(templates_path,
+                                                autoescape=False)
@@ -9,22 +9,33 @@ Data export as CSV.
 """
 
 import csv
-import io
-from typing import Dict, Iterator, Sequence
+from typing import Dict, Iterable, Iterator, Sequence
 
 
 def serialize_to_csv(
         field_names: Sequence[str],
-        rows: Sequence[Dict[str, str]]
+        rows: Iterable[Dict[str, str]]
     ) -> Iterator[str]:
-    """Serialize the rows (must be dictionary objects) to CSV."""
-    with io.StringIO(newline='') as f:
-        writer = csv.DictWriter(f, field_names,
-                                dialect=csv.excel,
-                                delimiter=';')
+    """Serialize the rows (must be dictionary objects) to CSV.
 
-        writer.writeheader()
-        writer.writerows(rows)
+    Each line is yielded as soon as its row has been serialized, so the
+    rows can be generated lazily and are never held in memory at once.
+    """
+    writer = csv.DictWriter(_LineEcho(), field_names,
+                            dialect=csv.excel,
+                            delimiter=';')
 
-        f.seek(0)
-        yield from f
+    header = dict(zip(field_names, field_names))
+    yield writer.writerow(header)
+
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class _LineEcho:
+    """A file-like object that returns what is written to it instead of
+    storing it.
+    """
+
+    def write(self, value: str) -> str:
+        return value
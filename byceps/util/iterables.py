@@ -6,8 +6,9 @@ byceps.util.iterables
 :License: Modified BSD, see LICENSE for details.
 """
 
-from itertools import tee
-from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+from itertools import islice, tee
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, \
+    TypeVar
 
 
 T = TypeVar('T')
@@ -54,3 +55,23 @@ def pairwise(iterable: Iterable[T]) -> Iterator[Tuple[T, T]]:
     a, b = tee(iterable)
     next(b, None)
     return zip(a, b)
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Return the elements in lists of the given size (except for the
+    last one, which may be shorter).
+
+    Example:
+        xs, 2 -> [x0, x1], [x2, x3], [x4]
+    """
+    if size < 1:
+        raise ValueError('Size must be at least 1.')
+
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
@@ -15,6 +15,7 @@ from contextlib import contextmanager
 
 from flask import current_app
 from rq import Connection, Queue
+from rq.job import Job
 
 from byceps.redis import redis
 
@@ -35,3 +36,23 @@ def enqueue(*args, **kwargs):
     with connection():
         queue = get_queue()
         queue.enqueue(*args, **kwargs)
+
+
+def enqueue_once(job_id: str, *args, **kwargs):
+    """Add the function call to the queue as a job with that ID, unless
+    a job with that ID exists already.
+
+    A job exists while it is queued or running and, until it expires,
+    after it has finished or failed. Note that RQ itself does not care
+    about IDs being reused; enqueuing a job with an existing ID queues
+    it (and thus runs it) again.
+    """
+    with connection():
+        # Jobs are executed right away, and not kept, if not processed
+        # asynchronously.
+        is_async = current_app.config['JOBS_ASYNC']
+        if is_async and Job.exists(job_id):
+            return
+
+        queue = get_queue()
+        queue.enqueue(*args, job_id=job_id, **kwargs)
@@ -0,0 +1,165 @@
+"""
+byceps.util.keyset_pagination
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Keyset (cursor) pagination.
+
+Instead of skipping the rows of previous pages by offset (which gets
+slower the deeper the page), a page starts right after (or ends right
+before) the row a cursor points to. The cursor encodes the sort key of
+that row, so no matter how deep the page, the database only has to
+look up the rows of the page itself (given an index on the sort key).
+
+Pages do not come with a total count, as that would require counting
+all matching rows. A count that can be determined cheaply (e.g. from
+counters that are maintained anyway) can be passed along, though.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import datetime
+import json
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from flask_sqlalchemy import BaseQuery
+
+from ..database import db
+
+
+Page = namedtuple('Page', 'items, total, prev_cursor, next_cursor')
+
+
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def paginate(query: BaseQuery, sort_columns: Sequence, per_page: int, *,
+             after: Optional[str]=None, before: Optional[str]=None,
+             descending: bool=True, total: Optional[int]=None) -> Page:
+    """Return the page of items that follows the `after` cursor, or
+    precedes the `before` cursor, or (if neither is given) the first
+    page.
+
+    The items are ordered by the sort columns, which must be attributes
+    of the queried entity and uniquely identify each item (i.e. end
+    with the primary key). The query must not be ordered already.
+
+    Invalid cursors are ignored, resulting in the first page.
+    """
+    backwards = before is not None
+    cursor = before if backwards else after
+    cursor_values = _decode_cursor_or_none(cursor, len(sort_columns))
+
+    # Going backwards means walking the opposite sort order, starting
+    # at the cursor.
+    walk_descending = (descending != backwards)
+
+    if cursor_values is not None:
+        sort_key = db.tuple_(*sort_columns)
+        cursor_key = db.tuple_(*[
+            db.literal(value, type_=column.type)
+            for column, value in zip(sort_columns, cursor_values)])
+
+        if walk_descending:
+            query = query.filter(sort_key < cursor_key)
+        else:
+            query = query.filter(sort_key > cursor_key)
+
+    if walk_descending:
+        order_by = [column.desc() for column in sort_columns]
+    else:
+        order_by = [column.asc() for column in sort_columns]
+
+    # Fetch one more item than requested to tell if there is another
+    # page in this direction.
+    items = query \
+        .order_by(*order_by) \
+        .limit(per_page + 1) \
+        .all()
+
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if backwards:
+        items.reverse()
+
+    has_prev = has_more if backwards else (cursor_values is not None)
+    has_next = (cursor_values is not None) if backwards else has_more
+
+    prev_cursor = _get_cursor(items[0], sort_columns) \
+        if (items and has_prev) else None
+    next_cursor = _get_cursor(items[-1], sort_columns) \
+        if (items and has_next) else None
+
+    return Page(items, total, prev_cursor, next_cursor)
+
+
+# -------------------------------------------------------------------- #
+# cursors
+
+
+def _get_cursor(item, sort_columns: Sequence) -> str:
+    values = [getattr(item, column.key) for column in sort_columns]
+    return encode_cursor(values)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key values as an opaque, URL-safe string."""
+    data = json.dumps([_encode_value(value) for value in values],
+                      separators=(',', ':'))
+
+    return urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode the cursor to the sort key values.
+
+    Raise `ValueError` if the cursor is invalid.
+    """
+    padding = '=' * (-len(cursor) % 4)
+
+    try:
+        data = urlsafe_b64decode((cursor + padding).encode('ascii'))
+        tagged_values = json.loads(data.decode('utf-8'))
+        return [_decode_value(tag, value) for tag, value in tagged_values]
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor "{}".'.format(cursor)) from e
+
+
+def _decode_cursor_or_none(cursor: Optional[str], value_count: int
+                          ) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+
+    try:
+        values = decode_cursor(cursor)
+    except ValueError:
+        return None
+
+    if len(values) != value_count:
+        return None
+
+    return values
+
+
+def _encode_value(value: Any) -> List[Any]:
+    if isinstance(value, datetime):
+        return ['d', value.strftime(DATETIME_FORMAT)]
+    elif isinstance(value, UUID):
+        return ['u', str(value)]
+    else:
+        return ['v', value]
+
+
+def _decode_value(tag: str, value: Any) -> Any:
+    if tag == 'd':
+        return datetime.strptime(value, DATETIME_FORMAT)
+    elif tag == 'u':
+        return UUID(value)
+    elif tag == 'v':
+        return value
+    else:
+        raise ValueError('Unknown value type tag "{}".'.format(tag))
@@ -8,24 +8,83 @@ Templating utilities
 :License: Modified BSD, see LICENSE for details.
 """
 
-from typing import Any, Dict, Optional
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
-from jinja2 import BaseLoader, Environment, FunctionLoader, Template
+from jinja2 import BaseLoader, BytecodeCache, Environment, \
+    FileSystemBytecodeCache, FileSystemLoader, FunctionLoader, meta, Template
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 
 
 def load_template(source: str, *, template_globals: Dict[str, Any]=None):
     """Load a template from source, using the sandboxed environment."""
-    env = create_sandboxed_environment()
+    env = get_sandboxed_environment()
+    return env.from_string(source, globals=template_globals)
 
-    if template_globals is not None:
-        env.globals.update(template_globals)
 
-    return env.from_string(source)
+# -------------------------------------------------------------------- #
+# shared environments
+
+
+_lock = Lock()
+_environments = {}  # type: Dict[Tuple[Optional[str], bool], Environment]
+_bytecode_cache = None  # type: Optional[BytecodeCache]
+
+
+def get_sandboxed_environment(templates_path: Optional[str]=None, *,
+                              autoescape: bool=True,
+                              filters: Dict[str, Callable]=None
+                             ) -> Environment:
+    """Return the sandboxed environment that loads templates from that
+    path (or, if no path is given, none at all).
+
+    The environment is created on first use and then shared by the
+    whole process, so templates loaded through it are compiled only
+    once. Compiled templates are also stored on the filesystem to be
+    reused by other processes (e.g. job queue workers).
+
+    The filters are only added when the environment is created.
+    """
+    key = (templates_path, autoescape)
+
+    with _lock:
+        env = _environments.get(key)
+
+        if env is None:
+            if templates_path is not None:
+                loader = FileSystemLoader(templates_path)
+                bytecode_cache = _get_bytecode_cache()
+            else:
+                loader = None
+                bytecode_cache = None
+
+            env = create_sandboxed_environment(loader=loader,
+                                               autoescape=autoescape,
+                                               bytecode_cache=bytecode_cache)
+
+            if filters is not None:
+                env.filters.update(filters)
+
+            _environments[key] = env
+
+    return env
+
+
+def _get_bytecode_cache() -> BytecodeCache:
+    global _bytecode_cache
+
+    if _bytecode_cache is None:
+        # Use a private directory for the current user in the system's
+        # temporary directory.
+        _bytecode_cache = FileSystemBytecodeCache()
+
+    return _bytecode_cache
 
 
 def create_sandboxed_environment(*, loader: Optional[BaseLoader]=None,
-                                 autoescape: bool=True) -> Environment:
+                                 autoescape: bool=True,
+                                 bytecode_cache: Optional[BytecodeCache]=None
+                                ) -> Environment:
     """Create a sandboxed environment."""
     if loader is None:
         # A loader that never finds a template.
@@ -33,7 +92,12 @@ def create_sandboxed_environment(*, loader: Optional[BaseLoader]=None,
 
     return ImmutableSandboxedEnvironment(
         loader=loader,
-        autoescape=autoescape)
+        autoescape=autoescape,
+        bytecode_cache=bytecode_cache)
+
+
+# -------------------------------------------------------------------- #
+# inspection
 
 
 def get_variable_value(template: Template, name: str) -> Optional[Any]:
@@ -44,3 +108,12 @@ def get_variable_value(template: Template, name: str) -> Optional[Any]:
         return getattr(template.module, name)
     except AttributeError:
         return None
+
+
+def find_undeclared_variables(source: str) -> Set[str]:
+    """Return the names of the variables the template uses without
+    defining them itself (i.e. those expected as globals or context).
+    """
+    env = get_sandboxed_environment()
+    ast = env.parse(source)
+    return meta.find_undeclared_variables(ast)
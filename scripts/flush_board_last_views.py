@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+"""Write users' buffered last views of board categories and topics from
+Redis to the database.
+
+Only of use if `BOARD_LAST_VIEWS_WRITE_BEHIND` is enabled. Either run
+this periodically (e.g. via cron), or keep it running with an interval.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from time import sleep
+
+import click
+
+from byceps.services.board import last_view_buffer_service
+from byceps.util.system import get_config_filename_from_env_or_exit
+
+from bootstrap.util import app_context
+
+
+@click.command()
+@click.option('--interval', type=int,
+              help='Keep running, flushing every that many seconds.')
+def execute(interval):
+    if interval is None:
+        flush()
+        return
+
+    while True:
+        flush()
+        sleep(interval)
+
+
+def flush():
+    user_count = last_view_buffer_service.flush()
+    click.echo('Flushed buffered last views of {:d} user(s).'
+               .format(user_count))
+
+
+if __name__ == '__main__':
+    config_filename = get_config_filename_from_env_or_exit()
+    with app_context(config_filename):
+        execute()
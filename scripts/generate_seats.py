@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""Generate the seats of a seating area as a grid of rows and columns.
+
+Rows are laid out along the y axis, columns along the x axis. Labels
+are formatted with the (1-based) `row` and `column` numbers and the
+`row_letter` (A to Z, then AA and so on).
+
+All seats are validated before any of them is inserted.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from time import monotonic
+
+import click
+
+from byceps.services.seating import seat_import_service
+from byceps.services.ticketing import category_service
+from byceps.util.system import get_config_filename_from_env_or_exit
+
+from bootstrap.util import app_context
+from bootstrap.validators import validate_party, validate_seating_area
+
+
+def get_category(ctx, param, category_id):
+    category = category_service.find_category(category_id)
+
+    if not category:
+        raise click.BadParameter(
+            'Unknown ticket category ID "{}".'.format(category_id))
+
+    return category
+
+
+@click.command()
+@click.argument('party', callback=validate_party)
+@click.argument('area', callback=validate_seating_area)
+@click.argument('category', callback=get_category)
+@click.argument('rows', type=click.IntRange(min=1))
+@click.argument('columns', type=click.IntRange(min=1))
+@click.option('--origin-x', type=int, default=0, show_default=True)
+@click.option('--origin-y', type=int, default=0, show_default=True)
+@click.option('--spacing-x', type=int, default=1, show_default=True)
+@click.option('--spacing-y', type=int, default=1, show_default=True)
+@click.option('--label-format', default='{row_letter}{column}',
+              show_default=True)
+def execute(party, area, category, rows, columns, origin_x, origin_y,
+            spacing_x, spacing_y, label_format):
+    started_at = monotonic()
+
+    seats = seat_import_service.generate_grid(rows, columns, category.id,
+                                              origin_x=origin_x,
+                                              origin_y=origin_y,
+                                              spacing_x=spacing_x,
+                                              spacing_y=spacing_y,
+                                              label_format=label_format)
+
+    try:
+        seat_count = seat_import_service.import_seats(area, seats)
+    except seat_import_service.InvalidSeatLayout as e:
+        for error in e.errors:
+            click.secho(error, fg='red', err=True)
+        raise click.ClickException('No seats have been created.')
+
+    duration = monotonic() - started_at
+
+    click.secho('Created {:d} seats in {:.2f} seconds.'
+                .format(seat_count, duration), fg='green')
+
+
+if __name__ == '__main__':
+    config_filename = get_config_filename_from_env_or_exit()
+    with app_context(config_filename):
+        execute()
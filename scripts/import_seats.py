@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+"""Import the seats of a seating area from a CSV or JSON file.
+
+CSV files need a header line naming the columns `x`, `y`, `label`
+(optional) and `category_id` (optional if a default category is given).
+JSON files need to contain an array of objects with the same keys.
+
+All seats are validated before any of them is inserted.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from time import monotonic
+
+import click
+
+from byceps.services.seating import seat_import_service
+from byceps.services.ticketing import category_service
+from byceps.util.system import get_config_filename_from_env_or_exit
+
+from bootstrap.util import app_context
+from bootstrap.validators import validate_party, validate_seating_area
+
+
+def get_category_id(ctx, param, category_id):
+    if category_id is None:
+        return None
+
+    category = category_service.find_category(category_id)
+
+    if not category:
+        raise click.BadParameter(
+            'Unknown ticket category ID "{}".'.format(category_id))
+
+    return category.id
+
+
+@click.command()
+@click.argument('party', callback=validate_party)
+@click.argument('area', callback=validate_seating_area)
+@click.argument('seats_file', type=click.File(encoding='utf-8'))
+@click.option('--category', 'default_category_id', callback=get_category_id,
+              help='ticket category ID for seats without one')
+def execute(party, area, seats_file, default_category_id):
+    started_at = monotonic()
+
+    if seats_file.name.endswith('.json'):
+        parse = seat_import_service.parse_seats_from_json
+        data = seats_file.read()
+    else:
+        parse = seat_import_service.parse_seats_from_csv
+        data = seats_file
+
+    try:
+        seats = parse(data, default_category_id)
+        seat_count = seat_import_service.import_seats(area, seats)
+    except seat_import_service.InvalidSeatLayout as e:
+        for error in e.errors:
+            click.secho(error, fg='red', err=True)
+        raise click.ClickException('No seats have been imported.')
+
+    duration = monotonic() - started_at
+
+    click.secho('Imported {:d} seats in {:.2f} seconds.'
+                .format(seat_count, duration), fg='green')
+
+
+if __name__ == '__main__':
+    config_filename = get_config_filename_from_env_or_exit()
+    with app_context(config_filename):
+        execute()
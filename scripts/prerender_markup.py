@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""Render the markup of existing board postings, news item versions and
+snippet versions and store the HTML alongside the source.
+
+Rows are processed in batches, each of which is committed on its own,
+so the script can be interrupted and run again. Rows that already have
+rendered HTML are skipped.
+
+Requires `TEXT_MARKUP_STORE_RENDERED_HTML` to be enabled.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import click
+
+from byceps.database import db
+from byceps.services.board.models.posting import Posting
+from byceps.services.news.models import ItemVersion
+from byceps.services.news import service as news_service
+from byceps.services.snippet.models.snippet import SnippetVersion
+from byceps.services.snippet import service as snippet_service
+from byceps.services.text_markup.service import \
+    is_storing_rendered_html_enabled, prerender_html
+from byceps.util.system import get_config_filename_from_env_or_exit
+
+from bootstrap.util import app_context
+
+
+@click.command()
+@click.option('--batch-size', type=int, default=500, show_default=True,
+              help='number of rows to render per transaction')
+def execute(batch_size):
+    if not is_storing_rendered_html_enabled():
+        raise click.ClickException(
+            'Storing rendered HTML is not enabled in the configuration.')
+
+    prerender(Posting, lambda posting: prerender_html(posting.body),
+              'board postings', batch_size)
+    prerender(ItemVersion, news_service.prerender_body,
+              'news item versions', batch_size)
+    prerender(SnippetVersion,
+              lambda version: snippet_service.prerender_body(version.body),
+              'snippet versions', batch_size)
+
+    click.secho('Done.', fg='green')
+
+
+def prerender(model, render, label, batch_size):
+    """Render and store the body of all rows of the model that do not
+    have rendered HTML yet.
+    """
+    rendered_count = 0
+    last_id = None
+
+    while True:
+        # Page by ID instead of filtering on missing HTML only, as rows
+        # that cannot be rendered in advance would be selected again
+        # and again.
+        query = model.query \
+            .filter(model.body_html == None)
+
+        if last_id is not None:
+            query = query.filter(model.id > last_id)
+
+        rows = query \
+            .order_by(model.id) \
+            .limit(batch_size) \
+            .all()
+
+        if not rows:
+            break
+
+        for row in rows:
+            row.body_html = render(row)
+            if row.body_html is not None:
+                rendered_count += 1
+
+        last_id = rows[-1].id
+
+        db.session.commit()
+
+    click.echo('Rendered {:d} {}.'.format(rendered_count, label))
+
+
+if __name__ == '__main__':
+    config_filename = get_config_filename_from_env_or_exit()
+    with app_context(config_filename) as app:
+        # News items and snippets may generate URLs, which requires a
+        # request context.
+        with app.test_request_context():
+            execute()
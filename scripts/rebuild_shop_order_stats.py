@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+"""Recount the number and total amount of orders per payment state of
+the party's shop.
+
+The statistics are usually updated incrementally. This is meant to be
+run once to fill them for existing orders, and then whenever they are
+suspected to have drifted.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import click
+
+from byceps.services.shop.order import stats_service as order_stats_service
+from byceps.services.shop.shop import service as shop_service
+from byceps.util.system import get_config_filename_from_env_or_exit
+
+from bootstrap.util import app_context
+from bootstrap.validators import validate_party
+
+
+@click.command()
+@click.argument('party', callback=validate_party)
+def execute(party):
+    shop = shop_service.find_shop_for_party(party.id)
+    if shop is None:
+        raise click.ClickException(
+            'Party "{}" has no shop.'.format(party.id))
+
+    order_stats_service.rebuild(shop.id)
+
+    click.secho('Done.', fg='green')
+
+
+if __name__ == '__main__':
+    config_filename = get_config_filename_from_env_or_exit()
+    with app_context(config_filename):
+        execute()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+
+"""Enqueue a full recount of the topic and posting counts and latest
+postings of all categories and topics of that board.
+
+The counts are usually updated incrementally. This is meant to be run
+periodically (e.g. via cron) to fix any drift.
+
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import click
+
+from byceps.services.board import aggregation_service
+from byceps.util.system import get_config_filename_from_env_or_exit
+
+from bootstrap.util import app_context
+from bootstrap.validators import validate_board
+
+
+@click.command()
+@click.argument('board', callback=validate_board)
+def execute(board):
+    aggregation_service.enqueue_board_reconciliation(board.id)
+
+    click.secho('Enqueued.', fg='green')
+
+
+if __name__ == '__main__':
+    config_filename = get_config_filename_from_env_or_exit()
+    with app_context(config_filename):
+        execute()
@@ -0,0 +1,83 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from uuid import uuid4
+
+from byceps.services.authentication.session.models import SessionToken
+from byceps.services.authentication.session import service as session_service
+from byceps.services.authorization import service as authorization_service
+from byceps.services.user import service as user_service
+from byceps.services.user_avatar import service as user_avatar_service
+
+from tests.base import AbstractAppTestCase
+from tests.helpers import assign_permissions_to_user, sql_statements_counted
+
+
+class CurrentUserLoadingTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        user = self.create_user('McFly')
+        self.user_id = user.id
+
+        self.create_session_token(self.user_id)
+        self.auth_token = self.find_auth_token(self.user_id)
+
+        assign_permissions_to_user(self.user_id, 'board_moderator',
+                                   {'board_topic_hide', 'board_topic_lock'})
+
+    def test_find_user_context(self):
+        with self.app.test_request_context():
+            context = session_service.find_user_context(self.user_id,
+                                                        self.auth_token)
+
+        assert context.user.id == self.user_id
+        assert context.avatar_url is None
+        assert context.permission_ids == {'board_topic_hide',
+                                          'board_topic_lock'}
+
+    def test_find_user_context_without_permission_ids(self):
+        with self.app.test_request_context():
+            context = session_service.find_user_context(
+                self.user_id, self.auth_token, include_permission_ids=False)
+
+        assert context.user.id == self.user_id
+        assert context.permission_ids is None
+
+    def test_find_user_context_with_invalid_auth_token(self):
+        with self.app.test_request_context():
+            context = session_service.find_user_context(self.user_id,
+                                                        uuid4())
+
+        assert context is None
+
+    def test_statement_count(self):
+        self.db.session.expunge_all()
+
+        # separate lookups, as done before
+        with self.app.test_request_context():
+            with sql_statements_counted() as statements:
+                user_service.find_user(self.user_id)
+                SessionToken.query.get(self.auth_token)
+                authorization_service.get_permission_ids_for_user(self.user_id)
+                user_avatar_service.get_avatar_url_for_user(self.user_id)
+
+        assert len(statements) == 4
+
+        self.db.session.expunge_all()
+
+        # combined lookup
+        with self.app.test_request_context():
+            with sql_statements_counted() as statements:
+                session_service.find_user_context(self.user_id,
+                                                  self.auth_token)
+
+        assert len(statements) == 1
+
+    # helpers
+
+    def find_auth_token(self, user_id):
+        return session_service.find_session_token_for_user(user_id).token
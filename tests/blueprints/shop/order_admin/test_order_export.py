@@ -51,6 +51,34 @@ class ExportTestCase(ShopTestBase):
         body = response.get_data().decode('utf-8')
         assert body == expected
 
+    def test_export_orders_as_csv(self):
+        url = '/admin/shop/orders/parties/{}/export.csv'.format(self.party.id)
+        with self.client(user_id=self.admin.id) as client:
+            response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.content_type == 'text/csv; charset=utf-8'
+
+        body = response.get_data().decode('utf-8')
+        assert body.splitlines() == [
+            'Bestellnummer;Bestellt am;Vorname;Nachname;Straße;PLZ;Ort;Land;'
+                'E-Mail-Adresse;Zahlungsart;Zahlungsstatus;Gesamtbetrag',
+            'LR-08-B00027;26.02.2015 13:26:24;Hans-Werner;Mustermann;'
+                'Nebenstraße 23a;42000;Hauptstadt;Deutschland;'
+                'h-w.mustermann@example.com;bank_transfer;open;401.00',
+        ]
+
+    def test_export_orders_as_csv_filtered_by_payment_state(self):
+        url = '/admin/shop/orders/parties/{}/export.csv?only_payment_state=paid' \
+            .format(self.party.id)
+        with self.client(user_id=self.admin.id) as client:
+            response = client.get(url)
+
+        assert response.status_code == 200
+
+        body = response.get_data().decode('utf-8')
+        assert len(body.splitlines()) == 1  # header only
+
     # helpers
 
     def create_admin(self):
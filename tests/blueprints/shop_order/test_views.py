@@ -6,6 +6,7 @@
 from unittest.mock import patch
 
 from byceps.services.shop.article.models.article import Article
+from byceps.services.shop.order.admission_service import AdmissionStatus
 from byceps.services.shop.order.models.order import Order
 
 from testfixtures.shop_article import create_article
@@ -108,6 +109,41 @@ class ShopTestCase(ShopTestBase):
 
         order_placed_mock.assert_called_once_with(None, order_id=order.id)
 
+    @patch('byceps.services.shop.order.admission_service.try_admit')
+    @patch('byceps.blueprints.shop_order.signals.order_placed.send')
+    def test_order_while_waiting_for_admission(self, order_placed_mock,
+                                               try_admit_mock):
+        self.app.config['SHOP_ORDER_ADMISSION_LIMIT'] = 1
+        try_admit_mock.return_value = AdmissionStatus(False, 3)
+
+        # The request's teardown removes the session, detaching the shop
+        # and the orderer.
+        shop_id = self.shop.id
+        orderer_id = self.orderer.id
+
+        url = '/shop/order'
+        article_quantity_key = 'article_{}'.format(self.article_id)
+        form_data = {
+            'first_names': 'Hiro',
+            'last_name': 'Protagonist',
+            'country': 'State of Mind',
+            'zip_code': '31337',
+            'city': 'Atrocity',
+            'street': 'L33t Street 101',
+            article_quantity_key: 3,
+        }
+        with self.client(user_id=orderer_id) as client:
+            response = client.post(url, data=form_data)
+
+        assert response.status_code == 200
+        assert 'Platz <strong>3</strong>' in response.get_data(as_text=True)
+
+        try_admit_mock.assert_called_once_with(shop_id, orderer_id)
+
+        assert self.get_article().quantity == 5
+        assert Order.query.placed_by(orderer_id).count() == 0
+        order_placed_mock.assert_not_called()
+
     # helpers
 
     def get_article(self):
@@ -7,13 +7,24 @@ tests.helpers
 """
 
 from contextlib import contextmanager
+import os
+from unittest.mock import patch
 
 from flask import appcontext_pushed, g
+import pytest
+from redis import StrictRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
 
 from byceps.application import create_app
+from byceps.database import db
 from byceps.services.authorization import service as authorization_service
 
 from .base import CONFIG_FILENAME_TEST_PARTY
+from .mocks import FakeRedisClient
+
+
+REDIS_URL = 'redis://127.0.0.1:6379/0'
 
 
 @contextmanager
@@ -55,3 +66,58 @@ def assign_permissions_to_user(user_id, role_id, permission_ids):
         authorization_service.assign_permission_to_role(permission.id, role.id)
 
     authorization_service.assign_role_to_user(user_id, role.id)
+
+
+@contextmanager
+def sql_statements_counted():
+    """Collect the SQL statements sent to the database in the block.
+
+    Yield the list the statements are appended to.
+    """
+    statements = []
+
+    def handler(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', handler)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', handler)
+
+
+@contextmanager
+def fake_redis_client_set(service_module):
+    """Let the service module use an in-memory Redis client, as if it
+    was running within an application context.
+
+    Yield the client.
+    """
+    client = FakeRedisClient()
+
+    with patch.object(service_module, 'redis') as redis, \
+            patch.object(service_module, 'has_app_context',
+                         return_value=True):
+        redis.client = client
+        yield client
+
+
+def get_redis_client():
+    """Return a client for the Redis server to test against, or skip
+    the test if the server is not available.
+
+    The Redis client of the application is a mock, but some behavior
+    (i.e. Lua scripts) can only be tested against a real server.
+    """
+    # Allow overriding of Redis URL from the environment.
+    url = os.environ.get('REDIS_URL', REDIS_URL)
+
+    client = StrictRedis.from_url(url)
+
+    try:
+        client.ping()
+    except RedisConnectionError:
+        pytest.skip('Redis is not available.')
+
+    return client
@@ -14,3 +14,35 @@ def strict_redis_client_from_url(url):
     mock = MagicMock()
     mock.__class__ = StrictRedis
     return mock
+
+
+class FakeRedisClient:
+    """An in-memory stand-in for the few Redis commands the cache
+    services use to store values and versions.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = _encode(value)
+
+    def incr(self, key):
+        self.values[key] = _encode(int(self.values.get(key, b'0')) + 1)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return value
+
+    return str(value).encode('utf-8')
@@ -0,0 +1,66 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from uuid import UUID
+
+import pytest
+
+from byceps.services.authorization import cache_service
+
+from tests.helpers import fake_redis_client_set
+
+
+USER_ID = UUID('a7b4b3b2-5b4c-4b8b-9d5e-31e6c0f2b1aa')
+
+
+@pytest.fixture
+def redis_client():
+    cache_service._local_cache.clear()
+    with fake_redis_client_set(cache_service) as client:
+        yield client
+
+
+def test_store_and_find(redis_client):
+    version = cache_service.get_version(USER_ID)
+    permission_ids = frozenset(['board_topic_hide', 'board_topic_lock'])
+
+    cache_service.store_permission_ids(USER_ID, version, permission_ids)
+
+    assert cache_service.find_permission_ids(USER_ID, version) \
+        == permission_ids
+
+
+def test_find_falls_back_to_redis(redis_client):
+    version = cache_service.get_version(USER_ID)
+    permission_ids = frozenset(['board_topic_hide'])
+
+    cache_service.store_permission_ids(USER_ID, version, permission_ids)
+    cache_service._local_cache.clear()
+
+    assert cache_service.find_permission_ids(USER_ID, version) \
+        == permission_ids
+
+
+def test_invalidate(redis_client):
+    version_before = cache_service.get_version(USER_ID)
+    cache_service.store_permission_ids(USER_ID, version_before, frozenset())
+
+    cache_service.invalidate()
+
+    version_after = cache_service.get_version(USER_ID)
+    assert version_after != version_before
+    assert cache_service.find_permission_ids(USER_ID, version_after) is None
+
+
+def test_invalidate_for_user(redis_client):
+    other_user_id = UUID('0c2d2d4c-8e0f-4b1d-8b5f-2a0e7f3c9d11')
+
+    version_before = cache_service.get_version(USER_ID)
+    other_version_before = cache_service.get_version(other_user_id)
+
+    cache_service.invalidate_for_user(USER_ID)
+
+    assert cache_service.get_version(USER_ID) != version_before
+    assert cache_service.get_version(other_user_id) == other_version_before
@@ -0,0 +1,94 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from byceps.services.board import aggregation_service, posting_service, \
+    topic_service
+from byceps.services.board.models.category import Category
+from byceps.services.board.models.topic import Topic
+
+from testfixtures.board import create_board, create_category, \
+    create_posting, create_topic
+
+from tests.base import AbstractAppTestCase
+
+
+class AggregationServiceTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = self.create_user()
+        self.moderator = self.create_user('Moderator')
+
+        self.create_brand_and_party()
+
+        board = create_board(self.brand.id, self.brand.id)
+        self.category_id = create_category(board.id).id
+
+    def test_create_topic_and_postings(self):
+        topic = create_topic(self.category_id, self.user.id)
+        posting = create_posting(topic, self.user.id)
+
+        self.assert_topic_counts(topic.id, 2, posting.created_at)
+        self.assert_category_counts(1, 2, posting.created_at)
+
+    def test_hide_and_unhide_latest_posting(self):
+        topic = create_topic(self.category_id, self.user.id)
+        initial_posting_created_at = topic.initial_posting.created_at
+        posting = create_posting(topic, self.user.id)
+
+        posting_service.hide_posting(posting, self.moderator.id)
+
+        self.assert_topic_counts(topic.id, 1, initial_posting_created_at)
+        self.assert_category_counts(1, 1, initial_posting_created_at)
+
+        posting_service.unhide_posting(posting, self.moderator.id)
+
+        self.assert_topic_counts(topic.id, 2, posting.created_at)
+        self.assert_category_counts(1, 2, posting.created_at)
+
+    def test_hide_and_unhide_topic(self):
+        topic1 = create_topic(self.category_id, self.user.id, number=1)
+        topic2 = create_topic(self.category_id, self.user.id, number=2)
+        topic1_last_updated_at = topic1.last_updated_at
+        topic2_last_updated_at = topic2.last_updated_at
+
+        topic_service.hide_topic(topic2, self.moderator.id)
+
+        self.assert_category_counts(1, 2, topic1_last_updated_at)
+
+        topic_service.unhide_topic(topic2, self.moderator.id)
+
+        self.assert_category_counts(2, 2, topic2_last_updated_at)
+
+    def test_reconcile_board_fixes_drift(self):
+        topic = create_topic(self.category_id, self.user.id)
+        posting = create_posting(topic, self.user.id)
+
+        # Introduce drift.
+        Topic.query.filter_by(id=topic.id).update({'posting_count': 23})
+        Category.query.filter_by(id=self.category_id) \
+            .update({'topic_count': 42, 'posting_count': 0})
+        self.db.session.commit()
+
+        aggregation_service.reconcile_board(self.brand.id)
+
+        self.assert_topic_counts(topic.id, 2, posting.created_at)
+        self.assert_category_counts(1, 2, posting.created_at)
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def assert_topic_counts(self, topic_id, posting_count, last_updated_at):
+        topic = Topic.query.get(topic_id)
+        assert topic.posting_count == posting_count
+        assert topic.last_updated_at == last_updated_at
+
+    def assert_category_counts(self, topic_count, posting_count,
+                               last_posting_updated_at):
+        category = Category.query.get(self.category_id)
+        assert category.topic_count == topic_count
+        assert category.posting_count == posting_count
+        assert category.last_posting_updated_at == last_posting_updated_at
@@ -0,0 +1,150 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy.exc import OperationalError
+
+from byceps.redis import redis
+from byceps.services.board import last_view_buffer_service
+from byceps.services.board.models.last_category_view import LastCategoryView
+from byceps.services.board.models.last_topic_view import LastTopicView
+
+from testfixtures.board import create_board, create_category, create_topic
+
+from tests.base import AbstractAppTestCase
+from tests.helpers import get_redis_client
+
+
+class LastViewBufferFlushTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.redis_client = get_redis_client()
+
+        self.user_id = self.create_user('User').id
+        self.other_user_id = self.create_user('OtherUser').id
+
+        self.create_brand_and_party()
+
+        board = create_board(self.brand.id, self.brand.id)
+        self.category_id = create_category(board.id).id
+        self.topic1_id = create_topic(self.category_id, self.user_id,
+                                      number=1).id
+        self.topic2_id = create_topic(self.category_id, self.user_id,
+                                      number=2).id
+
+    def tearDown(self):
+        for user_id in str(self.user_id), str(self.other_user_id):
+            self.redis_client.srem(
+                last_view_buffer_service.KEY_DIRTY_USER_IDS, user_id)
+            self.redis_client.delete(
+                last_view_buffer_service.KEY_PREFIX_CATEGORY_VIEWS + user_id,
+                last_view_buffer_service.KEY_PREFIX_TOPIC_VIEWS + user_id)
+
+        super().tearDown()
+
+    def test_flush(self):
+        earlier = datetime(2018, 8, 3, 20, 0, 0)
+        later = earlier + timedelta(minutes=5)
+
+        # An older view that is already stored is to be updated.
+        self.db.session.add(LastTopicView(self.user_id, self.topic1_id,
+                                          earlier))
+        self.db.session.commit()
+
+        with self.redis_client_set():
+            last_view_buffer_service.buffer_category_view(
+                self.category_id, self.user_id, later)
+            last_view_buffer_service.buffer_topic_view(
+                self.topic1_id, self.user_id, later)
+            last_view_buffer_service.buffer_topic_view(
+                self.topic2_id, self.user_id, earlier)
+
+            user_count = last_view_buffer_service.flush()
+
+        assert user_count == 1
+
+        assert self.get_category_views(self.user_id) == {
+            self.category_id: later,
+        }
+        assert self.get_topic_views(self.user_id) == {
+            self.topic1_id: later,
+            self.topic2_id: earlier,
+        }
+
+        assert not self.redis_client.sismember(
+            last_view_buffer_service.KEY_DIRTY_USER_IDS, str(self.user_id))
+
+    def test_flush_drops_views_that_cannot_be_written(self):
+        now = datetime(2018, 8, 3, 20, 0, 0)
+        unknown_topic_id = uuid4()
+
+        with self.redis_client_set():
+            last_view_buffer_service.buffer_topic_view(
+                unknown_topic_id, self.user_id, now)
+            last_view_buffer_service.buffer_topic_view(
+                self.topic1_id, self.user_id, now)
+            last_view_buffer_service.buffer_topic_view(
+                self.topic2_id, self.other_user_id, now)
+
+            user_count = last_view_buffer_service.flush()
+
+            buffered_views = last_view_buffer_service.get_buffered_topic_views(
+                {unknown_topic_id}, self.user_id)
+
+        # The user's other views and the other user's views have been
+        # written nonetheless.
+        assert user_count == 2
+        assert self.get_topic_views(self.user_id) == {
+            self.topic1_id: now,
+        }
+        assert self.get_topic_views(self.other_user_id) == {
+            self.topic2_id: now,
+        }
+
+        assert buffered_views == {}
+        assert not self.redis_client.sismember(
+            last_view_buffer_service.KEY_DIRTY_USER_IDS, str(self.user_id))
+
+    def test_flush_keeps_views_if_writing_fails(self):
+        now = datetime(2018, 8, 3, 20, 0, 0)
+        error = OperationalError('INSERT ...', {}, Exception())
+
+        with self.redis_client_set():
+            last_view_buffer_service.buffer_topic_view(
+                self.topic1_id, self.user_id, now)
+
+            with patch.object(last_view_buffer_service, '_upsert_views',
+                              side_effect=error):
+                user_count = last_view_buffer_service.flush()
+
+            buffered_views = last_view_buffer_service.get_buffered_topic_views(
+                {self.topic1_id}, self.user_id)
+
+        assert user_count == 0
+        assert self.get_topic_views(self.user_id) == {}
+        assert buffered_views == {self.topic1_id: now}
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    @contextmanager
+    def redis_client_set(self):
+        with self.app.app_context(), \
+                patch.object(redis, '_client', self.redis_client):
+            yield
+
+    def get_category_views(self, user_id):
+        views = LastCategoryView.query.filter_by(user_id=user_id).all()
+        return {view.category_id: view.occurred_at for view in views}
+
+    def get_topic_views(self, user_id):
+        views = LastTopicView.query.filter_by(user_id=user_id).all()
+        return {view.topic_id: view.occurred_at for view in views}
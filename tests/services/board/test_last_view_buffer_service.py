@@ -0,0 +1,57 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+
+from byceps.services.board.last_view_buffer_service import latest, \
+    merge_view_times
+
+
+ID1 = UUID('c3b5a3f0-d9a1-4f0e-9b52-0a3c5e5bd4a1')
+ID2 = UUID('5a1e0c44-25c7-4f5c-9a63-4d3b1fce1b0e')
+ID3 = UUID('f0b8a7e2-6b1d-4a4b-8d3f-7c2e9d8a5b6c')
+
+
+@pytest.mark.parametrize('timestamps, expected', [
+    (
+        [],
+        None,
+    ),
+    (
+        [None, None],
+        None,
+    ),
+    (
+        [datetime(2018, 8, 1, 12, 0), None],
+        datetime(2018, 8, 1, 12, 0),
+    ),
+    (
+        [datetime(2018, 8, 1, 12, 0), datetime(2018, 8, 1, 12, 5)],
+        datetime(2018, 8, 1, 12, 5),
+    ),
+])
+def test_latest(timestamps, expected):
+    assert latest(*timestamps) == expected
+
+
+def test_merge_view_times():
+    persisted = {
+        ID1: datetime(2018, 8, 1, 12, 0),
+        ID2: datetime(2018, 8, 1, 12, 30),
+    }
+    buffered = {
+        ID1: datetime(2018, 8, 1, 12, 15),
+        ID2: datetime(2018, 8, 1, 12, 10),
+        ID3: datetime(2018, 8, 1, 12, 20),
+    }
+
+    assert merge_view_times(persisted, buffered) == {
+        ID1: datetime(2018, 8, 1, 12, 15),
+        ID2: datetime(2018, 8, 1, 12, 30),
+        ID3: datetime(2018, 8, 1, 12, 20),
+    }
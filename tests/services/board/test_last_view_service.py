@@ -0,0 +1,63 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from byceps.services.board import last_view_service
+
+from testfixtures.board import create_board, create_category, create_topic
+
+from tests.base import AbstractAppTestCase
+from tests.helpers import sql_statements_counted
+
+
+class LastViewServiceTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.user_id = self.create_user().id
+
+        self.create_brand_and_party()
+
+        board = create_board(self.brand.id, self.brand.id)
+        self.category1_id = create_category(board.id, number=1).id
+        self.category2_id = create_category(board.id, number=2).id
+
+    def test_find_categories_last_viewed_at(self):
+        last_view_service.mark_category_as_just_viewed(self.category1_id,
+                                                       self.user_id)
+
+        category_ids = {self.category1_id, self.category2_id}
+
+        with sql_statements_counted() as statements:
+            actual = last_view_service.find_categories_last_viewed_at(
+                category_ids, self.user_id)
+
+        assert len(statements) == 1
+        assert set(actual.keys()) == {self.category1_id}
+
+    def test_find_topics_last_viewed_at(self):
+        topic_ids = {
+            create_topic(self.category1_id, self.user_id, number=i).id
+            for i in range(1, 6)
+        }
+
+        viewed_topic_ids = set(list(topic_ids)[:3])
+        for topic_id in viewed_topic_ids:
+            last_view_service.mark_topic_as_just_viewed(topic_id, self.user_id)
+
+        with sql_statements_counted() as statements:
+            actual = last_view_service.find_topics_last_viewed_at(
+                topic_ids, self.user_id)
+
+        assert len(statements) == 1
+        assert set(actual.keys()) == viewed_topic_ids
+
+    def test_find_topics_last_viewed_at_without_topics(self):
+        with sql_statements_counted() as statements:
+            actual = last_view_service.find_topics_last_viewed_at(
+                set(), self.user_id)
+
+        assert len(statements) == 0
+        assert actual == {}
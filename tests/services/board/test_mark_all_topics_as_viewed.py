@@ -0,0 +1,92 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime
+from uuid import uuid4
+
+from byceps.services.board import last_view_service
+from byceps.services.board.models.last_topic_view import LastTopicView
+from byceps.services.board.models.topic import Topic
+
+from testfixtures.board import create_board, create_category
+
+from tests.base import AbstractAppTestCase
+from tests.helpers import sql_statements_counted
+
+
+TOPIC_COUNT = 5000
+
+
+class MarkAllTopicsAsViewedTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.user_id = self.create_user().id
+
+        self.create_brand_and_party()
+
+        board = create_board(self.brand.id, self.brand.id)
+        self.category_id = create_category(board.id, number=1).id
+        self.other_category_id = create_category(board.id, number=2).id
+
+        self.topic_ids = self.create_topics(self.category_id, TOPIC_COUNT)
+        self.other_topic_ids = self.create_topics(self.other_category_id, 3)
+
+    def test_mark_all_topics_in_category_as_viewed(self):
+        # Some topics have been viewed before.
+        viewed_topic_id = self.topic_ids[0]
+        last_view_service.mark_topic_as_just_viewed(viewed_topic_id,
+                                                    self.user_id)
+        viewed_at_before = last_view_service.find_topic_last_viewed_at(
+            viewed_topic_id, self.user_id)
+
+        with sql_statements_counted() as statements:
+            last_view_service.mark_all_topics_in_category_as_viewed(
+                self.category_id, self.user_id)
+
+        # a single statement
+        assert len(statements) == 1
+
+        viewed_topic_ids = self.get_viewed_topic_ids()
+        assert viewed_topic_ids == set(self.topic_ids)
+
+        viewed_at_after = last_view_service.find_topic_last_viewed_at(
+            viewed_topic_id, self.user_id)
+        assert viewed_at_after > viewed_at_before
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def create_topics(self, category_id, count):
+        now = datetime.now()
+
+        rows = [
+            {
+                'id': uuid4(),
+                'category_id': category_id,
+                'created_at': now,
+                'creator_id': self.user_id,
+                'title': 'Thema {}'.format(i),
+                'posting_count': 0,
+                'hidden': False,
+                'locked': False,
+                'pinned': False,
+            }
+            for i in range(1, count + 1)
+        ]
+
+        self.db.session.execute(Topic.__table__.insert(), rows)
+        self.db.session.commit()
+
+        return [row['id'] for row in rows]
+
+    def get_viewed_topic_ids(self):
+        rows = self.db.session \
+            .query(LastTopicView.topic_id) \
+            .filter_by(user_id=self.user_id) \
+            .all()
+
+        return {row[0] for row in rows}
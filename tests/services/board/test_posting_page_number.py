@@ -0,0 +1,83 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from byceps.services.board import posting_service
+from byceps.services.board.models.posting import Posting
+
+from testfixtures.board import create_board, create_category, create_topic
+
+from tests.base import AbstractAppTestCase
+from tests.helpers import sql_statements_counted
+
+
+POSTING_COUNT = 10000
+POSTINGS_PER_PAGE = 10
+
+
+class PostingPageNumberTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = self.create_user()
+        self.user.permissions = frozenset()
+
+        self.create_brand_and_party()
+
+        board = create_board(self.brand.id, self.brand.id)
+        category = create_category(board.id)
+        self.topic = create_topic(category.id, self.user.id)
+
+        self.posting_ids = self.create_postings(POSTING_COUNT)
+
+    def test_calculate_posting_page_number(self):
+        for index, expected_page in [
+            # The topic's initial posting comes first.
+            (0, 1),
+            (8, 1),
+            (9, 2),
+            (POSTING_COUNT - 1, POSTING_COUNT // POSTINGS_PER_PAGE + 1),
+        ]:
+            posting = Posting.query.get(self.posting_ids[index])
+            assert self.calculate_page_number(posting) == expected_page
+
+    def test_calculate_posting_page_number_with_single_statement(self):
+        posting = Posting.query.get(self.posting_ids[-1])
+
+        with sql_statements_counted() as statements:
+            page_number = self.calculate_page_number(posting)
+
+        assert page_number == POSTING_COUNT // POSTINGS_PER_PAGE + 1
+        assert len(statements) == 1
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def create_postings(self, count):
+        created_at = datetime.now()
+
+        rows = []
+        for i in range(1, count + 1):
+            rows.append({
+                'id': uuid4(),
+                'topic_id': self.topic.id,
+                'created_at': created_at + timedelta(seconds=i),
+                'creator_id': self.user.id,
+                'body': 'Beitrag {}'.format(i),
+                'edit_count': 0,
+                'hidden': False,
+            })
+
+        self.db.session.execute(Posting.__table__.insert(), rows)
+        self.db.session.commit()
+
+        return [row['id'] for row in rows]
+
+    def calculate_page_number(self, posting):
+        return posting_service.calculate_posting_page_number(
+            posting, self.user, POSTINGS_PER_PAGE)
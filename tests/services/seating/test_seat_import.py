@@ -0,0 +1,101 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from uuid import UUID
+
+import pytest
+
+from byceps.services.seating.seat_import_service import find_layout_errors, \
+    generate_grid, InvalidSeatLayout, parse_seats_from_csv, \
+    parse_seats_from_json, SeatToImport
+
+
+CATEGORY_ID = UUID('4b6a3a0e-8a8b-4b0b-9a1e-0d4d53c2a001')
+OTHER_CATEGORY_ID = UUID('c3a1e3f2-2f7d-4c55-8f4c-9e4f1d6a7b02')
+
+
+def test_parse_seats_from_csv():
+    lines = [
+        'x,y,label,category_id',
+        '10,20,A1,',
+        ' 30 ,20,,{}'.format(OTHER_CATEGORY_ID),
+    ]
+
+    seats = parse_seats_from_csv(lines, CATEGORY_ID)
+
+    assert seats == [
+        SeatToImport(10, 20, 'A1', CATEGORY_ID),
+        SeatToImport(30, 20, None, OTHER_CATEGORY_ID),
+    ]
+
+
+def test_parse_seats_from_csv_reports_all_invalid_lines():
+    lines = [
+        'x,y,label',
+        '10,twenty,A1',
+        '10,20,A2',
+        ',20,A3',
+    ]
+
+    with pytest.raises(InvalidSeatLayout) as excinfo:
+        parse_seats_from_csv(lines, CATEGORY_ID)
+
+    assert excinfo.value.errors == [
+        'Line 2: Invalid y coordinate "twenty".',
+        'Line 4: Invalid x coordinate "".',
+    ]
+
+
+def test_parse_seats_from_json_without_category():
+    data = '[{"x": 1, "y": 2, "label": "A1"}]'
+
+    with pytest.raises(InvalidSeatLayout) as excinfo:
+        parse_seats_from_json(data)
+
+    assert excinfo.value.errors == ['Index 0: No category given.']
+
+
+def test_parse_seats_from_json_with_non_string_label():
+    data = '[{"x": 1, "y": 2, "label": 5}, {"x": 2, "y": 2, "label": "A2"}]'
+
+    with pytest.raises(InvalidSeatLayout) as excinfo:
+        parse_seats_from_json(data, CATEGORY_ID)
+
+    assert excinfo.value.errors == ['Index 0: Invalid label "5".']
+
+
+def test_generate_grid():
+    seats = generate_grid(2, 3, CATEGORY_ID, origin_x=100, spacing_x=20,
+                          spacing_y=25)
+
+    assert [(seat.coord_x, seat.coord_y, seat.label) for seat in seats] == [
+        (100, 0, 'A1'), (120, 0, 'A2'), (140, 0, 'A3'),
+        (100, 25, 'B1'), (120, 25, 'B2'), (140, 25, 'B3'),
+    ]
+
+
+def test_generate_grid_row_letters_beyond_z():
+    seats = generate_grid(28, 1, CATEGORY_ID, label_format='{row_letter}')
+
+    assert [seat.label for seat in seats[-3:]] == ['Z', 'AA', 'AB']
+
+
+def test_find_layout_errors():
+    seats = [
+        SeatToImport(0, 0, 'A1', CATEGORY_ID),
+        SeatToImport(1, 0, 'A2', CATEGORY_ID),
+        SeatToImport(0, 0, 'A1 again', CATEGORY_ID),
+        SeatToImport(5, 5, 'X' * 41, OTHER_CATEGORY_ID),
+    ]
+    occupied_coords = {(1, 0)}
+
+    errors = find_layout_errors(seats, occupied_coords, {CATEGORY_ID})
+
+    assert errors == [
+        'Seat 2 (1, 0): Coordinates are already taken by a seat in the area.',
+        'Seat 3 (0, 0): Coordinates are given more than once.',
+        'Seat 4 (5, 5): Unknown category "{}".'.format(OTHER_CATEGORY_ID),
+        'Seat 4 (5, 5): Label is longer than 40 characters.',
+    ]
@@ -0,0 +1,243 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import json
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from byceps.services.seating import seat_map_service
+
+from tests.helpers import get_redis_client
+
+
+SEAT_ID_1 = 'a1d6d6a5-6f38-4b7d-a45b-1f5f2e3a7c01'
+SEAT_ID_2 = '9c1e0b8e-2a7e-4f1e-8a0c-c5e7d2f0b302'
+
+USER = {'id': 'u1', 'screen_name': 'Ada', 'avatar_url': None}
+
+KEY_NAMES = ['seats', 'occupancy', 'changes', 'revision']
+
+
+@pytest.fixture
+def redis_client():
+    client = get_redis_client()
+    with patch.object(seat_map_service, 'redis') as redis, \
+            patch.object(seat_map_service, 'has_app_context',
+                         return_value=True):
+        redis.client = client
+        yield client
+
+
+@pytest.fixture
+def area_id(redis_client):
+    area_id = str(uuid4())
+    yield area_id
+    redis_client.delete(*[seat_map_service._get_key(area_id, name)
+                          for name in KEY_NAMES])
+
+
+def test_patch(redis_client, area_id):
+    seat_map_service._patch(area_id, {
+        SEAT_ID_1: {'user': USER},
+        SEAT_ID_2: None,
+    })
+
+    occupancy = redis_client.hgetall(get_key(area_id, 'occupancy'))
+    assert {seat_id: json.loads(occupant.decode('utf-8'))
+            for seat_id, occupant in occupancy.items()} == {
+        SEAT_ID_1.encode('utf-8'): {'user': USER},
+        SEAT_ID_2.encode('utf-8'): None,
+    }
+
+    assert seat_map_service.get_revision(area_id) == 2
+
+    # Neither changes nor occupancy without a snapshot are kept forever.
+    for name in 'changes', 'occupancy':
+        ttl = redis_client.ttl(get_key(area_id, name))
+        assert 0 < ttl <= seat_map_service.SNAPSHOT_TTL
+
+
+def test_patch_keeps_expiry_of_snapshot(redis_client, area_id):
+    occupancy_key = get_key(area_id, 'occupancy')
+    redis_client.hset(occupancy_key, SEAT_ID_1, 'null')
+    redis_client.expire(occupancy_key, 60)
+
+    seat_map_service._patch(area_id, {SEAT_ID_1: {'user': None}})
+
+    assert 0 < redis_client.ttl(occupancy_key) <= 60
+
+
+def test_patch_publishes_changes(redis_client, area_id):
+    pubsub = subscribe(redis_client, area_id)
+
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    message = get_message(pubsub)
+    pubsub.close()
+
+    assert message['data'] == '1 {} null'.format(SEAT_ID_1).encode('utf-8')
+
+
+def test_no_changes(area_id):
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    changes = seat_map_service.get_changes(area_id, 1)
+
+    assert changes == (1, [])
+
+
+def test_changes_since_revision(area_id):
+    seat_map_service._patch(area_id, {SEAT_ID_1: {'user': None}})
+    seat_map_service._patch(area_id, {SEAT_ID_2: {'user': USER}})
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    changes = seat_map_service.get_changes(area_id, 1)
+
+    assert changes.revision == 3
+    assert changes.changes == [
+        {
+            'revision': 2,
+            'seat_id': SEAT_ID_2,
+            'is_occupied': True,
+            'user': USER,
+        },
+        {
+            'revision': 3,
+            'seat_id': SEAT_ID_1,
+            'is_occupied': False,
+            'user': None,
+        },
+    ]
+
+
+def test_changes_no_longer_available(area_id):
+    with patch.object(seat_map_service, 'MAX_CHANGES', 1):
+        for _ in range(3):
+            seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    assert seat_map_service.get_changes(area_id, 1) is None
+    assert seat_map_service.get_changes(area_id, 2) is not None
+
+
+def test_revision_ahead_of_server(area_id):
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    assert seat_map_service.get_changes(area_id, 5) is None
+
+
+def test_invalidate(redis_client, area_id):
+    redis_client.set(get_key(area_id, 'seats'), '[]')
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+    pubsub = subscribe(redis_client, area_id)
+
+    seat_map_service.invalidate(area_id)
+
+    message = get_message(pubsub)
+    pubsub.close()
+
+    for name in 'seats', 'occupancy', 'changes':
+        assert not redis_client.exists(get_key(area_id, name))
+
+    # The revision keeps increasing so clients notice they are outdated.
+    assert seat_map_service.get_revision(area_id) == 2
+    assert seat_map_service.get_changes(area_id, 1) is None
+
+    assert message['data'] == seat_map_service.RESET_MESSAGE.encode('utf-8')
+
+
+def test_stream_catches_up_then_relays(redis_client, area_id):
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+    seat_map_service._patch(area_id, {SEAT_ID_2: None})
+
+    get_changes = seat_map_service._get_changes
+
+    def patch_then_get_changes(*args):
+        # A change happens after subscribing but before catching up, so
+        # it is both logged and published.
+        seat_map_service._patch(area_id, {SEAT_ID_1: None})
+        return get_changes(*args)
+
+    stream = stream_changes(area_id, 1)
+
+    with patch.object(seat_map_service, '_get_changes',
+                      side_effect=patch_then_get_changes):
+        assert next(stream)['revision'] == 2
+
+    assert next(stream)['revision'] == 3
+    # Revision 3 is not sent again.
+    assert next_change(stream) is None
+
+    seat_map_service._patch(area_id, {SEAT_ID_2: None})
+    assert next_change(stream)['revision'] == 4
+
+    stream.close()
+    assert redis_client.pubsub_numsub(get_channel(area_id)) \
+        == [(get_channel(area_id).encode('utf-8'), 0)]
+
+
+def test_stream_stops_on_reset(area_id):
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    stream = stream_changes(area_id, 1)
+    assert next_change(stream) is None  # subscribed and caught up
+
+    seat_map_service.invalidate(area_id)
+
+    with pytest.raises(seat_map_service.ChangesUnavailable):
+        next_change(stream)
+
+
+def test_stream_of_unavailable_changes(area_id):
+    seat_map_service._patch(area_id, {SEAT_ID_1: None})
+
+    stream = stream_changes(area_id, 5)
+
+    with pytest.raises(seat_map_service.ChangesUnavailable):
+        next(stream)
+
+
+# helpers
+
+
+def get_key(area_id, name):
+    return seat_map_service._get_key(area_id, name)
+
+
+def get_channel(area_id):
+    return seat_map_service._get_channel(area_id)
+
+
+def subscribe(redis_client, area_id):
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(get_channel(area_id))
+    return pubsub
+
+
+def get_message(pubsub, attempts=10):
+    """Return the next message, skipping the subscription's
+    confirmation.
+    """
+    for _ in range(attempts):
+        message = pubsub.get_message(timeout=0.1)
+        if message is not None:
+            return message
+
+
+def stream_changes(area_id, since_revision):
+    return seat_map_service.stream_changes(area_id, since_revision,
+                                           keepalive_interval=0.1,
+                                           duration=60)
+
+
+def next_change(stream, attempts=10):
+    """Return the next change, skipping keepalives (some of which are
+    due to the subscription's confirmation), or `None` if there is none.
+    """
+    for _ in range(attempts):
+        change = next(stream)
+        if change is not None:
+            return change
@@ -0,0 +1,114 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from byceps.redis import redis
+from byceps.services.seating import area_service, seat_map_service, \
+    seat_service
+from byceps.services.ticketing import category_service, \
+    ticket_creation_service, ticket_seat_management_service, \
+    ticket_user_management_service
+
+from tests.base import AbstractAppTestCase
+from tests.helpers import get_redis_client
+
+
+class SeatMapSnapshotTestCase(AbstractAppTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.redis_client = get_redis_client()
+
+        self.owner_id = self.create_user('Owner').id
+        self.user_id = self.create_user('User').id
+
+        self.create_brand_and_party()
+
+        category_id = category_service.create_category(self.party.id,
+                                                       'Standard').id
+
+        area = area_service.create_area(self.party.id, 'main', 'Main Hall')
+        self.area_id = area.id
+        self.seat1_id = seat_service.create_seat(area, 0, 0, category_id).id
+        self.seat2_id = seat_service.create_seat(area, 1, 0, category_id).id
+
+        ticket1_id = ticket_creation_service \
+            .create_ticket(category_id, self.owner_id).id
+        ticket_user_management_service \
+            .appoint_user(ticket1_id, self.user_id, self.owner_id)
+        ticket_seat_management_service \
+            .occupy_seat(ticket1_id, self.seat1_id, self.owner_id)
+
+        self.ticket2_id = ticket_creation_service \
+            .create_ticket(category_id, self.owner_id).id
+
+    def tearDown(self):
+        self.redis_client.delete(*[
+            seat_map_service._get_key(self.area_id, name)
+            for name in ('seats', 'occupancy', 'changes', 'revision')])
+
+        super().tearDown()
+
+    def test_get_seat_map_builds_snapshot(self):
+        with self.redis_client_set():
+            seat_map = seat_map_service.get_seat_map(self.area_id)
+
+        assert seat_map.revision == 0
+        assert [(seat.id, seat.is_occupied) for seat in seat_map.seats] == [
+            (str(self.seat1_id), True),
+            (str(self.seat2_id), False),
+        ]
+        assert seat_map.seats[0].user.screen_name == 'User'
+
+        for name in 'seats', 'occupancy':
+            ttl = self.redis_client.ttl(self.get_key(name))
+            assert 0 < ttl <= seat_map_service.SNAPSHOT_TTL
+
+    def test_building_snapshot_keeps_patched_occupancy(self):
+        # The seat is released after the snapshot's occupancy has been
+        # read from the database but before it is stored.
+        with self.redis_client_set():
+            seat_map_service._patch(self.area_id, {self.seat1_id: None})
+
+            seat_map = seat_map_service.get_seat_map(self.area_id)
+
+        assert seat_map.revision == 1
+        assert [seat.is_occupied for seat in seat_map.seats] == [False, False]
+
+    def test_occupying_seat_patches_snapshot(self):
+        with self.redis_client_set():
+            seat_map_service.get_seat_map(self.area_id)  # Build snapshot.
+
+            ticket_seat_management_service \
+                .occupy_seat(self.ticket2_id, self.seat2_id, self.owner_id)
+
+            with patch.object(seat_map_service, '_build_snapshot') \
+                    as build_snapshot_mock:
+                seat_map = seat_map_service.get_seat_map(self.area_id)
+
+            changes = seat_map_service.get_changes(self.area_id, 0)
+
+        build_snapshot_mock.assert_not_called()
+        assert seat_map.revision == 1
+        assert [seat.is_occupied for seat in seat_map.seats] == [True, True]
+        assert seat_map.seats[1].user is None  # no user assigned
+
+        assert [(change['seat_id'], change['is_occupied'])
+                for change in changes.changes] == [(str(self.seat2_id), True)]
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    @contextmanager
+    def redis_client_set(self):
+        with self.app.app_context(), \
+                patch.object(redis, '_client', self.redis_client):
+            yield
+
+    def get_key(self, name):
+        return seat_map_service._get_key(self.area_id, name)
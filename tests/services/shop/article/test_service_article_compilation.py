@@ -0,0 +1,113 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from byceps.services.shop.article import cache_service
+from byceps.services.shop.article import service as article_service
+
+from tests.helpers import sql_statements_counted
+from tests.mocks import FakeRedisClient
+from tests.services.shop.base import ShopTestBase
+
+
+class ArticleCompilationTestCase(ShopTestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.create_brand_and_party()
+        self.shop = self.create_shop(self.party.id)
+
+        self.ticket = self.create_article(self.shop.id,
+                                          item_number='LF-01-A00001',
+                                          description='Ticket', quantity=10)
+        self.sticker = self.create_article(self.shop.id,
+                                           item_number='LF-01-A00002',
+                                           description='Sticker', quantity=99)
+        self.create_article(self.shop.id, item_number='LF-01-A00003',
+                            description='Future',
+                            available_from=datetime.now() + timedelta(days=1))
+
+        article_service.attach_article(self.sticker, 2, self.ticket)
+
+        self.shop_id = self.shop.id
+
+        self.redis_client = FakeRedisClient()
+
+        redis_patcher = patch.object(cache_service, 'redis')
+        redis_patcher.start().client = self.redis_client
+        self.addCleanup(redis_patcher.stop)
+
+        self.app.config['SHOP_ARTICLE_COMPILATION_CACHE_ENABLED'] = True
+
+    def test_compilation(self):
+        with self.app.app_context():
+            compilation = self.get_compilation()
+
+        assert [(item.article.description, item.fixed_quantity)
+                for item in compilation] == [
+            ('Sticker', None),
+            ('Ticket', None),
+            ('Sticker', 2),
+        ]
+
+    def test_cached_compilation_is_loaded_with_single_statement(self):
+        with self.app.app_context():
+            self.get_compilation()  # Populate the cache.
+
+            self.db.session.remove()
+
+            with sql_statements_counted() as statements:
+                compilation = self.get_compilation()
+
+        assert len(statements) == 1
+        assert not compilation.is_empty()
+
+    def test_quantities_are_current_despite_cache(self):
+        with self.app.app_context():
+            self.get_compilation()  # Populate the cache.
+
+            article_service.reserve_quantities({self.ticket.id: 3})
+
+            compilation = self.get_compilation()
+
+        quantities = {item.article.description: item.article.quantity
+                      for item in compilation}
+        assert quantities['Ticket'] == 7
+
+    def test_update_invalidates_cache(self):
+        with self.app.app_context():
+            self.get_compilation()  # Populate the cache.
+            assert self.redis_client.values
+
+            article_service.unattach_article(
+                next(iter(self.ticket.attached_articles)))
+            assert not self.redis_client.values
+
+            compilation = self.get_compilation()
+
+        assert [item.article.description for item in compilation] \
+            == ['Sticker', 'Ticket']
+
+    def test_update_invalidates_cache_even_if_caching_is_disabled(self):
+        with self.app.app_context():
+            self.get_compilation()  # Populate the cache.
+            assert self.redis_client.values
+
+            # as in the admin application
+            self.app.config['SHOP_ARTICLE_COMPILATION_CACHE_ENABLED'] = False
+
+            article_service.unattach_article(
+                next(iter(self.ticket.attached_articles)))
+            assert not self.redis_client.values
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def get_compilation(self):
+        return article_service \
+            .get_article_compilation_for_orderable_articles(self.shop_id)
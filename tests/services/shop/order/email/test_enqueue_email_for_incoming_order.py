@@ -0,0 +1,22 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from unittest.mock import patch
+from uuid import UUID
+
+from byceps.services.shop.order.email import service as order_email_service
+
+
+ORDER_ID = UUID('6a2b51c6-1e0d-4bb4-9d1e-cf2f9d6ba1b0')
+
+
+@patch('byceps.services.shop.order.email.service.enqueue_once')
+def test_email_is_enqueued_as_job_keyed_by_order_id(enqueue_once_mock):
+    order_email_service.enqueue_email_for_incoming_order_to_orderer(ORDER_ID)
+
+    enqueue_once_mock.assert_called_once_with(
+        'shop-order-placed-email-6a2b51c6-1e0d-4bb4-9d1e-cf2f9d6ba1b0',
+        order_email_service.send_email_for_incoming_order_to_orderer,
+        ORDER_ID)
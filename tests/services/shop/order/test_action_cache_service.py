@@ -0,0 +1,65 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from byceps.services.shop.order import action_cache_service
+from byceps.services.shop.order.transfer.models import OrderAction, \
+    PaymentState
+
+from tests.helpers import fake_redis_client_set
+
+
+ACTION = OrderAction('LR-08-A00001', PaymentState.paid, 'award_badge',
+                     {'badge_id': '1'})
+
+
+@pytest.fixture
+def redis_client():
+    action_cache_service._cached = None
+    with fake_redis_client_set(action_cache_service) as client, \
+            patch.object(action_cache_service, 'is_enabled',
+                         return_value=True):
+        yield client
+
+
+def test_store_and_find(redis_client):
+    version = action_cache_service.get_version()
+    actions_by_key = {(ACTION.article_number, ACTION.payment_state): [ACTION]}
+
+    action_cache_service.store_actions(version, actions_by_key)
+
+    assert action_cache_service.find_actions(version) == actions_by_key
+
+
+def test_find_outdated_version(redis_client):
+    version = action_cache_service.get_version()
+    action_cache_service.store_actions(version, {})
+
+    assert action_cache_service.find_actions(version + 1) is None
+
+
+def test_invalidate(redis_client):
+    version_before = action_cache_service.get_version()
+    action_cache_service.store_actions(version_before, {})
+
+    action_cache_service.invalidate()
+
+    version_after = action_cache_service.get_version()
+    assert version_after != version_before
+    assert action_cache_service.find_actions(version_before) is None
+    assert action_cache_service.find_actions(version_after) is None
+
+
+def test_invalidate_even_if_caching_is_disabled(redis_client):
+    version_before = action_cache_service.get_version()
+
+    with patch.object(action_cache_service, 'is_enabled',
+                      return_value=False):
+        action_cache_service.invalidate()
+
+    assert action_cache_service.get_version() != version_before
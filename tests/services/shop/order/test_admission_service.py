@@ -0,0 +1,107 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from byceps.services.shop.order import admission_service
+
+from tests.helpers import get_redis_client
+
+
+LIMIT = 2
+
+NOW = 1533322800.0
+
+
+@pytest.fixture
+def redis_client():
+    client = get_redis_client()
+    with patch.object(admission_service, 'redis') as redis:
+        redis.client = client
+        yield client
+
+
+@pytest.fixture
+def shop_id(redis_client):
+    shop_id = 'shop-{}'.format(uuid4())
+    yield shop_id
+    redis_client.delete(*[admission_service._get_key(shop_id, name)
+                          for name in ('admitted', 'waiting', 'waiting_seen',
+                                       'tickets')])
+
+
+@pytest.fixture(autouse=True)
+def limit():
+    with patch.object(admission_service, 'get_limit', return_value=LIMIT):
+        yield
+
+
+def test_admit_up_to_limit_then_queue(shop_id):
+    assert try_admit(shop_id, 'user1') == (True, None)
+    assert try_admit(shop_id, 'user2') == (True, None)
+    assert try_admit(shop_id, 'user3') == (False, 1)
+    assert try_admit(shop_id, 'user4') == (False, 2)
+
+    # Asking again keeps the place in the queue.
+    assert try_admit(shop_id, 'user3') == (False, 1)
+
+    # Admitted users stay admitted.
+    assert try_admit(shop_id, 'user1') == (True, None)
+
+
+def test_release_admits_next_in_queue(shop_id):
+    fill_up(shop_id)
+    assert try_admit(shop_id, 'user3') == (False, 1)
+    assert try_admit(shop_id, 'user4') == (False, 2)
+
+    admission_service.release(shop_id, 'user1')
+
+    # Queued users cannot jump ahead.
+    assert try_admit(shop_id, 'user4') == (False, 1)
+    assert try_admit(shop_id, 'user3') == (True, None)
+    assert try_admit(shop_id, 'user4') == (False, 1)
+
+
+def test_expired_lease_frees_slot(shop_id):
+    fill_up(shop_id)
+    assert try_admit(shop_id, 'user3') == (False, 1)
+
+    # Only user2 renews the lease.
+    later = NOW + admission_service.ADMISSION_LEASE / 2
+    assert try_admit(shop_id, 'user2', now=later) == (True, None)
+
+    expired = NOW + admission_service.ADMISSION_LEASE + 1
+    assert try_admit(shop_id, 'user3', now=expired) == (True, None)
+    assert try_admit(shop_id, 'user1', now=expired) == (False, 1)
+
+
+def test_waiting_user_who_stops_asking_drops_out(shop_id):
+    fill_up(shop_id)
+    assert try_admit(shop_id, 'user3') == (False, 1)
+    assert try_admit(shop_id, 'user4') == (False, 2)
+
+    # Only user4 keeps asking.
+    timeout = admission_service.WAITING_TIMEOUT
+    assert try_admit(shop_id, 'user4', now=NOW + timeout / 2) == (False, 2)
+    assert try_admit(shop_id, 'user4', now=NOW + timeout + 1) == (False, 1)
+
+    # Returning, user3 has to queue up again.
+    assert try_admit(shop_id, 'user3', now=NOW + timeout + 2) == (False, 2)
+
+
+# helpers
+
+
+def fill_up(shop_id):
+    for user_id in 'user1', 'user2':
+        assert try_admit(shop_id, user_id) == (True, None)
+
+
+def try_admit(shop_id, user_id, *, now=NOW):
+    with patch.object(admission_service, 'time', return_value=now):
+        return admission_service.try_admit(shop_id, user_id)
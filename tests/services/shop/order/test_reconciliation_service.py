@@ -0,0 +1,204 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from decimal import Decimal
+from unittest.mock import call, patch
+
+from byceps.services.shop.order import reconciliation_service
+from byceps.services.shop.order import service as order_service
+from byceps.services.shop.order.reconciliation_service import Payment, \
+    ReconciliationStatus
+from byceps.services.shop.order.models.order import Order
+from byceps.services.shop.order.transfer.models import PaymentMethod, \
+    PaymentState
+
+from testfixtures.shop_order import create_order, create_order_item
+
+from tests.helpers import sql_statements_counted
+from tests.services.shop.base import ShopTestBase
+
+
+def test_parse_payments():
+    lines = [
+        'Bestellnummer;Betrag',
+        'LF-02-B00001;24,95',
+        '',
+        'LF-02-B00002 ; 1.049,90 €',
+        'LF-02-B00003;',
+        'LF-02-B00004;lots',
+    ]
+
+    payments = list(reconciliation_service.parse_payments(lines))
+
+    assert payments == [
+        Payment(2, 'LF-02-B00001', Decimal('24.95')),
+        Payment(4, 'LF-02-B00002', Decimal('1049.90')),
+        Payment(5, 'LF-02-B00003', None),
+        Payment(6, 'LF-02-B00004', None),
+    ]
+
+
+def test_parse_comma_separated_payments():
+    lines = [
+        'LF-02-B00001,24.95',
+        'LF-02-B00002,"39,90"',
+    ]
+
+    payments = list(reconciliation_service.parse_payments(lines))
+
+    assert payments == [
+        Payment(1, 'LF-02-B00001', Decimal('24.95')),
+        Payment(2, 'LF-02-B00002', Decimal('39.90')),
+    ]
+
+
+class ReconciliationTestCase(ShopTestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.admin_id = self.create_user_with_detail('Admin').id
+        self.orderer = self.create_user_with_detail('Orderer')
+
+        self.create_brand_and_party()
+
+        self.shop = self.create_shop(self.party.id)
+        self.article = self.create_article(self.shop.id,
+                                           price=Decimal('24.95'), quantity=99)
+
+    @patch('byceps.services.shop.order.reconciliation_service.enqueue_once')
+    def test_reconcile(self, enqueue_once_mock):
+        open_order = self.create_order('LF-02-B00001', 2)
+        mismatching_order = self.create_order('LF-02-B00002', 1)
+        paid_order = self.create_order('LF-02-B00003', 1, PaymentState.paid)
+        canceled_order = self.create_order('LF-02-B00004', 1,
+                                           PaymentState.canceled_before_paid)
+
+        payments = [
+            Payment(1, 'LF-02-B00001', Decimal('49.90')),
+            Payment(2, 'LF-02-B00002', Decimal('20.00')),
+            Payment(3, 'LF-02-B00003', Decimal('24.95')),
+            Payment(4, 'LF-02-B00004', Decimal('24.95')),
+            Payment(5, 'LF-02-B00005', Decimal('24.95')),
+            Payment(6, 'LF-02-B00001', Decimal('49.90')),
+            Payment(7, 'LF-02-B00006', None),
+            Payment(8, 'LF-02-B00002', Decimal('24.95')),
+        ]
+
+        results = reconciliation_service.reconcile(
+            self.shop.id, payments, PaymentMethod.bank_transfer,
+            self.admin_id)
+
+        assert [(result.line_number, result.status) for result in results] == [
+            (1, ReconciliationStatus.marked_as_paid),
+            (2, ReconciliationStatus.amount_mismatch),
+            (3, ReconciliationStatus.already_paid),
+            (4, ReconciliationStatus.canceled),
+            (5, ReconciliationStatus.unknown_order_number),
+            (6, ReconciliationStatus.duplicate),
+            (7, ReconciliationStatus.invalid_row),
+            (8, ReconciliationStatus.marked_as_paid),
+        ]
+
+        assert Order.query.get(open_order.id).payment_state \
+            == PaymentState.paid
+        # paid by a later, corrected payment
+        assert Order.query.get(mismatching_order.id).payment_state \
+            == PaymentState.paid
+
+        enqueue_once_mock.assert_has_calls([
+            call('shop-order-paid-actions-{}'.format(order.id),
+                 reconciliation_service.execute_paid_order_actions,
+                 order.id)
+            for order in (open_order, mismatching_order)
+        ])
+        assert enqueue_once_mock.call_count == 2
+
+    @patch('byceps.services.shop.order.reconciliation_service.enqueue_once')
+    def test_reconcile_does_not_reload_orders_per_batch(self,
+                                                        enqueue_once_mock):
+        order_numbers = ['LF-02-B0000{}'.format(i) for i in range(1, 7)]
+        for order_number in order_numbers:
+            self.create_order(order_number, 1)
+
+        payments = [Payment(i, order_number, Decimal('24.95'))
+                    for i, order_number in enumerate(order_numbers, 1)]
+
+        shop_id = self.shop.id
+
+        with patch.object(reconciliation_service, 'BATCH_SIZE', 2), \
+                sql_statements_counted() as statements:
+            results = reconciliation_service.reconcile(
+                shop_id, payments, PaymentMethod.bank_transfer,
+                self.admin_id)
+
+        assert {result.status for result in results} \
+            == {ReconciliationStatus.marked_as_paid}
+        assert enqueue_once_mock.call_count == 6
+
+        # Only the initial lookup of the orders (and their items).
+        selects = [statement for statement in statements
+                   if statement.lstrip().upper().startswith('SELECT')]
+        assert len(selects) == 1
+
+    @patch('byceps.services.shop.order.reconciliation_service.enqueue_once')
+    def test_reconcile_skips_orders_paid_in_the_meantime(self,
+                                                         enqueue_once_mock):
+        open_order_id = self.create_order('LF-02-B00001', 1).id
+        concurrently_paid_order_id = self.create_order('LF-02-B00002', 1).id
+
+        payments = [
+            Payment(1, 'LF-02-B00001', Decimal('24.95')),
+            Payment(2, 'LF-02-B00002', Decimal('24.95')),
+        ]
+
+        mark_open_orders_as_paid = order_service.mark_open_orders_as_paid
+
+        def pay_order_then_mark_open_orders_as_paid(*args):
+            # Another admin marks the order as paid in the meantime.
+            order_service.mark_order_as_paid(concurrently_paid_order_id,
+                                             PaymentMethod.cash,
+                                             self.admin_id)
+
+            return mark_open_orders_as_paid(*args)
+
+        with patch.object(order_service, 'mark_open_orders_as_paid',
+                          side_effect=pay_order_then_mark_open_orders_as_paid):
+            results = reconciliation_service.reconcile(
+                self.shop.id, payments, PaymentMethod.bank_transfer,
+                self.admin_id)
+
+        assert [(result.line_number, result.status) for result in results] == [
+            (1, ReconciliationStatus.marked_as_paid),
+            (2, ReconciliationStatus.already_paid),
+        ]
+
+        assert Order.query.get(open_order_id).payment_state \
+            == PaymentState.paid
+        # not overwritten by the reconciliation
+        assert Order.query.get(concurrently_paid_order_id).payment_method \
+            == PaymentMethod.cash
+
+        enqueue_once_mock.assert_called_once_with(
+            'shop-order-paid-actions-{}'.format(open_order_id),
+            reconciliation_service.execute_paid_order_actions,
+            open_order_id)
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def create_order(self, order_number, article_quantity,
+                     payment_state=PaymentState.open):
+        order = create_order(self.shop.id, self.orderer,
+                             order_number=order_number)
+        order.payment_state = payment_state
+        self.db.session.add(order)
+
+        order_item = create_order_item(order, self.article, article_quantity)
+        self.db.session.add(order_item)
+
+        self.db.session.commit()
+
+        return order
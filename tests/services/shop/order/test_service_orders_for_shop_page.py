@@ -0,0 +1,78 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime
+
+from byceps.services.shop.order import service as order_service
+
+from testfixtures.shop_order import create_order
+
+from tests.services.shop.base import ShopTestBase
+
+
+class OrdersForShopPageTestCase(ShopTestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.orderer = self.create_user_with_detail('Orderer')
+
+        self.create_brand_and_party()
+
+        self.shop = self.create_shop(self.party.id)
+
+        self.order_numbers = [
+            'AEC-05-B0000{:d}'.format(number) for number in range(1, 6)
+        ]
+        for day, order_number in enumerate(self.order_numbers, 1):
+            order = create_order(self.shop.id, self.orderer,
+                                 order_number=order_number)
+            order.created_at = datetime(2018, 3, day, 12, 0, 0)
+            self.db.session.add(order)
+        self.db.session.commit()
+
+    def test_page_forwards_and_backwards(self):
+        page1 = self.get_page()
+        assert self.get_order_numbers(page1) == [
+            'AEC-05-B00005', 'AEC-05-B00004']
+        assert page1.prev_cursor is None
+
+        page2 = self.get_page(after=page1.next_cursor)
+        assert self.get_order_numbers(page2) == [
+            'AEC-05-B00003', 'AEC-05-B00002']
+
+        page3 = self.get_page(after=page2.next_cursor)
+        assert self.get_order_numbers(page3) == ['AEC-05-B00001']
+        assert page3.next_cursor is None
+
+        page2_again = self.get_page(before=page3.prev_cursor)
+        assert self.get_order_numbers(page2_again) == [
+            'AEC-05-B00003', 'AEC-05-B00002']
+
+        page1_again = self.get_page(before=page2_again.prev_cursor)
+        assert self.get_order_numbers(page1_again) == [
+            'AEC-05-B00005', 'AEC-05-B00004']
+        assert page1_again.prev_cursor is None
+
+    def test_search(self):
+        page = self.get_page(search_term='b00003')
+        assert self.get_order_numbers(page) == ['AEC-05-B00003']
+        assert page.total is None
+
+        page = self.get_page(search_term=self.orderer.detail.last_name.upper())
+        assert len(page.items) == 2
+
+        page = self.get_page(search_term='%')
+        assert page.items == []
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def get_page(self, **kwargs):
+        return order_service.get_orders_for_shop_page(self.shop.id, 2,
+                                                      **kwargs)
+
+    def get_order_numbers(self, page):
+        return [order.order_number for order in page.items]
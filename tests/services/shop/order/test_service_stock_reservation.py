@@ -0,0 +1,131 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from byceps.services.shop.article import service as article_service
+from byceps.services.shop.cart.models import Cart
+from byceps.services.shop.order import service as order_service
+from byceps.services.shop.order.transfer.models import PaymentMethod
+from byceps.services.shop.sequence import service as sequence_service
+
+from testfixtures.shop_order import create_orderer
+
+from tests.services.shop.base import ShopTestBase
+
+
+ANY_PAYMENT_METHOD = PaymentMethod.bank_transfer
+
+THREAD_COUNT = 16
+ORDERS_PER_THREAD = 3
+
+
+class StockReservationTestCase(ShopTestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.create_brand_and_party()
+
+        shop = self.create_shop(self.party.id)
+        self.create_order_number_sequence(shop.id, 'AEC-01-B')
+
+        buyer = self.create_user_with_detail('Buyer')
+
+        # Keep plain values, as entities must not be used by other threads.
+        self.shop_id = shop.id
+        self.orderer = create_orderer(buyer)
+
+        sequence_service.discard_reserved_blocks()
+
+    @patch('byceps.blueprints.shop_order.signals.order_placed.send')
+    def test_sold_out_order_fails_before_order_number_is_generated(self, order_placed_mock):
+        article = self.create_article(self.shop_id, quantity=1)
+        article_id = article.id
+
+        cart = Cart()
+        cart.add_item(article, 2)
+
+        with pytest.raises(order_service.ArticlesSoldOut) as excinfo:
+            order_service.create_order(self.shop_id, self.orderer,
+                                       ANY_PAYMENT_METHOD, cart)
+
+        assert excinfo.value.article_ids == {article_id}
+
+        assert article_service.find_article(article_id).quantity == 1
+
+        sequence = sequence_service.find_order_number_sequence(self.shop_id)
+        assert sequence.value == 0
+
+    def test_reservation_is_all_or_nothing(self):
+        article1 = self.create_article(self.shop_id, item_number='A-1',
+                                       description='Thing 1', quantity=5)
+        article2 = self.create_article(self.shop_id, item_number='A-2',
+                                       description='Thing 2', quantity=1)
+        article1_id = article1.id
+        article2_id = article2.id
+
+        unavailable_article_ids = article_service.reserve_quantities({
+            article1_id: 3,
+            article2_id: 2,
+        })
+
+        assert unavailable_article_ids == {article2_id}
+        assert article_service.find_article(article1_id).quantity == 5
+        assert article_service.find_article(article2_id).quantity == 1
+
+    @patch('byceps.blueprints.shop_order.signals.order_placed.send')
+    def test_concurrent_orders_do_not_oversell(self, order_placed_mock):
+        quantity = 10
+        article = self.create_article(self.shop_id, quantity=quantity)
+        article_id = article.id
+
+        def place_orders():
+            results = []
+
+            with self.app.app_context():
+                for _ in range(ORDERS_PER_THREAD):
+                    article = article_service.find_article(article_id)
+
+                    cart = Cart()
+                    cart.add_item(article, 1)
+
+                    try:
+                        order = order_service.create_order(
+                            self.shop_id, self.orderer, ANY_PAYMENT_METHOD,
+                            cart)
+                        results.append(order.order_number)
+                    except order_service.ArticlesSoldOut:
+                        results.append(None)
+
+                self.db.session.remove()
+
+            return results
+
+        with ThreadPoolExecutor(max_workers=THREAD_COUNT) as executor:
+            futures = [executor.submit(place_orders)
+                       for _ in range(THREAD_COUNT)]
+            results = [result
+                       for future in futures
+                       for result in future.result()]
+
+        order_numbers = [result for result in results if result is not None]
+
+        assert len(results) == THREAD_COUNT * ORDERS_PER_THREAD
+        assert len(order_numbers) == quantity
+        assert len(set(order_numbers)) == quantity
+
+        # Reload the article and the sequence as updated by the threads
+        # instead of using the instances in this session's identity map.
+        self.db.session.expire_all()
+
+        assert article_service.find_article(article_id).quantity == 0
+
+        # Failed orders must not have used up order numbers.
+        sequence = sequence_service.find_order_number_sequence(self.shop_id)
+        assert sequence.value == quantity
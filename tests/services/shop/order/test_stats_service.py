@@ -0,0 +1,86 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from byceps.services.shop.cart.models import Cart
+from byceps.services.shop.order import service as order_service
+from byceps.services.shop.order import stats_service
+from byceps.services.shop.order.stats_service import PaymentStateStats
+from byceps.services.shop.order.transfer.models import PaymentMethod, \
+    PaymentState
+from byceps.services.shop.sequence import service as sequence_service
+
+from testfixtures.shop_order import create_orderer
+
+from tests.services.shop.base import ShopTestBase
+
+
+class OrderStatsTestCase(ShopTestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.admin = self.create_user('Admin')
+        buyer = self.create_user_with_detail('Buyer')
+        self.orderer = create_orderer(buyer)
+
+        self.create_brand_and_party()
+
+        self.shop = self.create_shop(self.party.id)
+        self.create_order_number_sequence(self.shop.id, 'AEC-01-B')
+
+        self.article = self.create_article(self.shop.id,
+                                           price=Decimal('12.50'), quantity=10)
+
+        sequence_service.discard_reserved_blocks()
+
+    @patch('byceps.blueprints.shop_order.signals.order_placed.send')
+    def test_stats_follow_orders(self, order_placed_mock):
+        order1 = self.place_order(2)
+        order2 = self.place_order(1)
+        self.place_order(3)
+
+        self.assert_stats(PaymentState.open, 3, Decimal('75.00'))
+
+        order_service.mark_order_as_paid(order1.id, PaymentMethod.cash,
+                                         self.admin.id)
+
+        self.assert_stats(PaymentState.open, 2, Decimal('50.00'))
+        self.assert_stats(PaymentState.paid, 1, Decimal('25.00'))
+
+        order_service.cancel_order(order_service.find_order(order2.id),
+                                   self.admin.id, 'Changed my mind.')
+
+        self.assert_stats(PaymentState.open, 1, Decimal('37.50'))
+        self.assert_stats(PaymentState.canceled_before_paid, 1,
+                          Decimal('12.50'))
+
+        assert order_service.count_open_orders(self.shop.id) == 1
+        assert order_service.get_order_count_by_shop_id() == {self.shop.id: 3}
+
+        stats_before = stats_service.get_stats_by_payment_state(self.shop.id)
+        stats_service.rebuild(self.shop.id)
+        stats_after = stats_service.get_stats_by_payment_state(self.shop.id)
+
+        assert stats_after == stats_before
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def place_order(self, article_quantity):
+        cart = Cart()
+        cart.add_item(self.article, article_quantity)
+
+        return order_service.create_order(self.shop.id, self.orderer,
+                                          PaymentMethod.bank_transfer, cart)
+
+    def assert_stats(self, payment_state, expected_order_count,
+                     expected_total_amount):
+        stats = stats_service.get_stats_by_payment_state(self.shop.id)
+
+        assert stats[payment_state] == PaymentStateStats(
+            expected_order_count, expected_total_amount)
@@ -0,0 +1,109 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from byceps.services.shop.sequence import service as sequence_service
+from byceps.services.shop.sequence.transfer.models import Purpose
+
+from tests.services.shop.base import ShopTestBase
+
+
+THREAD_COUNT = 16
+NUMBERS_PER_THREAD = 25
+
+
+class SequenceNumberConcurrencyTestCase(ShopTestBase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.create_brand_and_party()
+        shop = self.create_shop(self.party.id)
+        self.create_order_number_sequence(shop.id, 'AEC-01-B')
+
+        # Keep the ID, as the entity must not be used by other threads.
+        self.shop_id = shop.id
+
+        sequence_service.discard_reserved_blocks()
+
+    def tearDown(self):
+        sequence_service.discard_reserved_blocks()
+
+        super().tearDown()
+
+    def test_order_numbers_are_unique_without_blocks(self):
+        self.app.config['SHOP_ORDER_NUMBER_BLOCK_SIZE'] = 1
+
+        order_numbers = self.generate_order_numbers_concurrently()
+
+        assert_unique(order_numbers)
+
+    def test_order_numbers_are_unique_with_blocks(self):
+        self.app.config['SHOP_ORDER_NUMBER_BLOCK_SIZE'] = 10
+
+        order_numbers = self.generate_order_numbers_concurrently()
+
+        assert_unique(order_numbers)
+
+        sequence = sequence_service.find_order_number_sequence(self.shop_id)
+        assert sequence.value == THREAD_COUNT * NUMBERS_PER_THREAD
+
+    def test_blocks_reserved_concurrently_do_not_overlap(self):
+        # Reserve blocks directly, as separate processes would.
+        def reserve_blocks():
+            with self.app.app_context():
+                blocks = [
+                    sequence_service._reserve_block(self.shop_id,
+                                                    Purpose.order, 7)
+                    for _ in range(NUMBERS_PER_THREAD)
+                ]
+
+                self.db.session.remove()
+
+                return [(block.next_value, block.last_value)
+                        for block in blocks]
+
+        with ThreadPoolExecutor(max_workers=THREAD_COUNT) as executor:
+            futures = [executor.submit(reserve_blocks)
+                       for _ in range(THREAD_COUNT)]
+            ranges = [r for future in futures for r in future.result()]
+
+        values = [value
+                  for first_value, last_value in ranges
+                  for value in range(first_value, last_value + 1)]
+
+        assert_unique(values)
+        assert sorted(values) == list(range(1, len(values) + 1))
+
+    # -------------------------------------------------------------------- #
+    # helpers
+
+    def generate_order_numbers_concurrently(self):
+        def generate_order_numbers():
+            with self.app.app_context():
+                order_numbers = [
+                    sequence_service.generate_order_number(self.shop_id)
+                    for _ in range(NUMBERS_PER_THREAD)
+                ]
+
+                self.db.session.remove()
+
+                return order_numbers
+
+        with ThreadPoolExecutor(max_workers=THREAD_COUNT) as executor:
+            futures = [executor.submit(generate_order_numbers)
+                       for _ in range(THREAD_COUNT)]
+            order_numbers = [order_number
+                             for future in futures
+                             for order_number in future.result()]
+
+        assert len(order_numbers) == THREAD_COUNT * NUMBERS_PER_THREAD
+
+        return order_numbers
+
+
+def assert_unique(values):
+    assert len(set(values)) == len(values)
@@ -0,0 +1,85 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from unittest.mock import patch
+from uuid import UUID
+
+from jinja2 import Template
+import pytest
+
+from byceps.services.snippet import cache_service
+from byceps.services.snippet.models.snippet import SnippetType
+from byceps.services.snippet.transfer.models import CurrentVersion
+
+from tests.helpers import fake_redis_client_set
+
+
+PARTY_ID = 'lafiesta-2018'
+
+VERSION_1 = CurrentVersion(UUID('9a7eb9e5-5b41-4e7b-9e6f-1f3d7c23e2c9'),
+                           SnippetType.fragment, None, None,
+                           '<p>{{ "1" }}</p>', None)
+VERSION_2 = CurrentVersion(UUID('0c6fd1b4-6b7a-4f3e-a1c4-2a8c8d36bb7e'),
+                           SnippetType.fragment, None, None,
+                           '<p>{{ "2" }}</p>', None)
+
+
+@pytest.fixture
+def redis_client():
+    cache_service._cached_by_party_id.clear()
+    cache_service._TEMPLATE_CACHE.clear()
+    with fake_redis_client_set(cache_service) as client, \
+            patch.object(cache_service, 'is_enabled', return_value=True):
+        yield client
+
+
+def test_store_and_find_current_versions(redis_client):
+    version = cache_service.get_version(PARTY_ID)
+    versions_by_name = {'info': VERSION_1}
+
+    cache_service.store_current_versions(PARTY_ID, version, versions_by_name)
+
+    assert cache_service.find_current_versions(PARTY_ID, version) \
+        == versions_by_name
+    assert cache_service.find_current_versions('other-party', version) is None
+
+
+def test_invalidate_only_affects_party(redis_client):
+    version_before = cache_service.get_version(PARTY_ID)
+    cache_service.store_current_versions(PARTY_ID, version_before, {})
+    cache_service.store_current_versions('other-party', 0, {})
+
+    cache_service.invalidate(PARTY_ID)
+
+    version_after = cache_service.get_version(PARTY_ID)
+    assert version_after != version_before
+    assert cache_service.find_current_versions(PARTY_ID, version_after) \
+        is None
+    assert cache_service.find_current_versions('other-party', 0) == {}
+
+
+def test_invalidate_even_if_caching_is_disabled(redis_client):
+    version_before = cache_service.get_version(PARTY_ID)
+
+    with patch.object(cache_service, 'is_enabled', return_value=False):
+        cache_service.invalidate(PARTY_ID)
+
+    assert cache_service.get_version(PARTY_ID) != version_before
+
+
+def test_templates_of_replaced_versions_are_dropped(redis_client):
+    template1 = Template(VERSION_1.body)
+    template2 = Template(VERSION_2.body)
+
+    cache_service.store_current_versions(PARTY_ID, 0, {'info': VERSION_1})
+    cache_service.store_template(VERSION_1.id, 'body', template1)
+    cache_service.store_template(VERSION_1.id, 'head', template1)
+
+    cache_service.store_current_versions(PARTY_ID, 1, {'info': VERSION_2})
+    cache_service.store_template(VERSION_2.id, 'body', template2)
+
+    assert cache_service.find_template(VERSION_1.id, 'body') is None
+    assert cache_service.find_template(VERSION_1.id, 'head') is None
+    assert cache_service.find_template(VERSION_2.id, 'body') is template2
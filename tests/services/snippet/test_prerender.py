@@ -0,0 +1,51 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from flask import Flask
+import pytest
+
+from byceps.services.snippet.service import prerender_body
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['TEXT_MARKUP_STORE_RENDERED_HTML'] = True
+    return app
+
+
+def test_self_contained_body_is_rendered(app):
+    body = '{% for word in ["Hello", "World"] %}<b>{{ word }}</b>{% endfor %}'
+
+    with app.test_request_context():
+        assert prerender_body(body) == '<b>Hello</b><b>World</b>'
+
+
+def test_body_embedding_other_snippet_is_not_rendered(app):
+    body = '<div>{{ render_snippet("info") }}</div>'
+
+    with app.test_request_context():
+        assert prerender_body(body) is None
+
+
+def test_body_setting_current_page_is_not_rendered(app):
+    body = '{% set current_page = "info" %}<p>Info</p>'
+
+    with app.test_request_context():
+        assert prerender_body(body) is None
+
+
+def test_body_with_unknown_endpoint_is_not_rendered(app):
+    body = '<a href="{{ url_for("unknown") }}">link</a>'
+
+    with app.test_request_context():
+        assert prerender_body(body) is None
+
+
+def test_nothing_is_rendered_if_disabled(app):
+    app.config['TEXT_MARKUP_STORE_RENDERED_HTML'] = False
+
+    with app.test_request_context():
+        assert prerender_body('<p>Info</p>') is None
@@ -5,7 +5,8 @@
 
 import pytest
 
-from byceps.services.text_markup.service import render_html
+from byceps.services.text_markup.service import \
+    get_render_cache_statistics, render_html
 
 
 def test_auto_url_linking():
@@ -82,3 +83,18 @@ def test_quote_with_author():
 ])
 def test_quote_with_author_whose_name_contains_square_brackets(text, expected):
     assert render_html(text) == expected
+
+
+def test_render_cache():
+    text = 'This [b]text[/b] is rendered only once.'
+
+    statistics_before = get_render_cache_statistics()
+
+    html1 = render_html(text)
+    html2 = render_html(text)
+
+    statistics_after = get_render_cache_statistics()
+
+    assert html1 == html2
+    assert statistics_after.local_misses == statistics_before.local_misses + 1
+    assert statistics_after.local_hits == statistics_before.local_hits + 1
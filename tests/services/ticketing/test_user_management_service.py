@@ -3,8 +3,12 @@
 :License: Modified BSD, see LICENSE for details.
 """
 
+from unittest.mock import patch
+
+from byceps.services.seating import area_service, seat_service
 from byceps.services.ticketing import category_service, event_service, \
-    ticket_creation_service, ticket_user_management_service
+    ticket_creation_service, ticket_seat_management_service, \
+    ticket_user_management_service
 
 from tests.base import AbstractAppTestCase
 
@@ -95,6 +99,28 @@ class TicketUserManagementServiceTest(AbstractAppTestCase):
             'initiator_id': str(self.owner.id),
         })
 
+    @patch('byceps.services.ticketing.ticket_user_management_service'
+           '.seat_map_service')
+    def test_user_change_updates_seat_map(self, seat_map_service_mock):
+        user = self.create_user('Ticket_User')
+
+        area = area_service.create_area(self.party.id, 'main', 'Main Hall')
+        seat = seat_service.create_seat(area, 0, 0, self.category_id)
+        ticket_seat_management_service \
+            .occupy_seat(self.ticket.id, seat.id, self.owner.id)
+
+        ticket_user_management_service \
+            .appoint_user(self.ticket.id, user.id, self.owner.id)
+        seat_map_service_mock.update_occupancy.assert_called_once_with(
+            {seat.id})
+
+        seat_map_service_mock.reset_mock()
+
+        ticket_user_management_service \
+            .withdraw_user(self.ticket.id, self.owner.id)
+        seat_map_service_mock.update_occupancy.assert_called_once_with(
+            {seat.id})
+
     # helpers
 
     def create_category(self, title):
@@ -0,0 +1,40 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import pytest
+
+from byceps.util.iterables import chunked
+
+
+@pytest.mark.parametrize('iterable, size, expected', [
+    (
+        [],
+        3,
+        [],
+    ),
+    (
+        ['a', 'b', 'c'],
+        1,
+        [['a'], ['b'], ['c']],
+    ),
+    (
+        range(5),
+        2,
+        [[0, 1], [2, 3], [4]],
+    ),
+    (
+        range(6),
+        3,
+        [[0, 1, 2], [3, 4, 5]],
+    ),
+])
+def test_chunked(iterable, size, expected):
+    actual = chunked(iterable, size)
+    assert list(actual) == expected
+
+
+def test_chunked_with_invalid_size():
+    with pytest.raises(ValueError):
+        list(chunked([1, 2, 3], 0))
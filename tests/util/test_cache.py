@@ -0,0 +1,58 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+import pytest
+
+from byceps.util.cache import LRUCache
+
+
+def test_get_unknown_key_counts_miss():
+    cache = LRUCache(2)
+
+    assert cache.get('a') is None
+    assert cache.hits == 0
+    assert cache.misses == 1
+
+
+def test_get_known_key_counts_hit():
+    cache = LRUCache(2)
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.hits == 1
+    assert cache.misses == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    cache.get('a')  # Make 'b' the least recently used entry.
+    cache.set('c', 3)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert len(cache) == 2
+
+
+def test_delete_and_clear():
+    cache = LRUCache(3)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    cache.delete('a')
+    cache.delete('unknown')
+    assert 'a' not in cache
+    assert 'b' in cache
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_invalid_maxsize():
+    with pytest.raises(ValueError):
+        LRUCache(0)
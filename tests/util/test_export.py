@@ -0,0 +1,37 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from byceps.util.export import serialize_to_csv
+
+
+def test_serialize_to_csv():
+    field_names = ['Nummer', 'Name']
+    rows = [
+        {'Nummer': '1', 'Name': 'Eins'},
+        {'Nummer': '2', 'Name': 'Zwei; Drei'},
+    ]
+
+    lines = list(serialize_to_csv(field_names, rows))
+
+    assert lines == [
+        'Nummer;Name\r\n',
+        '1;Eins\r\n',
+        '2;"Zwei; Drei"\r\n',
+    ]
+
+
+def test_serialize_to_csv_consumes_rows_lazily():
+    consumed = []
+
+    def generate_rows():
+        for number in range(3):
+            consumed.append(number)
+            yield {'Nummer': str(number)}
+
+    lines = serialize_to_csv(['Nummer'], generate_rows())
+
+    assert next(lines) == 'Nummer\r\n'
+    assert next(lines) == '0\r\n'
+    assert consumed == [0]
@@ -0,0 +1,56 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from unittest.mock import Mock, patch
+
+from flask import Flask
+import pytest
+from rq import Queue
+from rq.job import Job
+
+from byceps.util import jobqueue
+
+
+def job_function(value):
+    pass
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['JOBS_ASYNC'] = True
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def queue(app):
+    queue = Mock(spec=Queue)
+    with patch.object(jobqueue, 'connection'), \
+            patch.object(jobqueue, 'get_queue', return_value=queue):
+        yield queue
+
+
+def test_enqueue_once(queue):
+    with patch.object(Job, 'exists', return_value=False):
+        jobqueue.enqueue_once('job-1', job_function, 23)
+
+    queue.enqueue.assert_called_once_with(job_function, 23, job_id='job-1')
+
+
+def test_enqueue_once_with_existing_job(queue):
+    with patch.object(Job, 'exists', return_value=True):
+        jobqueue.enqueue_once('job-1', job_function, 23)
+
+    queue.enqueue.assert_not_called()
+
+
+def test_enqueue_once_executed_synchronously(app, queue):
+    app.config['JOBS_ASYNC'] = False
+
+    with patch.object(Job, 'exists', return_value=True):
+        jobqueue.enqueue_once('job-1', job_function, 23)
+
+    queue.enqueue.assert_called_once_with(job_function, 23, job_id='job-1')
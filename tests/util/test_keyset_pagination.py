@@ -0,0 +1,36 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+
+from byceps.util.keyset_pagination import decode_cursor, encode_cursor
+
+
+def test_encode_and_decode_cursor():
+    values = [
+        datetime(2018, 3, 17, 14, 25, 2, 123456),
+        UUID('2dbf4ff9-a8a7-4a31-8a77-dd11bc67ad0a'),
+        'AEC-05-B00023',
+        42,
+    ]
+
+    cursor = encode_cursor(values)
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == values
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    encode_cursor([]) + 'x',
+    'WyJ4Il0',  # `["x"]`
+    'W1sieiIsMV1d',  # `[["z",1]]`
+])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
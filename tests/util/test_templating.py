@@ -0,0 +1,43 @@
+"""
+:Copyright: 2006-2018 Jochen Kupperschmidt
+:License: Modified BSD, see LICENSE for details.
+"""
+
+from byceps.util.templating import get_sandboxed_environment, load_template
+
+
+def test_environment_is_shared_per_path_and_autoescape(tmpdir):
+    path = str(tmpdir)
+
+    env = get_sandboxed_environment(path)
+
+    assert get_sandboxed_environment(path) is env
+    assert get_sandboxed_environment(path, autoescape=False) is not env
+    assert get_sandboxed_environment() is not env
+
+
+def test_templates_are_compiled_once(tmpdir):
+    tmpdir.join('greeting.txt').write('Hello, {{ name }}!')
+    env = get_sandboxed_environment(str(tmpdir), autoescape=False)
+
+    template = env.get_template('greeting.txt')
+
+    assert env.get_template('greeting.txt') is template
+    assert template.render(name='<Ada>') == 'Hello, <Ada>!'
+
+
+def test_filters_are_added_on_creation(tmpdir):
+    tmpdir.join('shout.txt').write('{{ word|shout }}')
+    env = get_sandboxed_environment(str(tmpdir), filters={
+        'shout': lambda value: value.upper() + '!',
+    })
+
+    assert env.get_template('shout.txt').render(word='hey') == 'HEY!'
+
+
+def test_template_globals_do_not_leak():
+    template = load_template('{{ greet() }}',
+                             template_globals={'greet': lambda: 'hi'})
+
+    assert template.render() == 'hi'
+    assert load_template('{{ greet is defined }}').render() == 'False'